@@ -0,0 +1,158 @@
+"""Cached transport for Google's ID token signing certificates.
+
+``id_token.verify_oauth2_token`` downloads Google's certificates through the
+transport it is given on every call. ``CachedCertsRequest`` wraps the real
+transport and answers GET requests from an in-process cache for the
+response's ``Cache-Control: max-age`` (``GOOGLE_CERTS_CACHE_TTL`` when
+absent). Shortly before an entry expires it is refreshed in a background
+thread, so once warm no login waits on an outbound fetch. Only one caller
+fetches a missing or expired entry: the others wait for it when there is
+nothing cached yet, or keep using the expired certificates meanwhile. The
+WSGI and ASGI entry points prefetch the certificates at startup
+(``prefetch_certs``).
+
+Set ``GOOGLE_OAUTH2_CERTS_FILE`` to a JSON file of certificates to verify
+against local test keys without network access.
+"""
+import re
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from google.auth.transport import requests as google_requests
+
+# What ``id_token.verify_oauth2_token`` fetches
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/oauth2/v1/certs'
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class StaticResponse:
+    """Minimal ``google.auth.transport.Response`` for stubbed certificates."""
+
+    def __init__(self, data, status=200, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.data = data
+
+
+class CertCache:
+    """Time-based cache of certificate responses keyed by URL."""
+
+    def __init__(self, fetch, default_ttl=3600, refresh_margin=0.1):
+        self._fetch = fetch
+        self.default_ttl = default_ttl
+        self.refresh_margin = refresh_margin
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._loading = {}
+
+    def _ttl(self, response):
+        match = _MAX_AGE_RE.search(response.headers.get('cache-control', '') or '')
+        return int(match.group(1)) if match else self.default_ttl
+
+    def _load_lock(self, url):
+        with self._lock:
+            return self._loading.setdefault(url, threading.Lock())
+    
+    def _load(self, url):
+        response = self._fetch(url)
+        if response.status == 200:
+            ttl = self._ttl(response)
+            with self._lock:
+                self._entries[url] = (response, time.monotonic() + ttl, ttl)
+        return response
+
+    def _refresh(self, url):
+        try:
+            with self._load_lock(url):
+                self._load(url)
+        except Exception:
+            pass  # Keep serving the current entry until it expires
+        finally:
+            with self._lock:
+                self._refreshing.discard(url)
+
+    def _refresh_in_background(self, url):
+        with self._lock:
+            if url in self._refreshing:
+                return
+            self._refreshing.add(url)
+        threading.Thread(target=self._refresh, args=(url,), daemon=True).start()
+
+    def get(self, url):
+        """Return the cached response for ``url``, fetching it when missing or expired."""
+        entry = self._entries.get(url)
+        if entry is not None:
+            response, expires_at, ttl = entry
+            remaining = expires_at - time.monotonic()
+            if remaining > 0:
+                if remaining < ttl * self.refresh_margin:
+                    self._refresh_in_background(url)
+                return response
+        lock = self._load_lock(url)
+        if not lock.acquire(blocking=entry is None):
+            # Another caller is fetching; its expired copy beats waiting for it
+            return entry[0]
+        try:
+            current = self._entries.get(url)
+            if current is not None and current is not entry and current[1] > time.monotonic():
+                return current[0]
+            return self._load(url)
+        finally:
+            lock.release()
+    
+    def prefetch(self, url):
+        """Start loading ``url`` in the background, e.g. at process start."""
+        self._refresh_in_background(url)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CachedCertsRequest:
+    """Transport passed to ``id_token`` verification that caches GET responses."""
+
+    def __init__(self, cache, transport):
+        self.cache = cache
+        self.transport = transport
+
+    def __call__(self, url, method='GET', body=None, headers=None, timeout=None, **kwargs):
+        if method == 'GET' and body is None:
+            return self.cache.get(url)
+        return self.transport(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+
+
+def _build_request():
+    transport = google_requests.Request()
+    certs_file = getattr(settings, 'GOOGLE_OAUTH2_CERTS_FILE', '')
+    if certs_file:
+        def fetch(url):
+            return StaticResponse(Path(certs_file).read_bytes())
+    else:
+        def fetch(url):
+            return transport(url, method='GET')
+    cache = CertCache(fetch, default_ttl=getattr(settings, 'GOOGLE_CERTS_CACHE_TTL', 3600))
+    return CachedCertsRequest(cache, transport)
+
+
+_request = None
+_request_lock = threading.Lock()
+
+
+def get_cert_request():
+    """Process-wide cached transport for ``id_token.verify_oauth2_token``."""
+    global _request
+    if _request is None:
+        with _request_lock:
+            if _request is None:
+                _request = _build_request()
+    return _request
+
+
+def prefetch_certs():
+    """Warm the certificate cache so the first login doesn't wait on Google."""
+    get_cert_request().cache.prefetch(GOOGLE_CERTS_URL)
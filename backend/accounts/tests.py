@@ -0,0 +1,166 @@
+import threading
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+
+from accounts.google_certs import CachedCertsRequest, CertCache, StaticResponse
+from problems.tests.utils import User
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CertCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.fetches = []
+        self.clock = FakeClock()
+        patcher = mock.patch('accounts.google_certs.time.monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fetch(self, url, status=200, headers=None):
+        self.fetches.append(url)
+        if headers is None:
+            headers = {'cache-control': 'public, max-age=100'}
+        return StaticResponse(b'{}', status=status, headers=headers)
+
+    def test_serves_from_cache_until_expiry(self):
+        cache = CertCache(self.fetch)
+        first = cache.get('certs')
+        self.assertIs(cache.get('certs'), first)
+        self.assertEqual(len(self.fetches), 1)
+        self.clock.now += 101
+        self.assertIsNot(cache.get('certs'), first)
+        self.assertEqual(len(self.fetches), 2)
+
+    def test_default_ttl_without_max_age(self):
+        cache = CertCache(lambda url: self.fetch(url, headers={}), default_ttl=10)
+        cache.get('certs')
+        self.clock.now += 5
+        cache.get('certs')
+        self.assertEqual(len(self.fetches), 1)
+        self.clock.now += 6
+        cache.get('certs')
+        self.assertEqual(len(self.fetches), 2)
+
+    def test_errors_are_not_cached(self):
+        cache = CertCache(lambda url: self.fetch(url, status=500))
+        cache.get('certs')
+        cache.get('certs')
+        self.assertEqual(len(self.fetches), 2)
+
+    def test_refreshes_in_background_near_expiry(self):
+        cache = CertCache(self.fetch)
+        cache.get('certs')
+        self.clock.now += 95
+        with mock.patch('accounts.google_certs.threading.Thread') as thread:
+            cache.get('certs')
+            cache.get('certs')
+        thread.assert_called_once()
+        self.assertEqual(len(self.fetches), 1)
+
+    def blocking_fetch(self):
+        """A fetch that waits for ``release`` and signals ``started`` when entered."""
+        started, release = threading.Event(), threading.Event()
+
+        def fetch(url):
+            started.set()
+            release.wait(5)
+            return self.fetch(url)
+        return fetch, started, release
+
+    def test_concurrent_cold_loads_fetch_once(self):
+        fetch, started, release = self.blocking_fetch()
+        cache = CertCache(fetch)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('certs'))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(self.fetches), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_expired_entry_served_while_another_caller_fetches(self):
+        fetch, started, release = self.blocking_fetch()
+        release.set()
+        cache = CertCache(fetch)
+        stale = cache.get('certs')
+        self.clock.now += 101
+        release.clear()
+        loader = threading.Thread(target=cache.get, args=('certs',))
+        loader.start()
+        started.wait(5)
+        self.assertIs(cache.get('certs'), stale)
+        release.set()
+        loader.join(5)
+        self.assertEqual(len(self.fetches), 2)
+        self.assertIsNot(cache.get('certs'), stale)
+
+    def test_prefetch_loads_in_background(self):
+        cache = CertCache(self.fetch)
+        with mock.patch('accounts.google_certs.threading.Thread') as thread:
+            cache.prefetch('certs')
+        thread.assert_called_once()
+        thread.call_args.kwargs['target'](*thread.call_args.kwargs['args'])
+        cache.get('certs')
+        self.assertEqual(self.fetches, ['certs'])
+
+    def test_transport_only_caches_plain_gets(self):
+        transport = mock.Mock()
+        request = CachedCertsRequest(CertCache(self.fetch), transport)
+        request('certs')
+        request('certs')
+        request('token', method='POST', body=b'x')
+        self.assertEqual(self.fetches, ['certs'])
+        transport.assert_called_once()
+
+
+class GoogleAuthTests(TestCase):
+    URL = '/api/auth/google/'
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        patcher = mock.patch('accounts.views.id_token.verify_oauth2_token')
+        self.verify = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.verify.return_value = {
+            'email': 'alice@example.com', 'name': 'Alice Smith', 'picture': 'https://example.com/a.png', 'sub': '42',
+        }
+
+    def login(self):
+        return self.client.post(self.URL, {'credential': 'token'}, content_type='application/json')
+
+    def test_creates_user_and_logs_in(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(email='alice@example.com')
+        self.assertEqual((user.first_name, user.last_name, user.google_id), ('Alice', 'Smith', '42'))
+        self.assertTrue(self.client.get('/api/auth/status/').json()['authenticated'])
+
+    def test_repeat_login_skips_unchanged_profile(self):
+        self.login()
+        with mock.patch.object(User, 'save') as save:
+            self.login()
+        # Only login() itself writes, to stamp last_login
+        save.assert_called_once_with(update_fields=['last_login'])
+        self.verify.return_value['name'] = 'Alice Jones'
+        self.login()
+        self.assertEqual(User.objects.get(email='alice@example.com').last_name, 'Jones')
+
+    def test_rejects_missing_or_invalid_credential(self):
+        self.assertEqual(self.client.post(self.URL, {}, content_type='application/json').status_code, 400)
+        self.verify.side_effect = ValueError
+        self.assertEqual(self.login().status_code, 400)
@@ -1,5 +1,5 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.decorators import api_view, permission_classes, authentication_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.response import Response
@@ -9,8 +9,9 @@ from django.http import JsonResponse
 from django.contrib.auth import get_user_model
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from google.auth.transport import requests
 from google.oauth2 import id_token
+from leetqode.throttling import TokenBucketThrottle
+from .google_certs import get_cert_request
 from .serializers import UserSerializer
 
 User = get_user_model()
@@ -27,6 +28,7 @@ def user_profile(request):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @authentication_classes([])  # No authentication required
+@throttle_classes([TokenBucketThrottle.scoped('auth')])  # Per IP
 @csrf_exempt
 def google_auth(request):
     """Handle Google OAuth2 authentication with JWT token."""
@@ -40,7 +42,7 @@ def google_auth(request):
         CLIENT_ID = getattr(settings, 'GOOGLE_OAUTH2_CLIENT_ID', '283307083033-qh48bj9liq495l3ge5s843s4uhm7q07j.apps.googleusercontent.com')
         
         try:
-            idinfo = id_token.verify_oauth2_token(credential, requests.Request(), CLIENT_ID)
+            idinfo = id_token.verify_oauth2_token(credential, get_cert_request(), CLIENT_ID)
         except ValueError:
             return Response({'error': 'Invalid token'}, status=status.HTTP_400_BAD_REQUEST)
         
@@ -65,13 +67,19 @@ def google_auth(request):
             }
         )
         
-        # Update user info if not created
+        # Update user info if not created, writing only fields that changed
         if not created:
-            user.first_name = name.split(' ')[0] if name else user.first_name
-            user.last_name = ' '.join(name.split(' ')[1:]) if name and len(name.split(' ')) > 1 else user.last_name
-            user.avatar = picture or user.avatar
-            user.google_id = google_id or user.google_id
-            user.save()
+            profile = {
+                'first_name': name.split(' ')[0] if name else user.first_name,
+                'last_name': ' '.join(name.split(' ')[1:]) if name and len(name.split(' ')) > 1 else user.last_name,
+                'avatar': picture or user.avatar,
+                'google_id': google_id or user.google_id,
+            }
+            changed = [field for field, value in profile.items() if getattr(user, field) != value]
+            if changed:
+                for field in changed:
+                    setattr(user, field, profile[field])
+                user.save(update_fields=changed)
         
         # Log the user in with the default backend
         login(request, user, backend='django.contrib.auth.backends.ModelBackend')
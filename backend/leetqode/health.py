@@ -0,0 +1,70 @@
+"""Database readiness checks for health probes.
+
+The check runs on a dedicated single worker thread, so it holds one
+long-lived connection of its own instead of borrowing a request thread's,
+and its result is reused for ``HEALTH_READINESS_TTL`` seconds so frequent
+probes from many load balancer nodes cost at most one ``SELECT 1`` per
+interval per process.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.db import connection
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='health-check')
+_lock = threading.Lock()
+_last_result = None
+
+
+class CheckResult:
+    def __init__(self, ok, latency_ms=None, error=None):
+        self.ok = ok
+        self.latency_ms = latency_ms
+        self.error = error
+        self.checked_at = time.monotonic()
+
+    def as_dict(self):
+        return {
+            'ok': self.ok,
+            'latency_ms': self.latency_ms,
+            'error': self.error,
+            'age_seconds': round(time.monotonic() - self.checked_at, 3),
+        }
+
+
+def _ping_database():
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except Exception:
+        # Drop a broken connection so the next check reconnects
+        connection.close()
+        raise
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+def check_database(force=False):
+    """Return the cached database ``CheckResult``, re-running it once stale."""
+    global _last_result
+    ttl = getattr(settings, 'HEALTH_READINESS_TTL', 5)
+    result = _last_result
+    if not force and result is not None and time.monotonic() - result.checked_at < ttl:
+        return result
+
+    with _lock:
+        result = _last_result
+        if not force and result is not None and time.monotonic() - result.checked_at < ttl:
+            return result
+        future = _executor.submit(_ping_database)
+        try:
+            result = CheckResult(True, latency_ms=future.result(timeout=getattr(settings, 'HEALTH_DB_TIMEOUT', 2)))
+        except TimeoutError:
+            result = CheckResult(False, error='timeout')
+        except Exception as e:
+            result = CheckResult(False, error=str(e))
+        _last_result = result
+        return result
@@ -0,0 +1,226 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from . import metrics
+from .routers import pinned_to_primary
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingSessionMiddleware:
+    """Slide session expiry forward without saving the session on every request.
+    
+    Replaces ``SESSION_SAVE_EVERY_REQUEST``: a non-empty session is only marked
+    modified (and so re-saved with a fresh expiry and cookie) once
+    ``SESSION_REFRESH_INTERVAL`` seconds have passed since its last refresh.
+    Must come after ``SessionMiddleware``. Works in sync and async stacks.
+    """
+    REFRESH_KEY = '_refreshed_at'
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.interval = getattr(settings, 'SESSION_REFRESH_INTERVAL', 3600)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.refresh(request, response)
+        return response
+    
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        # Reading the session may load it from the database or cache
+        await sync_to_async(self.refresh)(request, response)
+        return response
+    
+    def refresh(self, request, response):
+        session = getattr(request, 'session', None)
+        if session is None or session.is_empty() or response.status_code == 500:
+            return
+        
+        now = int(time.time())
+        if now - session.get(self.REFRESH_KEY, 0) >= self.interval:
+            session[self.REFRESH_KEY] = now
+
+
+class ReplicaPinningMiddleware:
+    """Pin a client to the primary database for a short window after it writes.
+    
+    A successful unsafe request sets a ``primary_until`` cookie; while it is
+    valid, views opted in to replica reads (``routers.use_replicas``) read
+    from the primary instead. Not used when ``DATABASE_REPLICAS`` is empty.
+    Works in sync and async stacks.
+    """
+    COOKIE = 'primary_until'
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        if not getattr(settings, 'DATABASE_REPLICAS', []):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.window = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with pinned_to_primary(self.is_pinned(request)):
+            response = self.get_response(request)
+        self.pin_after_write(request, response)
+        return response
+    
+    async def __acall__(self, request):
+        # The pin is a context variable, so it reaches sync_to_async threads
+        with pinned_to_primary(self.is_pinned(request)):
+            response = await self.get_response(request)
+        self.pin_after_write(request, response)
+        return response
+    
+    def is_pinned(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(self.COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        return pinned_until > time.time()
+    
+    def pin_after_write(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            response.set_cookie(
+                self.COOKIE, str(int(time.time() + self.window)),
+                max_age=self.window, httponly=True, samesite='Lax',
+            )
+
+
+class _QueryRecorder:
+    """``execute_wrapper`` hook counting statements and summing their time."""
+    
+    def __init__(self):
+        self.statements = Counter()
+        self.duration = 0.0
+        self._lock = threading.Lock()
+    
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.duration += elapsed
+                self.statements[sql] += 1
+    
+    @property
+    def count(self):
+        return sum(self.statements.values())
+
+
+# Recorder of the request being handled; copied into ``sync_to_async`` threads
+_recorder = ContextVar('request_query_recorder', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def _install_query_hook(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class RequestMetricsMiddleware:
+    """Record per-view latency, SQL count/time and render time into ``leetqode.metrics``.
+    
+    Requests that run one SQL statement (same SQL, any parameters) more than
+    ``METRICS_N_PLUS_ONE_THRESHOLD`` times are logged and counted as likely
+    N+1 patterns. Enabled with ``METRICS_ENABLED``.
+    
+    Works in sync and async stacks. Every connection, in any thread, carries
+    one query hook that reports to the current request's recorder through a
+    context variable, so queries an async view runs via ``sync_to_async``
+    are counted too. Connections get the hook when they connect, so the
+    middleware must load (as it does when the server starts) before other
+    threads open theirs.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.n_plus_one_threshold = getattr(settings, 'METRICS_N_PLUS_ONE_THRESHOLD', 10)
+        connection_created.connect(_install_query_hook, dispatch_uid='leetqode.metrics.query_hook')
+        for connection in connections.all():
+            _install_query_hook(connection)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        recorder = _QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self._observe(request, recorder, started)
+        return response
+    
+    async def __acall__(self, request):
+        recorder = _QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self._observe(request, recorder, started)
+        return response
+    
+    def _observe(self, request, recorder, started):
+        finished = time.perf_counter()
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match._func_path) if match else 'unmatched'
+        metrics.REQUEST_LATENCY.observe(finished - started, view=view, method=request.method)
+        metrics.REQUEST_DB_TIME.observe(recorder.duration, view=view)
+        metrics.REQUEST_QUERIES.observe(recorder.count, view=view)
+        render_started = getattr(request, '_metrics_render_started', None)
+        if render_started is not None:
+            metrics.REQUEST_RENDER_TIME.observe(finished - render_started, view=view)
+        
+        if recorder.statements:
+            sql, repeats = recorder.statements.most_common(1)[0]
+            if repeats > self.n_plus_one_threshold:
+                metrics.N_PLUS_ONE.inc(view=view)
+                logger.warning(
+                    'Possible N+1 in %s: statement ran %d times: %s', view, repeats, sql[:200]
+                )
+    
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook returns
+        request._metrics_render_started = time.perf_counter()
+        return response
@@ -0,0 +1,90 @@
+"""Read-replica routing with read-your-writes consistency.
+
+Views opt in to replica reads with ``use_replicas`` (catalogue listings and
+stats). Only models of ``REPLICA_APPS`` are read from a replica there, so
+session, user and other framework lookups made while serving those views
+stay on the primary. Everything else, every write, and any read inside a
+transaction goes to ``default``. After a user's successful write,
+``leetqode.middleware.ReplicaPinningMiddleware`` pins their requests to the primary for
+``REPLICA_PIN_SECONDS`` via a cookie, so they never read data older than
+their own last review while a replica catches up.
+"""
+import asyncio
+import contextvars
+import functools
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Apps whose models opted-in views may read from a replica
+REPLICA_APPS = {'problems'}
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+_pinned = contextvars.ContextVar('pinned_to_primary', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Let reads in this block go to a replica unless the request is pinned."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def pinned_to_primary(pinned=True):
+    """Send every read in this block to the primary when ``pinned``."""
+    token = _pinned.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def use_replicas(view):
+    """Decorator running a (sync or async) view under ``replica_reads``."""
+    if asyncio.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with replica_reads():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Route opted-in reads to a random replica from ``DATABASE_REPLICAS``."""
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if (
+            not replicas
+            or not _replica_reads.get()
+            or model._meta.app_label not in REPLICA_APPS
+            or _pinned.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas normally receive the schema through replication; allowing
+        # them lets ``migrate --database replica1`` set up standalone copies
+        return db == DEFAULT_DB_ALIAS or db in getattr(settings, 'DATABASE_REPLICAS', [])
@@ -3,7 +3,7 @@ Django settings for leetqode project.
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +45,7 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'leetqode.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -52,6 +53,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'leetqode.middleware.SlidingSessionMiddleware',
+    'leetqode.middleware.ReplicaPinningMiddleware',
     'allauth.account.middleware.AccountMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -88,6 +91,9 @@ try:
             conn_health_checks=True,
         )
     }
+    # Read replicas, e.g. DATABASE_REPLICA_URLS=postgres://replica1/leetqode,postgres://replica2/leetqode
+    for index, url in enumerate(config('DATABASE_REPLICA_URLS', default='', cast=Csv()), start=1):
+        DATABASES[f'replica{index}'] = dj_database_url.parse(url, conn_max_age=600, conn_health_checks=True)
 except ImportError:
     # Fallback to SQLite if dj_database_url is not installed
     DATABASES = {
@@ -97,6 +103,12 @@ except ImportError:
         }
     }
 
+# Catalogue and stats views read from replicas (see leetqode/routers.py); after a
+# write the client is pinned to the primary for REPLICA_PIN_SECONDS
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica')]
+DATABASE_ROUTERS = ['leetqode.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -137,6 +149,88 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Token buckets per user (or IP when anonymous) and scope, see leetqode/throttling.py;
+    # an empty rate disables a scope
+    'DEFAULT_THROTTLE_CLASSES': [
+        'leetqode.throttling.TokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'default': config('THROTTLE_DEFAULT_RATE', default='600/min'),
+        'dashboard': config('THROTTLE_DASHBOARD_RATE', default='60/min'),
+        'auth': config('THROTTLE_AUTH_RATE', default='10/min'),
+    },
+    # Proxies in front of the app, so client IPs come from X-Forwarded-For
+    'NUM_PROXIES': config('NUM_PROXIES', default=None, cast=lambda value: int(value) if value else None),
+}
+
+# Caching
+# Defaults to an in-process LRU cache; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# cache (e.g. django.core.cache.backends.redis.RedisCache) when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='leetqode'),
+    }
+}
+# Values that every process must see the same way, such as the due counts the job worker
+# prepares. This reuses the default cache when that one is shared; otherwise it falls back
+# to a database table (created by migrations or `manage.py createcachetable`).
+if CACHES['default']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache':
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'leetqode_cache',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    }
+else:
+    CACHES['shared'] = CACHES['default']
+SHARED_CACHE_ALIAS = 'shared'
+
+# Token buckets (see leetqode/throttling.py) must be shared by every worker
+THROTTLE_CACHE_ALIAS = SHARED_CACHE_ALIAS
+THROTTLE_LOCK_WAIT = config('THROTTLE_LOCK_WAIT', default=0.05, cast=float)  # seconds to wait for a client's bucket
+
+# Problem catalogue cache (see problems/catalogue.py)
+CATALOGUE_CACHE_ALIAS = 'default'
+CATALOGUE_CACHE_TIMEOUT = config('CATALOGUE_CACHE_TIMEOUT', default=300, cast=int)
+CATALOGUE_VERSION_TTL = config('CATALOGUE_VERSION_TTL', default=1, cast=float)  # seconds a process reuses the version it read
+
+# Health probes
+HEALTH_READINESS_TTL = config('HEALTH_READINESS_TTL', default=5, cast=int)  # seconds a DB check is reused
+HEALTH_DB_TIMEOUT = config('HEALTH_DB_TIMEOUT', default=2, cast=float)  # seconds before the DB counts as down
+HEALTH_STATUS_ENABLED = config('HEALTH_STATUS_ENABLED', default=DEBUG, cast=bool)  # /api/health/status/
+
+# Request metrics (leetqode/metrics.py), scraped from /api/metrics/
+METRICS_ENABLED = config('METRICS_ENABLED', default=DEBUG, cast=bool)
+# Flag requests that run the same SQL statement more than this many times
+METRICS_N_PLUS_ONE_THRESHOLD = config('METRICS_N_PLUS_ONE_THRESHOLD', default=10, cast=int)
+
+# Problem statistics
+# Serve /api/stats/ from the materialized per-user summary row
+PROBLEM_STATS_USE_SUMMARY = config('PROBLEM_STATS_USE_SUMMARY', default=False, cast=bool)
+# Filter /api/user/problems/ by the difficulty and tag mask copied onto UserProblem
+PROBLEM_FILTERS_USE_DENORMALIZED = config('PROBLEM_FILTERS_USE_DENORMALIZED', default=False, cast=bool)
+
+# Spaced repetition scheduler: heuristic, sm2, fsrs or a dotted path to a Scheduler subclass.
+# Run `manage.py replan_queue` after changing it to reschedule existing queues.
+SPACED_REPETITION_SCHEDULER = config('SPACED_REPETITION_SCHEDULER', default='heuristic')
+
+# Live updates stream (/api/events/, ASGI only)
+EVENTS_HEARTBEAT_INTERVAL = config('EVENTS_HEARTBEAT_INTERVAL', default=15, cast=int)  # seconds between keepalives
+EVENTS_POLL_INTERVAL = config('EVENTS_POLL_INTERVAL', default=5, cast=int)  # seconds between checks for other processes' changes
+EVENTS_STREAM_MAX_AGE = config('EVENTS_STREAM_MAX_AGE', default=300, cast=int)  # seconds before the client reconnects
+EVENTS_QUEUE_SIZE = config('EVENTS_QUEUE_SIZE', default=100, cast=int)  # pending events per stream before a resync
+
+# Background jobs (manage.py run_jobs)
+JOBS_WORKER_THREADS = config('JOBS_WORKER_THREADS', default=2, cast=int)
+JOBS_POLL_INTERVAL = config('JOBS_POLL_INTERVAL', default=1.0, cast=float)  # seconds between queue polls
+JOBS_LOCK_TIMEOUT = config('JOBS_LOCK_TIMEOUT', default=3600, cast=int)  # requeue running jobs older than this
+# Daily jobs: job name -> local time (HH:MM) to run at
+JOBS_SCHEDULE = {
+    'prepare_review_queues': '23:30',
+    'rollup_reviews': '00:30',
+    'replan_overdue': '02:00',
+    'refresh_summaries': '03:00',
+    'prune_jobs': '04:00',
 }
 
 # CORS settings
@@ -171,12 +265,16 @@ CORS_EXPOSE_HEADERS = [
 ]
 
 # Session Configuration
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Sessions are read from the cache and written through to the database; use
+# django.contrib.sessions.backends.signed_cookies to keep them off the database entirely.
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.cached_db')
 SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
-SESSION_SAVE_EVERY_REQUEST = True
+# Expiry slides forward via SlidingSessionMiddleware, at most once per refresh interval
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_INTERVAL = config('SESSION_REFRESH_INTERVAL', default=3600, cast=int)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
 # CSRF Configuration
@@ -201,6 +299,11 @@ SITE_ID = 1
 # Google OAuth2 settings
 from decouple import config
 GOOGLE_OAUTH2_CLIENT_ID = config('GOOGLE_OAUTH2_CLIENT_ID', default='283307083033-qh48bj9liq495l3ge5s843s4uhm7q07j.apps.googleusercontent.com')
+# Google's signing certs are cached in-process (see accounts/google_certs.py);
+# the TTL applies when the response has no Cache-Control max-age.
+GOOGLE_CERTS_CACHE_TTL = config('GOOGLE_CERTS_CACHE_TTL', default=3600, cast=int)
+# Path to a JSON file of certificates to verify tokens against instead of fetching Google's
+GOOGLE_OAUTH2_CERTS_FILE = config('GOOGLE_OAUTH2_CERTS_FILE', default='')
 
 SOCIALACCOUNT_PROVIDERS = {
     'google': {
@@ -0,0 +1,76 @@
+import time
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from leetqode import health
+
+
+class HealthTestCase(TestCase):
+
+    def setUp(self):
+        health._last_result = None
+        self.addCleanup(setattr, health, '_last_result', None)
+
+
+class CheckDatabaseTests(HealthTestCase):
+
+    def test_result_is_reused_within_ttl(self):
+        with mock.patch.object(health, '_ping_database', return_value=1.5) as ping:
+            first = health.check_database()
+            self.assertIs(health.check_database(), first)
+            self.assertIsNot(health.check_database(force=True), first)
+        self.assertEqual(ping.call_count, 2)
+        self.assertEqual((first.ok, first.latency_ms), (True, 1.5))
+
+    @override_settings(HEALTH_READINESS_TTL=0)
+    def test_rechecks_once_stale(self):
+        with mock.patch.object(health, '_ping_database', return_value=1.0) as ping:
+            health.check_database()
+            health.check_database()
+        self.assertEqual(ping.call_count, 2)
+
+    def test_failure(self):
+        with mock.patch.object(health, '_ping_database', side_effect=RuntimeError('down')):
+            result = health.check_database()
+        self.assertEqual((result.ok, result.error), (False, 'down'))
+
+    @override_settings(HEALTH_DB_TIMEOUT=0.01)
+    def test_timeout(self):
+        with mock.patch.object(health, '_ping_database', side_effect=lambda: time.sleep(0.2)):
+            result = health.check_database()
+        self.assertEqual((result.ok, result.error), (False, 'timeout'))
+
+    def test_pings_real_database(self):
+        self.assertTrue(health.check_database().ok)
+
+
+class ProbeViewTests(HealthTestCase):
+
+    def test_liveness_skips_database(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/health/live/')
+        self.assertEqual(response.json(), {'status': 'alive'})
+        self.assertEqual(self.client.head('/api/health/live/').status_code, 200)
+
+    def test_readiness(self):
+        response = self.client.get('/api/health/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'ready')
+
+    def test_readiness_unavailable(self):
+        with mock.patch.object(health, '_ping_database', side_effect=RuntimeError('down')):
+            response = self.client.get('/api/health/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['database']['error'], 'down')
+
+    def test_status_disabled_by_default(self):
+        with override_settings(HEALTH_STATUS_ENABLED=False):
+            self.assertEqual(self.client.get('/api/health/status/').status_code, 404)
+
+    @override_settings(HEALTH_STATUS_ENABLED=True)
+    def test_status(self):
+        data = self.client.get('/api/health/status/').json()
+        self.assertEqual(data['status'], 'ready')
+        self.assertIn('hit_rate', data['catalogue_cache'])
+        self.assertIsNotNone(data['jobs'])
@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from leetqode import metrics
+from leetqode.middleware import RequestMetricsMiddleware
+from problems.models import Problem
+
+
+def sample(metric, name, view):
+    for sample_name, labels, value in metric.samples():
+        if sample_name == name and dict(labels).get('view') == view:
+            return value
+    return None
+
+
+def make_request(view):
+    request = RequestFactory().get('/')
+    request.resolver_match = SimpleNamespace(view_name=view, _func_path=view)
+    return request
+
+
+def run_queries(count):
+    for _ in range(count):
+        Problem.objects.filter(pk=1).exists()
+
+
+class MetricsRegistryTests(SimpleTestCase):
+
+    def test_histogram_buckets(self):
+        histogram = metrics.Histogram('h', 'doc', buckets=(1, 5))
+        for value in (0, 3, 10):
+            histogram.observe(value, view='v')
+        samples = {(name, dict(labels).get('le')): value for name, labels, value in histogram.samples()}
+        self.assertEqual(samples[('h_bucket', '1')], 1)
+        self.assertEqual(samples[('h_bucket', '5')], 2)
+        self.assertEqual(samples[('h_bucket', '+Inf')], 3)
+        self.assertEqual((samples[('h_sum', None)], samples[('h_count', None)]), (13, 3))
+
+    def test_render(self):
+        registry = metrics.Registry()
+        counter = registry.register(metrics.Counter('c_total', 'Things.'))
+        counter.inc(view='say "hi"')
+        self.assertEqual(
+            registry.render(),
+            '# HELP c_total Things.\n# TYPE c_total counter\nc_total{view="say \\"hi\\""} 1.0\n',
+        )
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_N_PLUS_ONE_THRESHOLD=3)
+class RequestMetricsMiddlewareTests(TestCase):
+
+    def test_counts_sync_queries(self):
+        def view(request):
+            run_queries(2)
+            return HttpResponse()
+
+        RequestMetricsMiddleware(view)(make_request('sync-view'))
+        self.assertEqual(sample(metrics.REQUEST_QUERIES, 'leetqode_request_queries_sum', 'sync-view'), 2)
+        self.assertEqual(sample(metrics.REQUEST_LATENCY, 'leetqode_request_duration_seconds_count', 'sync-view'), 1)
+
+    def test_counts_async_queries(self):
+        async def view(request):
+            await sync_to_async(run_queries)(2)
+            await Problem.objects.filter(pk=1).aexists()
+            return HttpResponse()
+
+        middleware = RequestMetricsMiddleware(view)
+        asyncio.run(middleware(make_request('async-view')))
+        self.assertEqual(sample(metrics.REQUEST_QUERIES, 'leetqode_request_queries_sum', 'async-view'), 3)
+
+    def test_flags_n_plus_one(self):
+        def view(request):
+            run_queries(4)
+            return HttpResponse()
+
+        with self.assertLogs('leetqode.middleware', 'WARNING'):
+            RequestMetricsMiddleware(view)(make_request('n-plus-one-view'))
+        self.assertEqual(sample(metrics.N_PLUS_ONE, 'leetqode_n_plus_one_total', 'n-plus-one-view'), 1)
+
+    def test_queries_outside_requests_are_not_counted(self):
+        RequestMetricsMiddleware(lambda request: HttpResponse())(make_request('idle-view'))
+        run_queries(1)
+        self.assertEqual(sample(metrics.REQUEST_QUERIES, 'leetqode_request_queries_sum', 'idle-view'), 0)
+
+    def test_metrics_endpoint(self):
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('# TYPE leetqode_request_duration_seconds histogram', response.content.decode())
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_metrics_endpoint_disabled(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 404)
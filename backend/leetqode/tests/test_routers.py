@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from leetqode.middleware import ReplicaPinningMiddleware
+from leetqode.routers import ReplicaRouter, pinned_to_primary, replica_reads, use_replicas
+from problems.models import Problem
+
+COOKIE = ReplicaPinningMiddleware.COOKIE
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_stay_on_primary_by_default(self):
+        self.assertEqual(self.router.db_for_read(Problem), 'default')
+
+    def test_opted_in_reads_use_replica(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Problem), 'replica1')
+            self.assertEqual(self.router.db_for_write(Problem), 'default')
+
+    def test_only_replica_apps(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(get_user_model()), 'default')
+            self.assertEqual(self.router.db_for_read(Session), 'default')
+
+    def test_pinned_reads_use_primary(self):
+        with replica_reads(), pinned_to_primary():
+            self.assertEqual(self.router.db_for_read(Problem), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Problem), 'default')
+
+    def test_allow_migrate(self):
+        self.assertTrue(self.router.allow_migrate('default', 'problems'))
+        self.assertTrue(self.router.allow_migrate('replica1', 'problems'))
+        self.assertFalse(self.router.allow_migrate('other', 'problems'))
+
+    def test_use_replicas_wraps_sync_and_async_views(self):
+        router = self.router
+
+        @use_replicas
+        def view():
+            return router.db_for_read(Problem)
+
+        @use_replicas
+        async def async_view():
+            return router.db_for_read(Problem)
+
+        self.assertEqual(view(), 'replica1')
+        self.assertTrue(asyncio.iscoroutinefunction(async_view))
+        self.assertEqual(asyncio.run(async_view()), 'replica1')
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_PIN_SECONDS=10)
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.read_from = []
+
+    @use_replicas
+    def view(self, request):
+        self.read_from.append(ReplicaRouter().db_for_read(Problem))
+        return HttpResponse(status=400 if request.GET.get('fail') else 200)
+
+    def test_unused_without_replicas(self):
+        with override_settings(DATABASE_REPLICAS=[]), self.assertRaises(MiddlewareNotUsed):
+            ReplicaPinningMiddleware(self.view)
+
+    def test_write_pins_client(self):
+        middleware = ReplicaPinningMiddleware(self.view)
+        response = middleware(self.factory.post('/'))
+        self.assertGreater(int(response.cookies[COOKIE].value), time.time())
+        self.assertEqual(response.cookies[COOKIE]['max-age'], 10)
+        self.assertNotIn(COOKIE, middleware(self.factory.get('/')).cookies)
+        self.assertNotIn(COOKIE, middleware(self.factory.post('/?fail=1')).cookies)
+
+    def test_pinned_client_reads_primary(self):
+        middleware = ReplicaPinningMiddleware(self.view)
+        middleware(self.factory.get('/'))
+        pinned = self.factory.get('/')
+        pinned.COOKIES[COOKIE] = str(int(time.time()) + 5)
+        middleware(pinned)
+        expired = self.factory.get('/')
+        expired.COOKIES[COOKIE] = str(int(time.time()) - 5)
+        middleware(expired)
+        self.assertEqual(self.read_from, ['replica1', 'default', 'replica1'])
+
+    def test_async(self):
+        async def view(request):
+            return self.view(request)
+
+        middleware = ReplicaPinningMiddleware(view)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        request = self.factory.get('/')
+        request.COOKIES[COOKIE] = str(int(time.time()) + 5)
+        asyncio.run(middleware(request))
+        response = asyncio.run(middleware(self.factory.post('/')))
+        self.assertEqual(self.read_from, ['default', 'replica1'])
+        self.assertIn(COOKIE, response.cookies)
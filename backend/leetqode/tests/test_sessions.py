@@ -0,0 +1,72 @@
+import asyncio
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from leetqode.middleware import SlidingSessionMiddleware
+from problems.tests.utils import make_user
+
+REFRESH_KEY = SlidingSessionMiddleware.REFRESH_KEY
+
+
+def make_request(session_data=None):
+    request = RequestFactory().get('/')
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+    if session_data:
+        request.session.update(session_data)
+        request.session.modified = False
+    return request
+
+
+@override_settings(SESSION_REFRESH_INTERVAL=60)
+class SlidingSessionTests(TestCase):
+
+    def run_middleware(self, request, status=200):
+        middleware = SlidingSessionMiddleware(lambda request: HttpResponse(status=status))
+        return middleware(request)
+
+    def test_refreshes_stale_session(self):
+        request = make_request({'user': 1, REFRESH_KEY: int(time.time()) - 120})
+        self.run_middleware(request)
+        self.assertTrue(request.session.modified)
+        self.assertGreaterEqual(request.session[REFRESH_KEY], int(time.time()) - 1)
+
+    def test_leaves_recent_session(self):
+        request = make_request({'user': 1, REFRESH_KEY: int(time.time())})
+        self.run_middleware(request)
+        self.assertFalse(request.session.modified)
+
+    def test_skips_empty_session_and_errors(self):
+        request = make_request()
+        self.run_middleware(request)
+        self.assertFalse(request.session.modified)
+        request = make_request({'user': 1})
+        self.run_middleware(request, status=500)
+        self.assertFalse(request.session.modified)
+
+    def test_async(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        middleware = SlidingSessionMiddleware(get_response)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        request = make_request({'user': 1})
+        asyncio.run(middleware(request))
+        self.assertIn(REFRESH_KEY, request.session)
+
+
+class SessionCookieTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(make_user())
+
+    def test_cookie_only_resent_after_interval(self):
+        self.client.get('/api/auth/status/')
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, self.client.get('/api/auth/status/').cookies)
+        with override_settings(SESSION_REFRESH_INTERVAL=0):
+            # The interval is read when the middleware is built
+            self.client.handler.load_middleware()
+            self.assertIn(settings.SESSION_COOKIE_NAME, self.client.get('/api/auth/status/').cookies)
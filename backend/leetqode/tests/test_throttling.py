@@ -0,0 +1,145 @@
+import threading
+import time
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, override_settings
+
+from leetqode import throttling
+from leetqode.throttling import TokenBucketThrottle, parse_rate
+from problems.tests.utils import APITestCase
+
+
+def rates(**scopes):
+    return override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': scopes})
+
+
+class ParseRateTests(SimpleTestCase):
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('60/min'), (60, 60))
+        self.assertEqual(parse_rate('5/s'), (5, 1))
+        self.assertEqual(parse_rate('100/day'), (100, 86400))
+        self.assertIsNone(parse_rate(None))
+
+
+# time.time is mocked process-wide, which the database cache's expiry reads too
+@rates(default='3/min')
+@override_settings(THROTTLE_CACHE_ALIAS='default')
+class TokenBucketTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        patcher = mock.patch('leetqode.throttling.time.time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1')
+
+    def allow(self, request=None):
+        return TokenBucketThrottle().allow_request(request or self.request, None)
+
+    def test_bursts_then_refills(self):
+        self.assertEqual([self.allow() for _ in range(4)], [True, True, True, False])
+        self.now += 20
+        self.assertTrue(self.allow())
+        self.assertFalse(self.allow())
+
+    def test_retry_after(self):
+        for _ in range(3):
+            self.allow()
+        throttle = TokenBucketThrottle()
+        self.assertFalse(throttle.allow_request(self.request, None))
+        self.assertAlmostEqual(throttle.wait(), 20)
+
+    def test_separate_buckets_per_client(self):
+        for _ in range(3):
+            self.allow()
+        self.assertTrue(self.allow(RequestFactory().get('/', REMOTE_ADDR='10.0.0.2')))
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1')
+        request.user = self.user
+        self.assertTrue(self.allow(request))
+
+    @rates()
+    def test_scopes_without_rate_are_not_throttled(self):
+        self.assertTrue(all(self.allow() for _ in range(10)))
+
+    def test_falls_back_to_local_buckets(self):
+        broken = mock.Mock(get=mock.Mock(side_effect=ConnectionError), set=mock.Mock(side_effect=ConnectionError))
+        self.addCleanup(throttling._local_buckets.clear)
+        with mock.patch.object(TokenBucketThrottle, '_cache', return_value=broken), self.assertLogs('leetqode.throttling'):
+            self.assertEqual([self.allow() for _ in range(4)], [True, True, True, False])
+
+
+@rates(default='5/min')
+class SharedBucketTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1')
+
+    def allow(self):
+        return TokenBucketThrottle().allow_request(self.request, None)
+
+    def test_buckets_live_in_the_shared_cache(self):
+        self.assertEqual(settings.THROTTLE_CACHE_ALIAS, settings.SHARED_CACHE_ALIAS)
+        self.assertEqual([self.allow() for _ in range(6)], [True] * 5 + [False])
+        self.assertIsNotNone(caches[settings.SHARED_CACHE_ALIAS].get('throttle:default:ip:10.0.0.1'))
+
+    @override_settings(THROTTLE_CACHE_ALIAS='default', THROTTLE_LOCK_WAIT=5)
+    def test_concurrent_requests_spend_each_token_once(self):
+        # Each thread has its own cache instance, so slow down the backend class
+        backend = type(caches['default'])
+        get = backend.get
+
+        def slow_get(cache, *args, **kwargs):
+            # Widen the window between reading and writing the bucket
+            value = get(cache, *args, **kwargs)
+            time.sleep(0.01)
+            return value
+
+        results = []
+        with mock.patch.object(backend, 'get', slow_get):
+            threads = [threading.Thread(target=lambda: results.append(self.allow())) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(sorted(results), [False] * 5 + [True] * 5)
+
+    @override_settings(THROTTLE_LOCK_WAIT=0)
+    def test_locked_bucket_counts_as_throttled(self):
+        caches[settings.SHARED_CACHE_ALIAS].set('throttle:default:ip:10.0.0.1:lock', 1)
+        throttle = TokenBucketThrottle()
+        self.assertFalse(throttle.allow_request(self.request, None))
+        self.assertAlmostEqual(throttle.wait(), 12)
+
+
+class ThrottledViewTests(APITestCase):
+
+    @rates(default='100/min', dashboard='2/min')
+    def test_dashboard_scope(self):
+        statuses = [self.client.get('/api/dashboard/').status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertIn('Retry-After', self.client.get('/api/dashboard/'))
+        self.assertEqual(self.client.get('/api/stats/').status_code, 200)
+
+    @rates(auth='1/min')
+    def test_auth_scope_by_ip(self):
+        self.client.logout()
+        url = '/api/auth/google/'
+        self.assertEqual(self.client.post(url, {}, content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.post(url, {}, content_type='application/json').status_code, 429)
+
+    @rates(default='100/min', dashboard='1/min')
+    async def test_async_views(self):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.user)
+        self.assertEqual((await client.get('/api/async/dashboard/')).status_code, 200)
+        response = await client.get('/api/async/dashboard/')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertIn('throttled', response.json()['detail'])
+        self.assertEqual((await client.get('/api/async/stats/')).status_code, 200)
@@ -0,0 +1,143 @@
+"""Token-bucket throttling for DRF views.
+
+A scope's rate from ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``, e.g.
+``'60/min'``, gives every client a bucket of 60 tokens refilled at 60 per
+minute: a client can burst up to the full bucket, then is held to the
+sustained rate. Clients are users when authenticated and IP addresses
+otherwise. Views pick a scope with ``throttle_scope`` (class-based views) or
+``@throttle_classes([TokenBucketThrottle.scoped('name')])``; scopes without a
+rate are not throttled. Plain async views call ``acheck_throttle`` instead.
+
+Buckets live in the ``THROTTLE_CACHE_ALIAS`` cache, the shared cache by
+default, so every worker draws from the same bucket. Each update holds a
+short lock taken with the cache's atomic ``add``, so concurrent requests
+never spend the same token; a request that can't get the lock within
+``THROTTLE_LOCK_WAIT`` seconds counts as over the limit. While the cache is
+unreachable, buckets are kept in process memory instead of failing requests.
+"""
+import logging
+import math
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Fallback buckets when the cache is unavailable
+_local_buckets = {}
+_local_lock = threading.Lock()
+_LOCAL_MAX_BUCKETS = 10000
+
+# Seconds before a lock left behind by a crashed worker expires
+_LOCK_TIMEOUT = 2
+
+
+def parse_rate(rate):
+    """``'60/min'`` -> ``(60, 60)``: bucket capacity and seconds to refill it; None when unset."""
+    if not rate:
+        return None
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttle each client of a scope with a token bucket."""
+    scope = 'default'
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    @classmethod
+    def scoped(cls, scope):
+        """Subclass throttling ``scope``, for function views."""
+        return type(f'{cls.__name__}_{scope}', (cls,), {'scope': scope})
+
+    def __init__(self):
+        self.retry_after = None
+
+    def get_scope(self, view):
+        return getattr(view, 'throttle_scope', None) or self.scope
+
+    def get_cache_key(self, request, view):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            ident = f'user:{user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return self.cache_format % {'scope': self.get_scope(view), 'ident': ident}
+
+    def allow_request(self, request, view):
+        rate = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(self.get_scope(view)))
+        if rate is None:
+            return True
+        capacity, period = rate
+        key = self.get_cache_key(request, view)
+        try:
+            return self._update_shared(key, capacity, period)
+        except Exception:
+            logger.warning('Throttle cache unavailable, using process-local buckets', exc_info=True)
+        with _local_lock:
+            allowed, bucket = self._take(_local_buckets.get(key), capacity, period)
+            if len(_local_buckets) >= _LOCAL_MAX_BUCKETS:
+                _local_buckets.clear()
+            _local_buckets[key] = bucket
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+    def _cache(self):
+        return caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+
+    def _take(self, bucket, capacity, period):
+        """Spend a token of ``bucket``: ``(allowed, bucket to store)``."""
+        now = time.time()
+        tokens, updated = bucket or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * capacity / period)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            self.retry_after = (1 - tokens) * period / capacity
+        return allowed, (tokens, now)
+
+    def _update_shared(self, key, capacity, period):
+        cache = self._cache()
+        lock_key = f'{key}:lock'
+        deadline = time.monotonic() + getattr(settings, 'THROTTLE_LOCK_WAIT', 0.05)
+        while not cache.add(lock_key, 1, _LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                # More concurrent requests from one client than we wait for
+                self.retry_after = period / capacity
+                return False
+            time.sleep(0.002)
+        try:
+            allowed, bucket = self._take(cache.get(key), capacity, period)
+            # An idle bucket refills within ``period``, so it can expire then
+            cache.set(key, bucket, math.ceil(period))
+        finally:
+            cache.delete(lock_key)
+        return allowed
+
+
+async def acheck_throttle(request, scope='default'):
+    """Throttle a plain async view like DRF would: None when allowed, else a 429 response.
+    
+    Call it after authenticating, as DRF does, so users get their own bucket.
+    """
+    throttle = TokenBucketThrottle.scoped(scope)()
+    # The cache and the lazy ``request.user`` are synchronous
+    if await sync_to_async(throttle.allow_request)(request, None):
+        return None
+    wait = throttle.wait()
+    response = JsonResponse({'detail': Throttled(wait).detail}, status=429)
+    if wait is not None:
+        response['Retry-After'] = str(math.ceil(wait))
+    return response
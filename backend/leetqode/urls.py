@@ -13,6 +13,11 @@ urlpatterns = [
     path('api/auth/', include('accounts.urls')),
     path('api/', include('problems.urls')),
     path('api/health/', views.health_check, name='health_check'),
+    path('api/health/live/', views.liveness, name='health_liveness'),
+    path('api/health/ready/', views.readiness, name='health_readiness'),
+    path('api/health/status/', views.health_status, name='health_status'),
+    path('api/metrics/', views.metrics_view, name='metrics'),
+    path('api/async/health/', views.async_health_check, name='async_health_check'),
     path('api/public/problems/', views.public_problems, name='public_problems'),
 ]
 
@@ -1,7 +1,14 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from problems import catalogue
+from problems.catalogue import CatalogueEntry, aproblem_count, problem_count
+from problems.jobs import queue_stats
 from problems.models import Problem
+from . import metrics
+from .routers import use_replicas
+from .health import check_database
 
 
 @csrf_exempt
@@ -11,14 +18,66 @@ def health_check(request):
     return JsonResponse({
         'status': 'healthy',
         'message': 'LeetQode API is running',
-        'total_problems': Problem.objects.count()
+        'total_problems': problem_count()
     })
 
 
+@csrf_exempt
+@require_http_methods(["GET", "HEAD"])
+def liveness(request):
+    """Liveness probe: the process is serving requests. Never touches the database."""
+    return JsonResponse({'status': 'alive'})
+
+
+@csrf_exempt
+@require_http_methods(["GET", "HEAD"])
+def readiness(request):
+    """Readiness probe backed by a cached, time-limited database check."""
+    result = check_database()
+    return JsonResponse(
+        {'status': 'ready' if result.ok else 'unavailable', 'database': result.as_dict()},
+        status=200 if result.ok else 503
+    )
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
-def public_problems(request):
-    """Get a few sample problems without authentication."""
+def health_status(request):
+    """Detailed status for operators; enabled with HEALTH_STATUS_ENABLED."""
+    if not getattr(settings, 'HEALTH_STATUS_ENABLED', False):
+        raise Http404
+    result = check_database(force=True)
+    lookups = catalogue.stats['hits'] + catalogue.stats['misses']
+    return JsonResponse({
+        'status': 'ready' if result.ok else 'unavailable',
+        'database': result.as_dict(),
+        'catalogue_cache': dict(
+            catalogue.stats,
+            hit_rate=round(catalogue.stats['hits'] / lookups, 4) if lookups else None
+        ),
+        'jobs': queue_stats() if result.ok else None,
+    }, status=200 if result.ok else 503)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """Request metrics in the Prometheus text format; enabled with METRICS_ENABLED."""
+    if not getattr(settings, 'METRICS_ENABLED', False):
+        raise Http404
+    return HttpResponse(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+async def async_health_check(request):
+    """ASGI-native health check."""
+    return JsonResponse({
+        'status': 'healthy',
+        'message': 'LeetQode API is running',
+        'total_problems': await aproblem_count()
+    })
+
+
+def _public_problems_payload():
     problems = Problem.objects.all()[:5]
     data = []
     for problem in problems:
@@ -30,8 +89,22 @@ def public_problems(request):
             'url': problem.url
         })
     
-    return JsonResponse({
+    return {
         'problems': data,
-        'total': Problem.objects.count(),
+        'total': problem_count(),
         'message': 'Sample problems (login required for full access)'
-    })
+    }
+
+
+@use_replicas
+@csrf_exempt
+@require_http_methods(["GET"])
+def public_problems(request):
+    """Get a few sample problems without authentication."""
+    entry = CatalogueEntry('public_problems')
+    if entry.matches(request):
+        return HttpResponseNotModified(headers={'ETag': entry.etag})
+    response = JsonResponse(entry.get_or_build(_public_problems_payload))
+    response['ETag'] = entry.etag
+    response['Cache-Control'] = 'public, no-cache'
+    return response
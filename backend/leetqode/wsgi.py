@@ -9,3 +9,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'leetqode.settings')
 
 application = get_wsgi_application()
+
+# Server processes start fetching Google's certificates before the first login
+from accounts.google_certs import prefetch_certs  # noqa: E402
+prefetch_certs()
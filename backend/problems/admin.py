@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Problem, UserProblem
+from .models import Job, Problem, ProblemDailyStats, ReviewEvent, UserDailyStats, UserProblem
 
 
 @admin.register(Problem)
@@ -18,3 +18,45 @@ class UserProblemAdmin(admin.ModelAdmin):
     list_filter = ['confidence', 'next_due', 'problem__difficulty']
     search_fields = ['user__email', 'problem__title']
     ordering = ['next_due']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Admin for background jobs."""
+    list_display = ['id', 'name', 'status', 'run_after', 'attempts', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'dedupe_key']
+    ordering = ['-run_after']
+
+
+@admin.register(ReviewEvent)
+class ReviewEventAdmin(admin.ModelAdmin):
+    """Read-only admin for the append-only review log."""
+    list_display = ['user', 'problem', 'reviewed_at', 'confidence_change', 'confidence', 'solved', 'elapsed_days']
+    list_filter = ['day', 'solved']
+    search_fields = ['user__email', 'problem__title']
+    ordering = ['-reviewed_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(UserDailyStats)
+class UserDailyStatsAdmin(admin.ModelAdmin):
+    """Admin for per-user daily review rollups."""
+    list_display = ['user', 'day', 'reviews', 'solved', 'problems']
+    list_filter = ['day']
+    search_fields = ['user__email']
+    ordering = ['-day']
+
+
+@admin.register(ProblemDailyStats)
+class ProblemDailyStatsAdmin(admin.ModelAdmin):
+    """Admin for per-problem daily review rollups."""
+    list_display = ['problem', 'day', 'reviews', 'solved', 'users']
+    list_filter = ['day']
+    search_fields = ['problem__title']
+    ordering = ['-day']
@@ -0,0 +1,142 @@
+"""Daily review rollups and the analytics read from them.
+
+Every review appends a ``ReviewEvent``. The ``rollup_reviews`` job (see
+``tasks.py``) aggregates one day of events into ``UserDailyStats`` and
+``ProblemDailyStats``; analytics endpoints only ever read those rollups, so
+their cost depends on the number of days asked for, not on review volume.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import ProblemDailyStats, ReviewEvent, UserDailyStats
+
+FIRST_REVIEW = 'first'
+
+# (upper bound in days since the previous attempt, bucket label)
+RETENTION_BUCKETS = [
+    (0, '0'),
+    (1, '1'),
+    (3, '2-3'),
+    (7, '4-7'),
+    (14, '8-14'),
+    (30, '15-30'),
+    (None, '31+'),
+]
+
+
+def retention_bucket(elapsed_days):
+    if elapsed_days is None:
+        return FIRST_REVIEW
+    for upper, label in RETENTION_BUCKETS:
+        if upper is None or elapsed_days <= upper:
+            return label
+
+
+def rollup_day(day, batch_size=1000):
+    """(Re)build the user and problem rollups of ``day`` from its review events.
+
+    Idempotent: the day's rollups are replaced, so late events are picked up
+    by running it again.
+    """
+    events = ReviewEvent.objects.filter(day=day)
+    totals = {
+        'reviews': Count('id'),
+        'solved': Count('id', filter=Q(solved=True)),
+        'confidence_change': Sum('confidence_change'),
+    }
+
+    retention = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+    for row in events.values('user_id', 'elapsed_days').annotate(**totals).order_by():
+        counts = retention[row['user_id']][retention_bucket(row['elapsed_days'])]
+        counts[0] += row['reviews']
+        counts[1] += row['solved']
+
+    user_stats = [
+        UserDailyStats(day=day, retention=dict(retention[row['user_id']]), **row)
+        for row in events.values('user_id').annotate(problems=Count('problem_id', distinct=True), **totals).order_by()
+    ]
+    problem_stats = [
+        ProblemDailyStats(day=day, **row)
+        for row in events.values('problem_id').annotate(users=Count('user_id', distinct=True), **totals).order_by()
+    ]
+
+    with transaction.atomic():
+        UserDailyStats.objects.filter(day=day).delete()
+        ProblemDailyStats.objects.filter(day=day).delete()
+        UserDailyStats.objects.bulk_create(user_stats, batch_size=batch_size)
+        ProblemDailyStats.objects.bulk_create(problem_stats, batch_size=batch_size)
+    return {'users': len(user_stats), 'problems': len(problem_stats)}
+
+
+def _since(days):
+    """First day of a ``days`` long window ending yesterday, the last rolled-up day."""
+    return timezone.localdate() - timedelta(days=days)
+
+
+def _rate(solved, reviews):
+    return round(solved / reviews, 4) if reviews else None
+
+
+def user_analytics(user, days=30):
+    """Daily review series, totals and retention curve of ``user`` over the last ``days`` days."""
+    rows = UserDailyStats.objects.filter(user=user, day__gte=_since(days)).order_by('day')
+
+    series = []
+    totals = {'reviews': 0, 'solved': 0, 'confidence_change': 0}
+    retention = defaultdict(lambda: [0, 0])
+    for row in rows:
+        series.append({
+            'day': row.day.isoformat(),
+            'reviews': row.reviews,
+            'solved': row.solved,
+            'problems': row.problems,
+            'confidence_change': row.confidence_change,
+        })
+        for key in totals:
+            totals[key] += getattr(row, key)
+        for bucket, (reviews, solved) in row.retention.items():
+            retention[bucket][0] += reviews
+            retention[bucket][1] += solved
+
+    labels = [FIRST_REVIEW] + [label for _, label in RETENTION_BUCKETS]
+    return {
+        'days': days,
+        'series': series,
+        'totals': dict(totals, active_days=len(series), solve_rate=_rate(totals['solved'], totals['reviews'])),
+        'retention': [
+            {
+                'elapsed_days': label,
+                'reviews': retention[label][0],
+                'solved': retention[label][1],
+                'solve_rate': _rate(retention[label][1], retention[label][0]),
+            }
+            for label in labels if label in retention
+        ],
+    }
+
+
+def problem_analytics(problem_id, days=30):
+    """Daily review series and totals of a problem across all users over the last ``days`` days."""
+    rows = ProblemDailyStats.objects.filter(problem_id=problem_id, day__gte=_since(days)).order_by('day')
+    series = [
+        {
+            'day': row.day.isoformat(),
+            'reviews': row.reviews,
+            'solved': row.solved,
+            'users': row.users,
+            'solve_rate': _rate(row.solved, row.reviews),
+        }
+        for row in rows
+    ]
+    reviews = sum(day['reviews'] for day in series)
+    solved = sum(day['solved'] for day in series)
+    return {
+        'problem_id': problem_id,
+        'days': days,
+        'series': series,
+        'totals': {'reviews': reviews, 'solved': solved, 'solve_rate': _rate(solved, reviews)},
+    }
@@ -0,0 +1,231 @@
+"""ASGI-native variants of the hot read endpoints.
+
+These mirror the responses of ``ProblemListAPIView``, ``dashboard`` and
+``problem_stats`` but run on Django's async ORM, so under an ASGI server
+(e.g. ``uvicorn leetqode.asgi:application``) a single worker serves many
+concurrent requests without a thread each. DRF views are synchronous, so
+these are plain Django views that reproduce its auth and error responses.
+
+The project's own middleware is async-capable, but WhiteNoise and allauth's
+``AccountMiddleware`` are still sync-only, so Django runs those layers in a
+thread for each request.
+"""
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseNotAllowed, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from leetqode.routers import use_replicas
+from leetqode.throttling import acheck_throttle
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .catalogue import CatalogueEntry
+from .events import RESYNC, broker
+from .facets import get_facet_index
+from .models import Problem, UserProblem
+from .pagination import ProblemCursorPagination
+from .rendering import dashboard_rows
+from .serializers import ProblemSerializer
+from .stats import acompute_stats
+from .tags import MATCH_ANY, filter_by_tags
+
+
+class _PageNotFound(Exception):
+    pass
+
+
+async def _authenticated_user(request):
+    """Resolve the session user off the event loop; None when anonymous."""
+    user = await sync_to_async(get_user)(request)
+    return user if user.is_authenticated else None
+
+
+def _not_authenticated():
+    # Matches DRF's response for session-authenticated views
+    return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=403)
+
+
+@use_replicas
+async def problem_list(request):
+    """Async ``ProblemListAPIView``: filtered catalogue, page-number or (``?pagination=cursor``) keyset paginated."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if await _authenticated_user(request) is None:
+        return _not_authenticated()
+    throttled = await acheck_throttle(request)
+    if throttled is not None:
+        return throttled
+
+    entry = await CatalogueEntry.acreate('async_problem_list', [
+        request.build_absolute_uri('/'), sorted(request.GET.lists())
+    ])
+    if entry.matches(request):
+        return HttpResponseNotModified(headers={'ETag': entry.etag})
+
+    queryset = Problem.objects.all()
+    difficulty = request.GET.get('difficulty')
+    if difficulty:
+        queryset = queryset.filter(difficulty=difficulty)
+    queryset = filter_by_tags(
+        queryset, request.GET.getlist('tags'), match=request.GET.get('tag_match', MATCH_ANY)
+    )
+
+    def build_cursor_page():
+        # Same paginator as the DRF view, so cursors work across both
+        paginator = ProblemCursorPagination()
+        page = paginator.paginate_queryset(queryset.values(*ProblemSerializer.Meta.fields), Request(request))
+        return dict(paginator.get_paginated_response(page).data)
+
+    async def build_number_page():
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        try:
+            page = int(request.GET.get('page', 1))
+        except ValueError:
+            raise _PageNotFound
+        count = await queryset.acount()
+        offset = (page - 1) * page_size
+        if page < 1 or (page > 1 and offset >= count):
+            raise _PageNotFound
+
+        url = request.build_absolute_uri()
+        previous = None
+        if page == 2:
+            previous = remove_query_param(url, 'page')
+        elif page > 2:
+            previous = replace_query_param(url, 'page', page - 1)
+        return {
+            'count': count,
+            'next': replace_query_param(url, 'page', page + 1) if offset + page_size < count else None,
+            'previous': previous,
+            'results': [
+                problem async for problem in
+                queryset[offset:offset + page_size].values(*ProblemSerializer.Meta.fields)
+            ],
+        }
+
+    async def build_page():
+        if request.GET.get('pagination') == 'cursor':
+            data = await sync_to_async(build_cursor_page)()
+        else:
+            data = await build_number_page()
+        if request.GET.get('facets') == 'true':
+            index = await sync_to_async(get_facet_index)()
+            data['facets'] = index.counts(
+                difficulty=difficulty, tags=request.GET.getlist('tags'),
+                match=request.GET.get('tag_match', MATCH_ANY),
+            )
+        return data
+
+    try:
+        data = await entry.aget_or_build(build_page)
+    except _PageNotFound:
+        return JsonResponse({'detail': 'Invalid page.'}, status=404)
+    except NotFound as e:
+        return JsonResponse({'detail': str(e.detail)}, status=404)
+    response = JsonResponse(data)
+    response['ETag'] = entry.etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+async def dashboard(request):
+    """Async ``dashboard``: problems due today in one indexed scan."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    user = await _authenticated_user(request)
+    if user is None:
+        return _not_authenticated()
+    throttled = await acheck_throttle(request, 'dashboard')
+    if throttled is not None:
+        return throttled
+
+    due_problems = dashboard_rows.serialize([
+        row async for row in
+        dashboard_rows.rows(UserProblem.objects.filter(user=user).due().order_by('next_due'))
+    ])
+    return JsonResponse({
+        'due_today': due_problems,
+        'total_due': len(due_problems)
+    })
+
+
+@use_replicas
+async def problem_stats(request):
+    """Async ``problem_stats``."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    user = await _authenticated_user(request)
+    if user is None:
+        return _not_authenticated()
+    throttled = await acheck_throttle(request)
+    if throttled is not None:
+        return throttled
+    return JsonResponse(await acompute_stats(user))
+
+
+def _sse(event_id, name, data):
+    return f'id: {event_id}\nevent: {name}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+async def events(request):
+    """Server-sent events stream of the user's dashboard and stats changes (see ``events.py``).
+    
+    Streams are closed after ``EVENTS_STREAM_MAX_AGE`` seconds and the browser
+    reconnects; a reconnecting client (``Last-Event-ID``) is told to resync
+    since events published in between were not kept. Changes made by other
+    processes are noticed every ``EVENTS_POLL_INTERVAL`` seconds, as a resync.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would buffer the endless stream instead of sending it
+        return JsonResponse({'detail': 'Live updates require an ASGI server.'}, status=501)
+    user = await _authenticated_user(request)
+    if user is None:
+        return _not_authenticated()
+    throttled = await acheck_throttle(request)
+    if throttled is not None:
+        return throttled
+    
+    heartbeat = getattr(settings, 'EVENTS_HEARTBEAT_INTERVAL', 15)
+    poll = getattr(settings, 'EVENTS_POLL_INTERVAL', 5)
+    max_age = getattr(settings, 'EVENTS_STREAM_MAX_AGE', 300)
+    resync = 'HTTP_LAST_EVENT_ID' in request.META
+    
+    async def stream():
+        subscription = broker.subscribe(user.pk, maxsize=getattr(settings, 'EVENTS_QUEUE_SIZE', 100))
+        try:
+            yield 'retry: 3000\n\n'
+            if resync:
+                yield _sse(0, RESYNC, {})
+            await broker.changed_elsewhere(subscription)
+            now = time.monotonic()
+            deadline, next_poll, next_beat = now + max_age, now + poll, now + heartbeat
+            while now < deadline:
+                event = await subscription.get(timeout=max(0, min(next_poll, next_beat, deadline) - now))
+                now = time.monotonic()
+                if event is not None:
+                    yield _sse(*event)
+                    next_beat = now + heartbeat
+                if now >= next_poll:
+                    next_poll = now + poll
+                    # Other processes only leave a count behind, not the events
+                    if await broker.changed_elsewhere(subscription):
+                        yield _sse(0, RESYNC, {})
+                        next_beat = now + heartbeat
+                if now >= next_beat:
+                    # Comment lines keep proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+                    next_beat = now + heartbeat
+        finally:
+            broker.unsubscribe(subscription)
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,272 @@
+"""Synthetic data generation and latency measurement for ``run_benchmarks``.
+
+Benchmark rows are namespaced so they never collide with real data: problem
+ids start at ``PROBLEM_ID_OFFSET`` with ``BENCHMARK_URL`` urls and users have
+``@benchmark.invalid`` emails. ``cleanup`` removes both (user problems
+cascade) in bulk, with the per-row delete bookkeeping muted, along with the
+tags only benchmark problems used. Generating them leaves the problem id
+sequence alone, so problems created meanwhile keep ordinary ids.
+
+``PRESETS`` size the dataset; ``large`` is in the millions of tracked rows.
+"""
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.db import close_old_connections, connection, transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.test import Client
+from django.utils import timezone
+
+from . import catalogue, signals
+from .importing import CatalogueImporter
+from .models import Problem, Tag, UserProblem
+from .tags import tag_bits, tracked_fields
+
+User = get_user_model()
+
+PROBLEM_ID_OFFSET = 10_000_000
+EMAIL_DOMAIN = 'benchmark.invalid'
+BENCHMARK_URL = 'https://leetcode.com/problems/benchmark-'
+TAG_POOL = [
+    'Array', 'String', 'Hash Table', 'Dynamic Programming', 'Math', 'Sorting', 'Greedy',
+    'Depth-First Search', 'Binary Search', 'Tree', 'Graph', 'Two Pointers', 'Stack',
+    'Heap (Priority Queue)', 'Sliding Window', 'Backtracking', 'Linked List', 'Trie',
+    'Amazon', 'Google', 'Microsoft', 'Meta', 'Apple', 'Bloomberg',
+]
+DIFFICULTIES = [value for value, _ in Problem.DIFFICULTY_CHOICES]
+
+# Dataset sizes: users, catalogue size and problems tracked per user
+PRESETS = {
+    'small': {'users': 20, 'problems': 3000, 'problems_per_user': 500},       # 10k user problems
+    'medium': {'users': 1000, 'problems': 3500, 'problems_per_user': 300},   # 300k
+    'large': {'users': 20000, 'problems': 5000, 'problems_per_user': 150},   # 3M
+}
+
+
+def generate_catalogue(count, rng, batch_size=1000):
+    """Upsert ``count`` synthetic problems through the catalogue importer."""
+    importer = CatalogueImporter(batch_size=batch_size)
+    rows = (
+        (index, {
+            'id': PROBLEM_ID_OFFSET + index,
+            'title': f'Benchmark Problem {index}',
+            'url': f'{BENCHMARK_URL}{index}/',
+            'difficulty': rng.choice(DIFFICULTIES),
+            'tags': rng.sample(TAG_POOL, rng.randint(1, 5)),
+        })
+        for index in range(count)
+    )
+    importer.import_rows(rows, source='benchmark')
+    # Resetting the sequence would hand real problems ids past the offset
+    importer.finish(reset_sequence=False)
+    return PROBLEM_ID_OFFSET, PROBLEM_ID_OFFSET + count
+
+
+def generate_users(count, problems_per_user, problem_count, rng, batch_size=5000):
+    """Create users each tracking ``problems_per_user`` random synthetic problems."""
+    User.objects.bulk_create(
+        [
+            User(email=f'bench-{index}@{EMAIL_DOMAIN}', username=f'bench-{index}@{EMAIL_DOMAIN}')
+            for index in range(count)
+        ],
+        batch_size=batch_size,
+    )
+    users = list(benchmark_users().order_by('id'))
+
+    bits = tag_bits()
+    problem_fields = {
+        problem.pk: tracked_fields(problem, bits)
+        for problem in benchmark_problems().only('id', 'difficulty', 'tags')
+    }
+    now = timezone.now()
+    per_user = min(problems_per_user, problem_count)
+    batch = []
+    for user in users:
+        for problem_index in rng.sample(range(problem_count), per_user):
+            attempts = rng.randint(0, 20)
+            batch.append(UserProblem(
+                user_id=user.pk,
+                problem_id=PROBLEM_ID_OFFSET + problem_index,
+                confidence=rng.randint(0, 100),
+                frequency_days=rng.randint(1, 30),
+                attempts_count=attempts,
+                solved_count=rng.randint(0, attempts),
+                last_attempted=now - timedelta(days=rng.randint(0, 60)) if attempts else None,
+                next_due=now + timedelta(hours=rng.randint(-24 * 30, 24 * 30)),
+                **problem_fields[PROBLEM_ID_OFFSET + problem_index],
+            ))
+            if len(batch) >= batch_size:
+                UserProblem.objects.bulk_create(batch)
+                batch = []
+    if batch:
+        UserProblem.objects.bulk_create(batch)
+    return users
+
+
+def benchmark_users():
+    return User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}')
+
+
+def benchmark_problems():
+    return Problem.objects.filter(id__gte=PROBLEM_ID_OFFSET, url__startswith=BENCHMARK_URL)
+
+
+def reset_problem_sequence():
+    """Point the problem id sequence back at the highest remaining id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), [Problem])
+    if connection.vendor == 'sqlite':
+        # AUTOINCREMENT keeps the highest id ever used in sqlite_sequence
+        table = Problem._meta.db_table
+        statements = [
+            f'UPDATE sqlite_sequence SET seq = (SELECT COALESCE(MAX(id), 0) FROM "{table}") '
+            f"WHERE name = '{table}'"
+        ]
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+@contextmanager
+def bulk_deletes():
+    """Mute the delete receivers so deletes cascade as fast, unloaded bulk statements.
+    
+    Receivers disconnect process-wide, so use this only outside request handling.
+    """
+    receivers = [
+        (pre_delete, signals.collect_problem_delete, Problem),
+        (pre_delete, signals.collect_untrack, UserProblem),
+        (post_delete, signals.invalidate_on_delete, Problem),
+        (post_delete, signals.invalidate_on_delete, UserProblem),
+    ]
+    for signal, receiver, sender in receivers:
+        signal.disconnect(receiver, sender=sender)
+    try:
+        yield
+    finally:
+        for signal, receiver, sender in receivers:
+            signal.connect(receiver, sender=sender)
+
+
+def cleanup():
+    """Delete every benchmark user and synthetic problem."""
+    # Benchmark users' summaries and tracked rows go with them; only the
+    # catalogue needs invalidating, once
+    with transaction.atomic(), bulk_deletes():
+        benchmark_users().delete()
+        benchmark_problems().delete()
+        # Tags left without problems would hold their tag_mask bits forever
+        Tag.objects.filter(name__in=TAG_POOL, problem_tags=None).delete()
+    catalogue.bump_version()
+    reset_problem_sequence()
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, errors, wall_seconds):
+    ordered = sorted(latencies)
+    to_ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / wall_seconds, 2) if wall_seconds else None,
+        'mean_ms': to_ms(statistics.fmean(ordered)) if ordered else None,
+        'p50_ms': to_ms(percentile(ordered, 0.50)),
+        'p90_ms': to_ms(percentile(ordered, 0.90)),
+        'p99_ms': to_ms(percentile(ordered, 0.99)),
+        'max_ms': to_ms(ordered[-1] if ordered else None),
+    }
+
+
+class Scenario:
+    """One endpoint exercised by logged-in benchmark users."""
+
+    def __init__(self, name, method, path_for):
+        self.name = name
+        self.method = method
+        self.path_for = path_for  # (user, rng) -> (path, data)
+
+
+def default_scenarios():
+    tracked = {}
+
+    def review(user, rng):
+        if user.pk not in tracked:
+            tracked[user.pk] = list(UserProblem.objects.filter(user=user).values_list('id', flat=True))
+        return f'/api/user/problems/{rng.choice(tracked[user.pk])}/update/', {
+            'confidence_change': rng.choice([-10, 15]), 'solved': rng.random() < 0.6
+        }
+
+    return [
+        Scenario('dashboard', 'get', lambda user, rng: ('/api/dashboard/', None)),
+        Scenario('problem_stats', 'get', lambda user, rng: ('/api/stats/', None)),
+        Scenario('user_problem_list', 'get', lambda user, rng: ('/api/user/problems/', None)),
+        Scenario('user_problem_list_filtered', 'get', lambda user, rng: (
+            f'/api/user/problems/?difficulty={rng.choice(DIFFICULTIES)}&tags={rng.choice(TAG_POOL)}', None
+        )),
+        Scenario('review_update', 'put', review),
+    ]
+
+
+def run_scenario(scenario, users, requests, concurrency, warmup, seed):
+    """Issue ``requests`` calls spread over ``concurrency`` threads and summarise latency."""
+    per_worker = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        clients = {}
+        latencies, errors = [], 0
+        try:
+            for call in range(warmup + per_worker[index]):
+                user = rng.choice(users)
+                client = clients.get(user.pk)
+                if client is None:
+                    client = clients[user.pk] = Client(HTTP_HOST='localhost')
+                    client.force_login(user)
+                path, data = scenario.path_for(user, rng)
+                started = time.perf_counter()
+                if scenario.method == 'get':
+                    response = client.get(path)
+                else:
+                    response = getattr(client, scenario.method)(path, data, content_type='application/json')
+                elapsed = time.perf_counter() - started
+                if call < warmup:
+                    continue
+                if response.status_code >= 400:
+                    errors += 1
+                else:
+                    latencies.append(elapsed)
+        finally:
+            close_old_connections()
+            connection.close()
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies = [value for worker_latencies, _ in results for value in worker_latencies]
+    return summarize(latencies, sum(errors for _, errors in results), wall)
+
+
+def database_info():
+    info = {'vendor': connection.vendor, 'name': str(connection.settings_dict['NAME'])}
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('select sqlite_version()')
+        else:
+            cursor.execute('select version()')
+        info['version'] = cursor.fetchone()[0]
+    return info
@@ -0,0 +1,147 @@
+"""Versioned cache for problem catalogue reads.
+
+The catalogue only changes when problems are written (seeding, imports,
+admin edits), so read paths cache their results under a catalogue version
+that is bumped on every ``Problem`` write. Bumping orphans every entry at
+once; the same version doubles as the ETag for conditional requests.
+
+The version is a ``CacheVersion`` row, so a bump from any process (an
+import command, another worker) is seen by every worker. Each process reuses
+the version it read for ``CATALOGUE_VERSION_TTL`` seconds, so cache hits and
+304s cost no queries; its own bumps are seen at once, other processes' within
+the TTL. Entries live in the ``CATALOGUE_CACHE_ALIAS`` cache; with the default
+in-process ``LocMemCache`` each worker keeps its own copies, which are
+still dropped as soon as the version moves.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+VERSION_KEY = 'catalogue'
+
+# Per-process hit/miss counters for status reporting
+stats = {'hits': 0, 'misses': 0}
+
+
+def _cache():
+    return caches[getattr(settings, 'CATALOGUE_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', 300)
+
+
+# The version this process last read and the monotonic time it was read at
+_last_version = (None, 0.0)
+
+
+def _recent_version():
+    version, read_at = _last_version
+    if version is not None and time.monotonic() - read_at < getattr(settings, 'CATALOGUE_VERSION_TTL', 1):
+        return version
+    return None
+
+
+def _remember(version):
+    global _last_version
+    _last_version = (version, time.monotonic())
+    return version
+
+
+def forget_version():
+    """Read the version from the database again on the next lookup."""
+    global _last_version
+    _last_version = (None, 0.0)
+
+
+def get_version():
+    """Return the current catalogue version."""
+    from .models import CacheVersion
+    return _recent_version() or _remember(str(CacheVersion.get(VERSION_KEY)))
+
+
+async def aget_version():
+    """Async variant of ``get_version``."""
+    from .models import CacheVersion
+    return _recent_version() or _remember(str(await CacheVersion.aget(VERSION_KEY)))
+
+
+def bump_version():
+    """Invalidate every cached catalogue read, in every process."""
+    from .models import CacheVersion
+    CacheVersion.bump(VERSION_KEY)
+    forget_version()
+    # Other threads may have re-read the old version before the bump committed
+    transaction.on_commit(forget_version)
+
+
+class CatalogueEntry:
+    """A cached catalogue read identified by a name and its request parameters."""
+    
+    def __init__(self, name, params=(), version=None):
+        self.name = name
+        self.version = version or get_version()
+        self.digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+    
+    @classmethod
+    async def acreate(cls, name, params=()):
+        """Build an entry without blocking the event loop on the version lookup."""
+        return cls(name, params, version=await aget_version())
+    
+    @property
+    def key(self):
+        return f'catalogue:{self.version}:{self.name}:{self.digest}'
+    
+    @property
+    def etag(self):
+        return f'"{self.version}-{self.digest}"'
+    
+    def matches(self, request):
+        """Whether the request's If-None-Match already names this entry."""
+        header = request.META.get('HTTP_IF_NONE_MATCH', '')
+        candidates = {tag.strip() for tag in header.split(',')}
+        candidates |= {tag[2:] for tag in candidates if tag.startswith('W/')}
+        return '*' in candidates or self.etag in candidates
+    
+    def get_or_build(self, builder):
+        """Return the cached value, computing and storing it with ``builder`` on a miss."""
+        cache = _cache()
+        value = cache.get(self.key)
+        if value is not None:
+            stats['hits'] += 1
+            return value
+        stats['misses'] += 1
+        value = builder()
+        cache.set(self.key, value, _timeout())
+        return value
+    
+    async def aget_or_build(self, builder):
+        """Async variant of ``get_or_build``; ``builder`` returns an awaitable."""
+        cache = _cache()
+        value = await cache.aget(self.key)
+        if value is not None:
+            stats['hits'] += 1
+            return value
+        stats['misses'] += 1
+        value = await builder()
+        await cache.aset(self.key, value, _timeout())
+        return value
+
+
+def problem_count():
+    """Cached ``Problem`` count."""
+    from .models import Problem
+    return CatalogueEntry('count').get_or_build(Problem.objects.count)
+
+
+async def aproblem_count():
+    """Async variant of ``problem_count``."""
+    from .models import Problem
+    entry = await CatalogueEntry.acreate('count')
+    return await entry.aget_or_build(Problem.objects.acount)
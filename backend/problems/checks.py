@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+PER_PROCESS_CACHES = {'django.core.cache.backends.locmem.LocMemCache'}
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """The shared cache must be visible to every process (web workers, job worker, commands)."""
+    alias = getattr(settings, 'SHARED_CACHE_ALIAS', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend is None:
+        return [Error(f"SHARED_CACHE_ALIAS '{alias}' is not in CACHES.", id='problems.E001')]
+    if backend in PER_PROCESS_CACHES:
+        return [Error(
+            f"SHARED_CACHE_ALIAS '{alias}' uses {backend}, which is private to each process.",
+            hint='Use a shared backend such as Redis, Memcached or DatabaseCache.',
+            id='problems.E001',
+        )]
+    return []
@@ -0,0 +1,93 @@
+"""Per-user counts of problems due on a day, cached until that day ends.
+
+The ``prepare_review_queues`` job fills in tomorrow's counts ahead of
+midnight, so the first stats reads of a new day don't all hit the review
+queue index at once. Anything that changes a user's queue (reviews,
+tracking or untracking problems, re-planning) drops their entries.
+
+Counts are written by the job worker and management commands as well as by
+web workers, so they live in the ``SHARED_CACHE_ALIAS`` cache; the
+``problems.E001`` check rejects a per-process backend there. They are always
+counted on the primary, even in views reading from replicas, since a lagging
+replica's count would be cached for the rest of the day.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import UserProblem, end_of_day
+
+
+def _cache():
+    return caches[getattr(settings, 'SHARED_CACHE_ALIAS', 'default')]
+
+
+def _key(user_id, day):
+    return f'due_count:{user_id}:{day.isoformat()}'
+
+
+def _timeout(day):
+    # Keep entries an hour past the end of the day to cover clock skew between workers
+    return max(1, int((end_of_day(day) - timezone.now()).total_seconds()) + 3600)
+
+
+def _due(user, day):
+    return UserProblem.objects.using(DEFAULT_DB_ALIAS).filter(user=user).due(end_of_day(day))
+
+
+def due_count(user):
+    """Number of the user's problems due by the end of today."""
+    today = timezone.localdate()
+    key = _key(user.pk, today)
+    count = _cache().get(key)
+    if count is None:
+        count = _due(user, today).count()
+        _cache().set(key, count, _timeout(today))
+    return count
+
+
+async def adue_count(user):
+    """Async variant of ``due_count``."""
+    today = timezone.localdate()
+    key = _key(user.pk, today)
+    count = await _cache().aget(key)
+    if count is None:
+        count = await _due(user, today).acount()
+        await _cache().aset(key, count, _timeout(today))
+    return count
+
+
+def forget_due_counts(*user_ids):
+    """Drop the cached counts of today and tomorrow for ``user_ids``."""
+    today = timezone.localdate()
+    _cache().delete_many([
+        _key(user_id, day)
+        for user_id in user_ids
+        for day in (today, today + timedelta(days=1))
+    ])
+
+
+def prepare_due_counts(day, batch_size=1000):
+    """Compute and cache every user's due count for ``day``; returns the number of users."""
+    counts = (
+        UserProblem.objects.using(DEFAULT_DB_ALIAS).order_by()
+        .values('user_id')
+        .annotate(due=Count('id', filter=Q(next_due__lt=end_of_day(day))))
+        .values_list('user_id', 'due')
+    )
+    prepared = 0
+    batch = {}
+    for user_id, count in counts.iterator(chunk_size=batch_size):
+        batch[_key(user_id, day)] = count
+        if len(batch) >= batch_size:
+            _cache().set_many(batch, _timeout(day))
+            prepared += len(batch)
+            batch = {}
+    if batch:
+        _cache().set_many(batch, _timeout(day))
+        prepared += len(batch)
+    return prepared
@@ -0,0 +1,212 @@
+"""In-process publish/subscribe of per-user queue changes for ``/api/events/``.
+
+Request handlers publish small diffs when a user's problems change (see
+``publish_reviews`` and the tracking signals) and every open event stream of
+that user receives them. Delivery is in-process: each ASGI worker only sees
+changes made through itself, so clients are told to ``resync`` whenever they
+may have missed events (on reconnect or when their queue overflows).
+
+Changes made by any other process (WSGI workers, the job worker) are counted
+in a shared ``CacheVersion`` row per user (``announce``). Streams poll it every
+``EVENTS_POLL_INTERVAL`` seconds and send ``resync`` when it moved by more
+than this process accounts for.
+
+Events:
+
+- ``due_removed`` ``{"ids": [...]}``: user problems no longer due today
+- ``due_upserted`` ``{"items": [...]}``: dashboard rows that became or stay due
+- ``stats_delta``: changes to add to the ``/api/stats/`` counters, with
+  ``confidence_sum`` in place of ``average_confidence``
+- ``resync``: refetch the dashboard and stats
+"""
+import asyncio
+import itertools
+import threading
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .models import CacheVersion, Problem, end_of_today
+from .serializers import DashboardSerializer
+
+DIFFICULTIES = [value for value, _ in Problem.DIFFICULTY_CHOICES]
+
+RESYNC = 'resync'
+
+_event_ids = itertools.count(1)
+
+
+class Subscription:
+    """One open event stream; events arrive on its event loop's queue."""
+
+    def __init__(self, user_id, loop, maxsize):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+        # (shared, own) change counts at the last check, see Broker.changed_elsewhere
+        self.changes = None
+
+    def _put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client fell behind; drop its backlog and tell it to refetch
+            self.overflowed = True
+
+    def deliver(self, event):
+        """Thread-safe hand-off from the publishing thread."""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    async def get(self, timeout):
+        """Next ``(id, name, data)`` event, ``RESYNC`` after an overflow, or None on timeout."""
+        if self.overflowed:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.overflowed = False
+            return next(_event_ids), RESYNC, {}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def _changes_key(user_id):
+    return f'events:{user_id}'
+
+
+async def _shared_changes(user_id):
+    value = await CacheVersion.objects.filter(key=_changes_key(user_id)).values_list('value', flat=True).afirst()
+    return value or 0
+
+
+class Broker:
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._changes = Counter()
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, maxsize=100):
+        subscription = Subscription(user_id, asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+                    self._changes.pop(subscription.user_id, None)
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscriptions
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def count_changes(self, user_ids):
+        """Count changes this process announced, for the users it streams to."""
+        with self._lock:
+            self._changes.update(user_id for user_id in user_ids if user_id in self._subscriptions)
+    
+    async def changed_elsewhere(self, subscription):
+        """Whether other processes changed the subscriber's queue since the last check."""
+        with self._lock:
+            own = self._changes[subscription.user_id]
+        shared = await _shared_changes(subscription.user_id)
+        last, subscription.changes = subscription.changes, (shared, own)
+        return last is not None and shared - last[0] != own - last[1]
+    
+    def publish(self, user_id, name, data):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        event = (next(_event_ids), name, data)
+        for subscription in subscriptions:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # The stream's event loop is gone
+                self.unsubscribe(subscription)
+
+
+broker = Broker()
+
+
+def publish(user_id, name, data):
+    """Publish once the current transaction commits."""
+    transaction.on_commit(lambda: broker.publish(user_id, name, data))
+
+
+def announce(*user_ids):
+    """Count a change to the users' queues for the streams of every process.
+    
+    The shared counter moves with the writer's transaction; this process counts
+    its own share once it commits, as it delivers these changes itself.
+    """
+    user_ids = sorted(set(user_ids))
+    if user_ids:
+        CacheVersion.incr(*(_changes_key(user_id) for user_id in user_ids))
+        transaction.on_commit(lambda: broker.count_changes(user_ids))
+
+
+def stats_delta(total=0, solved=0, due=0, confidence=0, difficulties=None):
+    return {
+        'total_problems': total,
+        'solved_problems': solved,
+        'due_today': due,
+        'confidence_sum': confidence,
+        'difficulty_breakdown': {
+            difficulty: (difficulties or {}).get(difficulty, 0) for difficulty in DIFFICULTIES
+        },
+    }
+
+
+def publish_reviews(user_id, reviewed, due_before, confidence_delta=0, solved_delta=0):
+    """Publish the queue and stats changes of reviewing ``reviewed``.
+
+    ``due_before`` is the set of their ids that were due before the review.
+    """
+    announce(user_id)
+    if not broker.has_subscribers(user_id):
+        return
+    until = end_of_today()
+    removed = [user_problem.pk for user_problem in reviewed if user_problem.pk in due_before and user_problem.next_due >= until]
+    still_due = [user_problem for user_problem in reviewed if user_problem.next_due < until]
+    if removed:
+        publish(user_id, 'due_removed', {'ids': removed})
+    if still_due:
+        publish(user_id, 'due_upserted', {'items': DashboardSerializer(still_due, many=True).data})
+    newly_due = sum(1 for user_problem in still_due if user_problem.pk not in due_before)
+    publish(user_id, 'stats_delta', stats_delta(
+        solved=solved_delta, due=newly_due - len(removed), confidence=confidence_delta
+    ))
+
+
+def publish_tracking(user_id, user_problems, tracked):
+    """Publish the changes of starting (``tracked``) or stopping to track ``user_problems``."""
+    if not user_problems:
+        return
+    announce(user_id)
+    if not broker.has_subscribers(user_id):
+        return
+    sign = 1 if tracked else -1
+    until = end_of_today()
+    due = [user_problem for user_problem in user_problems if user_problem.next_due < until]
+    if due and tracked:
+        publish(user_id, 'due_upserted', {'items': DashboardSerializer(due, many=True).data})
+    elif due:
+        publish(user_id, 'due_removed', {'ids': [user_problem.pk for user_problem in due]})
+    difficulties = Counter(user_problem.difficulty for user_problem in user_problems)
+    publish(user_id, 'stats_delta', stats_delta(
+        total=sign * len(user_problems),
+        solved=sign * sum(1 for user_problem in user_problems if user_problem.solved_count > 0),
+        due=sign * len(due),
+        confidence=sign * sum(user_problem.confidence for user_problem in user_problems),
+        difficulties={difficulty: sign * count for difficulty, count in difficulties.items()},
+    ))
@@ -0,0 +1,144 @@
+"""In-process facet index for difficulty and tag counts of the problem listings.
+
+The catalogue is held as bitsets (Python ints, bit ``i`` standing for the
+``i``-th problem by id): one per difficulty and one per tag. Counting a
+facet is an AND and a popcount instead of a GROUP BY. Like the search index,
+it is built once per catalogue version (see ``catalogue.py``) and shared by
+every request in the process.
+
+Users' tracked problems are cached as bitsets too, under a per-user
+``CacheVersion`` that tracking or untracking problems bumps in the same
+transaction, so every process rebuilds its copy once the change commits.
+"""
+import threading
+from collections import OrderedDict, defaultdict
+
+from . import catalogue
+from .models import CacheVersion, Problem, UserProblem
+from .tags import MATCH_ALL
+
+DIFFICULTIES = [value for value, _ in Problem.DIFFICULTY_CHOICES]
+
+# Users whose tracked bitsets are kept per process
+MAX_TRACKED_USERS = 1024
+
+
+def _popcount(bits):
+    # int.bit_count() needs Python 3.10
+    return bin(bits).count('1')
+
+
+def _bitset(positions, size):
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class FacetIndex:
+    """Difficulty and tag bitsets over a snapshot of the catalogue."""
+
+    def __init__(self, problems, version=None):
+        self.version = version
+        self.positions = {}
+        difficulties = defaultdict(list)
+        tags = defaultdict(list)
+        for position, problem in enumerate(problems):
+            self.positions[problem['id']] = position
+            difficulties[problem['difficulty']].append(position)
+            for tag in problem['tags'] or []:
+                tags[tag].append(position)
+
+        size = len(self.positions)
+        self.all = (1 << size) - 1
+        self.difficulties = {name: _bitset(positions, size) for name, positions in difficulties.items()}
+        self.tags = {name: _bitset(positions, size) for name, positions in tags.items()}
+
+    def mask_for_ids(self, problem_ids):
+        """Bitset of the given problem ids; ids missing from the snapshot are ignored."""
+        positions = [self.positions[pk] for pk in problem_ids if pk in self.positions]
+        return _bitset(positions, len(self.positions))
+
+    def tag_filter(self, tags, match):
+        """Bitset matching ``filter_by_tags``: any of ``tags``, or all of them with ``MATCH_ALL``."""
+        if not tags:
+            return self.all
+        masks = [self.tags.get(tag, 0) for tag in tags]
+        result = masks[0]
+        for mask in masks[1:]:
+            result = result & mask if match == MATCH_ALL else result | mask
+        return result
+
+    def counts(self, base=None, difficulty=None, tags=(), match=None):
+        """Facet counts within ``base`` (the whole catalogue by default).
+
+        Each facet is counted with the other facet's filter applied, so
+        difficulty counts tell how many results picking that difficulty gives.
+        Tag counts also apply the tag filter when tags must all match, since
+        picking another tag narrows the results then.
+        """
+        base = self.all if base is None else base
+        tag_filter = self.tag_filter(tags, match)
+        difficulty_base = base & tag_filter
+        tag_base = base & (self.difficulties.get(difficulty, 0) if difficulty else self.all)
+        if match == MATCH_ALL:
+            tag_base &= tag_filter
+
+        tag_counts = {name: _popcount(tag_base & mask) for name, mask in self.tags.items()}
+        return {
+            'difficulty': {
+                name: _popcount(difficulty_base & self.difficulties.get(name, 0)) for name in DIFFICULTIES
+            },
+            'tags': {
+                name: count
+                for name, count in sorted(tag_counts.items(), key=lambda item: (-item[1], item[0]))
+                if count
+            },
+        }
+
+
+_index_lock = threading.Lock()
+_index = (None, None)
+
+
+def get_facet_index():
+    """Return the facet index for the current catalogue version, rebuilding if stale."""
+    global _index
+    version = catalogue.get_version()
+    if _index[0] != version:
+        with _index_lock:
+            if _index[0] != version:
+                problems = Problem.objects.order_by('id').values('id', 'difficulty', 'tags')
+                _index = (version, FacetIndex(problems, version))
+    return _index[1]
+
+
+def _tracked_key(user_id):
+    return f'tracked:{user_id}'
+
+
+def forget_tracked(*user_ids):
+    """Drop the users' tracked bitsets in every process once the transaction commits."""
+    CacheVersion.bump(*(_tracked_key(user_id) for user_id in user_ids))
+
+
+_tracked_lock = threading.Lock()
+_tracked = OrderedDict()
+
+
+def tracked_mask(index, user):
+    """Bitset of the problems ``user`` tracks, cached per catalogue and tracking version."""
+    version = (index.version, CacheVersion.get(_tracked_key(user.pk)))
+    with _tracked_lock:
+        cached = _tracked.get(user.pk)
+        if cached is not None and cached[0] == version:
+            _tracked.move_to_end(user.pk)
+            return cached[1]
+
+    mask = index.mask_for_ids(UserProblem.objects.filter(user=user).values_list('problem_id', flat=True))
+    with _tracked_lock:
+        _tracked[user.pk] = (version, mask)
+        _tracked.move_to_end(user.pk)
+        while len(_tracked) > MAX_TRACKED_USERS:
+            _tracked.popitem(last=False)
+    return mask
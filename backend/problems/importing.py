@@ -0,0 +1,175 @@
+"""Streaming, batched problem catalogue import.
+
+Rows are read lazily from JSON Lines or CSV files, validated and upserted in
+fixed-size batches, so memory use stays flat regardless of file size. Each
+row looks like::
+
+    {"id": 1, "title": "Two Sum", "url": "https://leetcode.com/problems/two-sum/",
+     "difficulty": "Easy", "tags": ["Array", "Hash Table"], "lists": ["Top 100"]}
+
+In CSV files ``tags`` and ``lists`` are ``|``-separated. ``lists`` is
+optional; list memberships are only ever added, never removed.
+"""
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.core.validators import URLValidator
+from django.db import connection, transaction
+
+from . import catalogue
+from .models import Problem, ProblemList, ProblemListItem
+from .tags import sync_problem_tags, sync_tracked_problems
+
+DIFFICULTIES = {value for value, _ in Problem.DIFFICULTY_CHOICES}
+UPDATE_FIELDS = ['title', 'url', 'difficulty', 'tags', 'updated_at']
+CSV_SEPARATOR = '|'
+
+_validate_url = URLValidator()
+
+
+def read_rows(path, fmt=None):
+    """Yield ``(line_number, row)`` pairs from a ``jsonl`` or ``csv`` file."""
+    path = Path(path)
+    fmt = fmt or path.suffix.lstrip('.').lower()
+    with path.open(newline='', encoding='utf-8') as f:
+        if fmt in ('jsonl', 'ndjson', 'json'):
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_number, e
+        elif fmt == 'csv':
+            for line_number, row in enumerate(csv.DictReader(f), 2):
+                for field in ('tags', 'lists'):
+                    value = row.get(field) or ''
+                    row[field] = [item.strip() for item in value.split(CSV_SEPARATOR) if item.strip()]
+                yield line_number, row
+        else:
+            raise ValueError(f"Unsupported format '{fmt}' for {path}; use jsonl or csv")
+
+
+def clean_row(row):
+    """Validate and normalise one row, raising ``ValueError`` on bad input."""
+    if isinstance(row, Exception):
+        raise ValueError(f'invalid JSON: {row}')
+    if not isinstance(row, dict):
+        raise ValueError('expected an object')
+    try:
+        problem_id = int(row.get('id'))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid id {row.get('id')!r}")
+    if problem_id <= 0:
+        raise ValueError(f'invalid id {problem_id}')
+
+    title = (row.get('title') or '').strip()
+    if not title or len(title) > Problem._meta.get_field('title').max_length:
+        raise ValueError('title is required and must be at most 200 characters')
+    url = (row.get('url') or '').strip()
+    try:
+        _validate_url(url)
+    except ValidationError:
+        raise ValueError(f'invalid url {url!r}')
+    if row.get('difficulty') not in DIFFICULTIES:
+        raise ValueError(f"difficulty must be one of {', '.join(sorted(DIFFICULTIES))}")
+
+    tags = row.get('tags') or []
+    lists = row.get('lists') or []
+    for field, values in (('tags', tags), ('lists', lists)):
+        if not isinstance(values, list) or not all(isinstance(v, str) and v for v in values):
+            raise ValueError(f'{field} must be a list of names')
+
+    return {
+        'id': problem_id,
+        'title': title,
+        'url': url,
+        'difficulty': row['difficulty'],
+        'tags': list(dict.fromkeys(tags)),
+        'lists': list(dict.fromkeys(lists)),
+    }
+
+
+class CatalogueImporter:
+    """Upserts problems, their tags and list memberships in batches."""
+
+    def __init__(self, batch_size=500, list_type='custom', stdout=None):
+        self.batch_size = batch_size
+        self.list_type = list_type
+        self.stdout = stdout
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+        self._list_ids = {}
+
+    def import_rows(self, rows, source='<rows>'):
+        """Import an iterable of ``(line_number, row)`` pairs."""
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.batch_size))
+            if not chunk:
+                break
+            valid = {}
+            for line_number, row in chunk:
+                try:
+                    cleaned = clean_row(row)
+                except ValueError as e:
+                    self.errors.append(f'{source}:{line_number}: {e}')
+                    continue
+                # Last occurrence wins; an upsert can't touch one row twice
+                valid[cleaned['id']] = cleaned
+            if valid:
+                self._flush(list(valid.values()))
+                if self.stdout:
+                    self.stdout.write(f'  {source}: {self.created + self.updated} problems upserted')
+
+    def import_file(self, path, fmt=None):
+        self.import_rows(read_rows(path, fmt), source=str(path))
+
+    def _list_id(self, name):
+        if name not in self._list_ids:
+            problem_list = ProblemList.objects.filter(name=name).first()
+            if problem_list is None:
+                problem_list = ProblemList.objects.create(name=name, list_type=self.list_type)
+            self._list_ids[name] = problem_list.id
+        return self._list_ids[name]
+
+    @transaction.atomic
+    def _flush(self, rows):
+        ids = [row['id'] for row in rows]
+        existing = set(Problem.objects.filter(id__in=ids).values_list('id', flat=True))
+        problems = Problem.objects.bulk_create(
+            [
+                Problem(id=row['id'], title=row['title'], url=row['url'],
+                        difficulty=row['difficulty'], tags=row['tags'])
+                for row in rows
+            ],
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=UPDATE_FIELDS,
+        )
+        sync_problem_tags(problems)
+        # Only problems that already existed can be tracked by anyone
+        sync_tracked_problems([problem for problem in problems if problem.pk in existing])
+        ProblemListItem.objects.bulk_create(
+            [
+                ProblemListItem(problem_id=row['id'], list_id=self._list_id(name))
+                for row in rows
+                for name in row['lists']
+            ],
+            ignore_conflicts=True,
+        )
+        self.updated += len(existing)
+        self.created += len(rows) - len(existing)
+
+    def finish(self, reset_sequence=True):
+        """Reset the id sequence past imported ids and invalidate catalogue caches."""
+        statements = connection.ops.sequence_reset_sql(no_style(), [Problem]) if reset_sequence else []
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+        catalogue.bump_version()
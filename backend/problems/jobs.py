@@ -0,0 +1,197 @@
+"""Database-backed background jobs.
+
+Jobs are rows in the ``Job`` table, so no broker is needed: ``enqueue``
+inserts one and ``manage.py run_jobs`` starts a ``Worker`` that claims due
+jobs and runs them on a thread pool. Claiming is a conditional update on the
+job's status, so any number of workers can share the table. Failed jobs are
+retried with exponential backoff up to ``max_attempts``.
+
+The worker also enqueues the daily jobs in ``JOBS_SCHEDULE`` (job name to
+local ``HH:MM``); each run carries a dedupe key for its slot, so several
+workers schedule it only once.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def register(name):
+    """Decorator registering a function as the job ``name``."""
+    def decorator(func):
+        registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, run_after=None, dedupe_key=None, max_attempts=3):
+    """Queue the job ``name``; returns the ``Job``, or None when ``dedupe_key`` was taken."""
+    if name not in registry:
+        raise ValueError(f'Unknown job: {name}')
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                name=name,
+                payload=payload or {},
+                run_after=run_after or timezone.now(),
+                dedupe_key=dedupe_key,
+                max_attempts=max_attempts,
+            )
+    except IntegrityError:
+        if dedupe_key is None:
+            raise
+        return None
+
+
+def queue_stats():
+    """Counts per status and the age of the oldest due job, for health checks."""
+    now = timezone.now()
+    counts = dict(Job.objects.order_by().values_list('status').annotate(count=Count('id')))
+    oldest = Job.objects.filter(status=Job.QUEUED, run_after__lte=now).aggregate(oldest=Min('run_after'))['oldest']
+    return {
+        'queued': counts.get(Job.QUEUED, 0),
+        'running': counts.get(Job.RUNNING, 0),
+        'failed': counts.get(Job.FAILED, 0),
+        'oldest_due_seconds': round((now - oldest).total_seconds(), 3) if oldest else None,
+    }
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=30 * 2 ** (attempts - 1))
+
+
+def run_job(job):
+    """Run a claimed job and record its outcome.
+
+    Jobs whose name is no longer registered (e.g. queued before a deploy that
+    removed them) fail at once instead of being retried.
+    """
+    func = registry.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown job: {job.name}')
+        result = func(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if func is not None and job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + _retry_delay(job.attempts)
+        else:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+        logger.exception('Job %s (%s) failed on attempt %s', job.pk, job.name, job.attempts)
+    else:
+        job.status = Job.DONE
+        job.result = result
+        job.finished_at = timezone.now()
+    job.locked_by = ''
+    job.locked_at = None
+    job.save(update_fields=['status', 'run_after', 'result', 'last_error', 'locked_by', 'locked_at', 'finished_at'])
+    return job
+
+
+def scheduled_slot(at, now):
+    """The most recent local time ``at`` (``HH:MM``) not after ``now``."""
+    hour, minute = (int(part) for part in at.split(':'))
+    local_now = timezone.localtime(now)
+    slot = local_now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if slot > local_now:
+        slot -= timedelta(days=1)
+    return slot
+
+
+class Worker:
+    """Claims due jobs and runs them on a thread pool."""
+
+    def __init__(self, threads=None, poll_interval=None, schedule=None):
+        self.threads = threads or getattr(settings, 'JOBS_WORKER_THREADS', 2)
+        self.poll_interval = poll_interval if poll_interval is not None else getattr(settings, 'JOBS_POLL_INTERVAL', 1.0)
+        self.schedule = getattr(settings, 'JOBS_SCHEDULE', {}) if schedule is None else schedule
+        self.lock_timeout = timedelta(seconds=getattr(settings, 'JOBS_LOCK_TIMEOUT', 3600))
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self._stop = threading.Event()
+        self._in_flight = set()
+        self._in_flight_lock = threading.Lock()
+        self._scheduled = {}
+
+    def stop(self):
+        self._stop.set()
+
+    def enqueue_scheduled(self, now=None):
+        """Enqueue each scheduled job for its latest slot, once across workers."""
+        now = now or timezone.now()
+        for name, at in self.schedule.items():
+            slot = scheduled_slot(at, now)
+            if self._scheduled.get(name) != slot:
+                enqueue(name, run_after=slot, dedupe_key=f'{name}@{slot.isoformat()}')
+                self._scheduled[name] = slot
+
+    def requeue_stale(self, now=None):
+        """Return jobs locked by a worker that died mid-run to the queue."""
+        now = now or timezone.now()
+        return Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - self.lock_timeout).update(
+            status=Job.QUEUED, locked_by='', locked_at=None
+        )
+
+    def claim(self, limit):
+        """Claim up to ``limit`` due jobs for this worker."""
+        now = timezone.now()
+        claimed = []
+        candidates = Job.objects.filter(status=Job.QUEUED, run_after__lte=now).values_list('pk', 'attempts')
+        for pk, attempts in candidates[:limit * 2]:
+            updated = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+                status=Job.RUNNING, locked_by=self.worker_id, locked_at=now, attempts=attempts + 1
+            )
+            if updated:
+                claimed.append(Job.objects.get(pk=pk))
+                if len(claimed) >= limit:
+                    break
+        return claimed
+
+    def _run(self, job):
+        try:
+            run_job(job)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.discard(job.pk)
+            close_old_connections()
+
+    def run_pending(self, executor):
+        """Claim as many jobs as there are idle threads and submit them; returns how many."""
+        with self._in_flight_lock:
+            idle = self.threads - len(self._in_flight)
+        if idle <= 0:
+            return 0
+        jobs = self.claim(idle)
+        for job in jobs:
+            with self._in_flight_lock:
+                self._in_flight.add(job.pk)
+            executor.submit(self._run, job)
+        return len(jobs)
+
+    def run(self, once=False):
+        """Process jobs until stopped; with ``once``, exit when nothing is due or running."""
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='job') as executor:
+            while not self._stop.is_set():
+                self.enqueue_scheduled()
+                self.requeue_stale()
+                submitted = self.run_pending(executor)
+                close_old_connections()
+                if once and not submitted and not self._in_flight:
+                    break
+                if not submitted:
+                    self._stop.wait(self.poll_interval)
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from problems.importing import CatalogueImporter
+from problems.models import Problem, ProblemList
+
+
+class Command(BaseCommand):
+    help = 'Stream problems, tags and list memberships from JSON Lines or CSV files into the catalogue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='.jsonl or .csv files to import')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help='Override format detection by extension')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--list-type',
+            choices=[value for value, _ in ProblemList.LIST_TYPE_CHOICES],
+            default='custom',
+            help='Type given to problem lists created by the import'
+        )
+
+    def handle(self, *args, **options):
+        """Import every file, then report totals and rejected rows."""
+        importer = CatalogueImporter(
+            batch_size=options['batch_size'],
+            list_type=options['list_type'],
+            stdout=self.stdout if options['verbosity'] > 1 else None,
+        )
+        started = time.perf_counter()
+        try:
+            for path in options['paths']:
+                importer.import_file(path, options['format'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        finally:
+            importer.finish()
+        elapsed = time.perf_counter() - started
+
+        for error in importer.errors:
+            self.stderr.write(self.style.WARNING(error))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {importer.created} new and {importer.updated} updated problems '
+                f'in {elapsed:.2f}s ({len(importer.errors)} rows rejected). '
+                f'Total problems in database: {Problem.objects.count()}'
+            )
+        )
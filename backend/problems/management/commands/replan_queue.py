@@ -0,0 +1,59 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from problems.due_counts import forget_due_counts, prepare_due_counts
+from problems.models import UserProblem
+from problems.scheduling import SCHEDULERS, get_scheduler, replan
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Recompute review intervals and due dates with a spaced repetition scheduler'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scheduler',
+            help=f"Scheduler to plan with ({', '.join(SCHEDULERS)} or a dotted path). "
+                 "Defaults to SPACED_REPETITION_SCHEDULER."
+        )
+        parser.add_argument('--user', help='Only re-plan the queue of the user with this email')
+        parser.add_argument('--overdue-only', action='store_true', help='Only re-plan problems already due')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Re-plan user queues in bulk."""
+        try:
+            scheduler = get_scheduler(options['scheduler'])
+        except (ValueError, ImportError) as e:
+            raise CommandError(str(e))
+
+        queryset = UserProblem.objects.all()
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(email=options['user'])
+                queryset = queryset.filter(user=user)
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['user']}")
+        if options['overdue_only']:
+            queryset = queryset.due()
+
+        started = time.perf_counter()
+        count = replan(queryset, scheduler, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        # Cached due counts no longer match the new due dates
+        if user is not None:
+            forget_due_counts(user.pk)
+        else:
+            prepare_due_counts(timezone.localdate())
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Re-planned {count} problems with the {scheduler.name or type(scheduler).__name__} '
+                f'scheduler in {elapsed * 1000:.0f}ms'
+            )
+        )
@@ -0,0 +1,122 @@
+import json
+import platform
+import random
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+from problems import benchmarking
+from problems.models import UserProblem
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the hot API endpoints against synthetic data and write a JSON report'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--preset', choices=sorted(benchmarking.PRESETS), default='small',
+            help='Dataset size; --users, --problems and --problems-per-user override it'
+        )
+        parser.add_argument('--users', type=int, help='Synthetic users to create')
+        parser.add_argument('--problems', type=int, help='Synthetic catalogue size')
+        parser.add_argument('--problems-per-user', type=int, help='Problems tracked by each user')
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per worker before timing')
+        parser.add_argument('--concurrency', type=int, default=1, help='Worker threads per scenario')
+        parser.add_argument('--scenario', action='append', help='Only run these scenarios (repeatable)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for data and request mix')
+        parser.add_argument('--output', default='benchmark-report.json', help='Where to write the JSON report')
+        parser.add_argument('--reuse', action='store_true', help='Benchmark existing synthetic data instead of generating')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic data after the run')
+        parser.add_argument('--cleanup-only', action='store_true', help='Delete synthetic data and exit')
+
+    def handle(self, *args, **options):
+        """Generate data, run each scenario and write the report."""
+        if options['cleanup_only']:
+            benchmarking.cleanup()
+            self.stdout.write(self.style.SUCCESS('Removed benchmark data'))
+            return
+
+        if 'localhost' not in settings.ALLOWED_HOSTS and '*' not in settings.ALLOWED_HOSTS:
+            raise CommandError("ALLOWED_HOSTS must include 'localhost' to run benchmarks")
+
+        scenarios = benchmarking.default_scenarios()
+        if options['scenario']:
+            unknown = set(options['scenario']) - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['scenario']]
+
+        for name, value in benchmarking.PRESETS[options['preset']].items():
+            if options[name] is None:
+                options[name] = value
+
+        rng = random.Random(options['seed'])
+        if options['reuse']:
+            users = list(benchmarking.benchmark_users().order_by('id'))
+            if not users:
+                raise CommandError('No benchmark data to reuse; run without --reuse first')
+            options['problems'] = benchmarking.benchmark_problems().count()
+        else:
+            benchmarking.cleanup()
+            started = time.perf_counter()
+            benchmarking.generate_catalogue(options['problems'], rng)
+            users = benchmarking.generate_users(
+                options['users'], options['problems_per_user'], options['problems'], rng
+            )
+            self.stdout.write(f'Generated benchmark data in {time.perf_counter() - started:.1f}s')
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'database': benchmarking.database_info(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'debug': settings.DEBUG,
+                'cache_backend': settings.CACHES['default']['BACKEND'],
+                'session_engine': settings.SESSION_ENGINE,
+                'spaced_repetition_scheduler': settings.SPACED_REPETITION_SCHEDULER,
+                'problem_stats_use_summary': settings.PROBLEM_STATS_USE_SUMMARY,
+                'problem_filters_use_denormalized': settings.PROBLEM_FILTERS_USE_DENORMALIZED,
+            },
+            'dataset': {
+                'preset': options['preset'],
+                'users': len(users),
+                'problems': options['problems'],
+                'user_problems': UserProblem.objects.filter(user__in=benchmarking.benchmark_users()).count(),
+                'seed': options['seed'],
+            },
+            'run': {
+                'requests': options['requests'],
+                'warmup': options['warmup'],
+                'concurrency': options['concurrency'],
+            },
+            'results': {},
+        }
+
+        # Measure the endpoints, not the rate limits
+        unthrottled = override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}})
+        try:
+            unthrottled.enable()
+            for scenario in scenarios:
+                result = benchmarking.run_scenario(
+                    scenario, users, options['requests'], options['concurrency'],
+                    options['warmup'], options['seed']
+                )
+                report['results'][scenario.name] = result
+                self.stdout.write(
+                    f"{scenario.name:<28} {result['throughput_rps']} req/s  "
+                    f"p50 {result['p50_ms']}ms  p99 {result['p99_ms']}ms  errors {result['errors']}"
+                )
+        finally:
+            unthrottled.disable()
+            if not options['keep']:
+                benchmarking.cleanup()
+
+        output = Path(options['output'])
+        output.write_text(json.dumps(report, indent=2) + '\n')
+        self.stdout.write(self.style.SUCCESS(f'Wrote benchmark report to {output}'))
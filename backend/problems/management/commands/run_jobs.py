@@ -0,0 +1,34 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from problems.jobs import Worker, enqueue, registry
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue, including the daily JOBS_SCHEDULE'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, help='Worker threads (defaults to JOBS_WORKER_THREADS)')
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due or running')
+        parser.add_argument('--no-schedule', action='store_true', help="Don't enqueue the daily scheduled jobs")
+        parser.add_argument(
+            '--enqueue', action='append', default=[], metavar='JOB',
+            help=f"Queue a job before starting ({', '.join(sorted(registry))}); repeatable"
+        )
+
+    def handle(self, *args, **options):
+        """Process the job queue until interrupted."""
+        for name in options['enqueue']:
+            try:
+                job = enqueue(name)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f'Queued {name} as job {job.pk}')
+
+        worker = Worker(threads=options['threads'], schedule={} if options['no_schedule'] else None)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+
+        self.stdout.write(f'Worker {worker.worker_id} running with {worker.threads} threads')
+        worker.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS('Worker stopped'))
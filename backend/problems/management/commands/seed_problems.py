@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from problems.importing import CatalogueImporter
 from problems.models import Problem
 
 
@@ -111,23 +112,13 @@ class Command(BaseCommand):
             {"id": 100, "title": "Same Tree", "url": "https://leetcode.com/problems/same-tree/", "difficulty": "Easy", "tags": ["Tree", "Depth-First Search", "Breadth-First Search", "Binary Tree"]},
         ]
         
-        created_count = 0
-        for problem_data in problems_data:
-            problem, created = Problem.objects.get_or_create(
-                id=problem_data['id'],
-                defaults={
-                    'title': problem_data['title'],
-                    'url': problem_data['url'],
-                    'difficulty': problem_data['difficulty'],
-                    'tags': problem_data['tags']
-                }
-            )
-            if created:
-                created_count += 1
+        importer = CatalogueImporter()
+        importer.import_rows(enumerate(problems_data, 1), source='seed')
+        importer.finish()
         
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully seeded {created_count} problems. '
+                f'Successfully seeded {importer.created} problems. '
                 f'Total problems in database: {Problem.objects.count()}'
             )
         )
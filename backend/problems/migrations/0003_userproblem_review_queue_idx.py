@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0002_problemlist_userlist_userlistitem_problemlistitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userproblem',
+            index=models.Index(fields=['user', 'next_due'], name='userproblem_review_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('problems', '0003_userproblem_review_queue_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProblemSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='problem_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_problems', models.IntegerField(default=0)),
+                ('solved_problems', models.IntegerField(default=0)),
+                ('confidence_sum', models.BigIntegerField(default=0)),
+                ('easy_count', models.IntegerField(default=0)),
+                ('medium_count', models.IntegerField(default=0)),
+                ('hard_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0004_userproblemsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProblemTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='problem_tags', to='problems.problem')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='problem_tags', to='problems.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', 'problem'], name='problemtag_tag_problem_idx')],
+                'unique_together': {('problem', 'tag')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def populate_tag_index(apps, schema_editor):
+    Problem = apps.get_model('problems', 'Problem')
+    Tag = apps.get_model('problems', 'Tag')
+    ProblemTag = apps.get_model('problems', 'ProblemTag')
+    
+    problems = list(Problem.objects.values_list('id', 'tags'))
+    names = {name for _, tags in problems for name in tags or []}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    tag_ids = dict(Tag.objects.values_list('name', 'id'))
+    ProblemTag.objects.bulk_create([
+        ProblemTag(problem_id=problem_id, tag_id=tag_ids[name])
+        for problem_id, tags in problems
+        for name in set(tags or [])
+    ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0005_tag_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_tag_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0006_populate_tag_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='bit',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Position in UserProblem.tag_mask; unset once all bits are taken', null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='userproblem',
+            name='difficulty',
+            field=models.CharField(blank=True, choices=[('Easy', 'Easy'), ('Medium', 'Medium'), ('Hard', 'Hard')], max_length=10),
+        ),
+        migrations.AddField(
+            model_name='userproblem',
+            name='tag_mask',
+            field=models.BigIntegerField(default=0, help_text="Bitmask of the problem's tags by Tag.bit"),
+        ),
+        migrations.AddIndex(
+            model_name='userproblem',
+            index=models.Index(fields=['user', 'difficulty', 'next_due'], name='userproblem_difficulty_idx'),
+        ),
+    ]
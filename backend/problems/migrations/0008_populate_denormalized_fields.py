@@ -0,0 +1,45 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+
+MAX_TAG_BITS = 63
+
+
+def populate_denormalized_fields(apps, schema_editor):
+    Tag = apps.get_model('problems', 'Tag')
+    Problem = apps.get_model('problems', 'Problem')
+    UserProblem = apps.get_model('problems', 'UserProblem')
+
+    # The most used tags get the bits
+    tags = list(
+        Tag.objects.annotate(usage=Count('problem_tags')).order_by('-usage', 'id')[:MAX_TAG_BITS]
+    )
+    for bit, tag in enumerate(tags):
+        tag.bit = bit
+    Tag.objects.bulk_update(tags, ['bit'])
+    bits = {tag.name: tag.bit for tag in tags}
+
+    groups = defaultdict(list)
+    for problem_id, difficulty, names in Problem.objects.values_list('id', 'difficulty', 'tags'):
+        mask = 0
+        for name in names or []:
+            if name in bits:
+                mask |= 1 << bits[name]
+        groups[(difficulty, mask)].append(problem_id)
+    for (difficulty, mask), problem_ids in groups.items():
+        for start in range(0, len(problem_ids), 500):
+            UserProblem.objects.filter(problem_id__in=problem_ids[start:start + 500]).update(
+                difficulty=difficulty, tag_mask=mask
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0007_userproblem_denormalized_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_denormalized_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('problems', '0009_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('reviews', models.IntegerField(default=0)),
+                ('solved', models.IntegerField(default=0)),
+                ('problems', models.IntegerField(default=0, help_text='Distinct problems reviewed')),
+                ('confidence_change', models.IntegerField(default=0, help_text='Sum of requested confidence changes')),
+                ('retention', models.JSONField(blank=True, default=dict, help_text='Reviews and solves by days since the previous attempt: {bucket: [reviews, solved]}')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'user daily stats',
+                'ordering': ['day'],
+                'unique_together': {('user', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ReviewEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('reviewed_at', models.DateTimeField()),
+                ('confidence_change', models.SmallIntegerField()),
+                ('confidence', models.PositiveSmallIntegerField(help_text='Confidence after the review')),
+                ('solved', models.BooleanField()),
+                ('elapsed_days', models.PositiveIntegerField(blank=True, help_text='Days since the previous attempt, empty for the first one', null=True)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_events', to='problems.problem')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='review_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='reviewevent_day_idx'), models.Index(fields=['user', 'day'], name='reviewevent_user_day_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProblemDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('reviews', models.IntegerField(default=0)),
+                ('solved', models.IntegerField(default=0)),
+                ('users', models.IntegerField(default=0, help_text='Distinct users reviewing it')),
+                ('confidence_change', models.IntegerField(default=0, help_text='Sum of requested confidence changes')),
+                ('problem', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='problems.problem')),
+            ],
+            options={
+                'verbose_name_plural': 'problem daily stats',
+                'ordering': ['day'],
+                'unique_together': {('problem', 'day')},
+            },
+        ),
+    ]
@@ -1,7 +1,11 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
+from time import time_ns
+
+from .scheduling import get_scheduler
 
 User = get_user_model()
 
@@ -29,6 +33,58 @@ class Problem(models.Model):
         return f"{self.id}. {self.title}"
 
 
+class Tag(models.Model):
+    """Normalized problem tag backing indexed tag filters."""
+    name = models.CharField(max_length=100, unique=True)
+    bit = models.PositiveSmallIntegerField(
+        null=True, blank=True, unique=True,
+        help_text="Position in UserProblem.tag_mask; unset once all bits are taken"
+    )
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class ProblemTag(models.Model):
+    """Tag membership of a problem, mirrored from ``Problem.tags``."""
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='problem_tags')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='problem_tags')
+    
+    class Meta:
+        unique_together = ['problem', 'tag']
+        indexes = [
+            models.Index(fields=['tag', 'problem'], name='problemtag_tag_problem_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.problem_id} - {self.tag_id}"
+
+
+def end_of_day(day):
+    """Return the first instant after ``day`` in the current timezone."""
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def end_of_today():
+    """Return the first instant of tomorrow in the current timezone."""
+    return end_of_day(timezone.localdate())
+
+
+class UserProblemQuerySet(models.QuerySet):
+    """Queries over a user's review queue."""
+    
+    def due(self, until=None):
+        """Problems due before ``until`` (defaults to the end of today).
+        
+        Uses a plain range on ``next_due`` instead of ``next_due__date`` so the
+        (user, next_due) review queue index can serve the scan.
+        """
+        return self.filter(next_due__lt=until or end_of_today())
+
+
 class UserProblem(models.Model):
     """User's progress on a specific problem with spaced repetition."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='user_problems')
@@ -39,40 +95,141 @@ class UserProblem(models.Model):
     next_due = models.DateTimeField(default=timezone.now)
     attempts_count = models.IntegerField(default=0)
     solved_count = models.IntegerField(default=0)
+    # Copied from the problem (see tags.sync_tracked_problems) so listings filter without a join
+    difficulty = models.CharField(max_length=10, choices=Problem.DIFFICULTY_CHOICES, blank=True)
+    tag_mask = models.BigIntegerField(default=0, help_text="Bitmask of the problem's tags by Tag.bit")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = UserProblemQuerySet.as_manager()
+    
     class Meta:
         unique_together = ['user', 'problem']
         ordering = ['next_due']
+        indexes = [
+            models.Index(fields=['user', 'next_due'], name='userproblem_review_queue_idx'),
+            models.Index(fields=['user', 'difficulty', 'next_due'], name='userproblem_difficulty_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.problem.title}"
     
-    def update_confidence(self, confidence_change):
-        """Update confidence and recalculate next_due date."""
-        self.confidence = max(0, min(100, self.confidence + confidence_change))
-        self.last_attempted = timezone.now()
-        self.attempts_count += 1
+    # Columns written by a review; everything else is left untouched on save
+    REVIEW_FIELDS = [
+        'confidence', 'frequency_days', 'last_attempted', 'next_due',
+        'attempts_count', 'solved_count', 'updated_at',
+    ]
+    
+    def apply_review(self, confidence_change, now=None):
+        """Apply a review in memory without saving.
         
-        # Spaced repetition algorithm
+        Returns ``(confidence_delta, newly_solved, event)``: the deltas for
+        summary bookkeeping and an unsaved ``ReviewEvent`` for the history.
+        """
+        now = now or timezone.now()
+        previous_confidence = self.confidence
+        previous_attempt = self.last_attempted
+        was_solved = self.solved_count > 0
+        self.last_attempted = now
+        self.attempts_count += 1
         if confidence_change > 0:
             self.solved_count += 1
-            # Increase frequency for successful attempts
-            self.frequency_days = min(30, self.frequency_days * 1.5)
-        else:
-            # Decrease frequency for failed attempts
-            self.frequency_days = max(1, self.frequency_days * 0.7)
+        
+        # Spaced repetition algorithm
+        self.confidence, self.frequency_days = get_scheduler().review(
+            self.confidence, self.frequency_days, confidence_change
+        )
         
         # Calculate next due date
-        self.next_due = timezone.now() + timedelta(days=self.frequency_days)
-        self.save()
+        self.next_due = now + timedelta(days=self.frequency_days)
+        self.updated_at = now
+        event = ReviewEvent(
+            user_id=self.user_id,
+            problem_id=self.problem_id,
+            day=timezone.localdate(now),
+            reviewed_at=now,
+            confidence_change=confidence_change,
+            confidence=self.confidence,
+            solved=confidence_change > 0,
+            elapsed_days=(now - previous_attempt).days if previous_attempt else None,
+        )
+        return self.confidence - previous_confidence, not was_solved and self.solved_count > 0, event
+    
+    def update_confidence(self, confidence_change):
+        """Update confidence and recalculate next_due date."""
+        with transaction.atomic():
+            # Before the row changes, so a summary rebuild can't count this review twice
+            UserProblemSummary.lock(self.user_id)
+            confidence_delta, newly_solved, event = self.apply_review(confidence_change)
+            self.save(update_fields=self.REVIEW_FIELDS)
+            event.save()
+            
+            UserProblemSummary.record_review(
+                self.user_id,
+                confidence_delta=confidence_delta,
+                solved_delta=int(newly_solved),
+            )
+        
+        from .due_counts import forget_due_counts
+        forget_due_counts(self.user_id)
     
     def is_due_today(self):
         """Check if problem is due for review today."""
         return self.next_due.date() <= timezone.now().date()
 
 
+class UserProblemSummary(models.Model):
+    """Materialized per-user counters backing the stats panel.
+    
+    Reviews update the row incrementally; adding or removing tracked problems
+    drops it so the next stats read rebuilds it from a single aggregate.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='problem_summary')
+    total_problems = models.IntegerField(default=0)
+    solved_problems = models.IntegerField(default=0)
+    confidence_sum = models.BigIntegerField(default=0)
+    easy_count = models.IntegerField(default=0)
+    medium_count = models.IntegerField(default=0)
+    hard_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Summary for user {self.user_id}"
+    
+    @classmethod
+    def lock(cls, *user_ids):
+        """Lock the users' rows until the transaction ends, while summaries are in use.
+        
+        Rebuilds aggregate under this lock and reviews and invalidations take it
+        too, so each change lands in the rebuilt summary exactly once.
+        """
+        if getattr(settings, 'PROBLEM_STATS_USE_SUMMARY', False):
+            list(User.objects.select_for_update().filter(pk__in=user_ids).order_by('pk').values_list('pk', flat=True))
+    
+    @classmethod
+    def record_review(cls, user_id, confidence_delta=0, solved_delta=0):
+        """Apply the counter deltas of one or more reviews to the user's summary, if any."""
+        if not getattr(settings, 'PROBLEM_STATS_USE_SUMMARY', False):
+            # Nothing reads summaries; the nightly refresh corrects them if re-enabled
+            return
+        if not confidence_delta and not solved_delta:
+            return
+        with transaction.atomic():
+            cls.lock(user_id)
+            cls.objects.filter(user_id=user_id).update(
+                confidence_sum=models.F('confidence_sum') + confidence_delta,
+                solved_problems=models.F('solved_problems') + solved_delta,
+                updated_at=timezone.now(),
+            )
+    
+    @classmethod
+    def invalidate(cls, *user_ids):
+        """Drop the users' summaries so they are rebuilt on the next read."""
+        with transaction.atomic():
+            cls.lock(*user_ids)
+            cls.objects.filter(user_id__in=user_ids).delete()
+
+
 class ProblemList(models.Model):
     """Metadata lists like Top100, Top200, Amazon, Meta."""
     LIST_TYPE_CHOICES = [
@@ -139,3 +296,164 @@ class UserListItem(models.Model):
     
     def __str__(self):
         return f"{self.user_list.name} - {self.problem.title}"
+
+
+class Job(models.Model):
+    """A unit of background work, queued in the database and run by ``manage.py run_jobs``."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=100, help_text="Registered job name, see problems/jobs.py")
+    payload = models.JSONField(default=dict, blank=True, help_text="Keyword arguments for the job")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    dedupe_key = models.CharField(
+        max_length=200, null=True, blank=True, unique=True,
+        help_text="Enqueueing a second job with the same key is a no-op"
+    )
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class ReviewEvent(models.Model):
+    """Append-only log of reviews, one compact row per review.
+    
+    ``day`` (the local date of the review) is the bucketing key: rollups
+    aggregate one day at a time and old days can be archived or partitioned
+    away wholesale. Requests never read this table; analytics use the daily
+    rollups built from it (see ``analytics.py``).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='review_events', db_index=False)
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='review_events')
+    day = models.DateField()
+    reviewed_at = models.DateTimeField()
+    confidence_change = models.SmallIntegerField()
+    confidence = models.PositiveSmallIntegerField(help_text="Confidence after the review")
+    solved = models.BooleanField()
+    elapsed_days = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Days since the previous attempt, empty for the first one"
+    )
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['day'], name='reviewevent_day_idx'),
+            models.Index(fields=['user', 'day'], name='reviewevent_user_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} reviewed {self.problem_id} on {self.day}"
+
+
+class UserDailyStats(models.Model):
+    """A user's reviews on one day, rolled up from ``ReviewEvent``."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats', db_index=False)
+    day = models.DateField()
+    reviews = models.IntegerField(default=0)
+    solved = models.IntegerField(default=0)
+    problems = models.IntegerField(default=0, help_text="Distinct problems reviewed")
+    confidence_change = models.IntegerField(default=0, help_text="Sum of requested confidence changes")
+    retention = models.JSONField(
+        default=dict, blank=True,
+        help_text="Reviews and solves by days since the previous attempt: {bucket: [reviews, solved]}"
+    )
+    
+    class Meta:
+        unique_together = ['user', 'day']
+        ordering = ['day']
+        verbose_name_plural = 'user daily stats'
+    
+    def __str__(self):
+        return f"{self.user_id} on {self.day}"
+
+
+class ProblemDailyStats(models.Model):
+    """A problem's reviews across all users on one day, rolled up from ``ReviewEvent``."""
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='daily_stats', db_index=False)
+    day = models.DateField()
+    reviews = models.IntegerField(default=0)
+    solved = models.IntegerField(default=0)
+    users = models.IntegerField(default=0, help_text="Distinct users reviewing it")
+    confidence_change = models.IntegerField(default=0, help_text="Sum of requested confidence changes")
+    
+    class Meta:
+        unique_together = ['problem', 'day']
+        ordering = ['day']
+        verbose_name_plural = 'problem daily stats'
+    
+    def __str__(self):
+        return f"{self.problem_id} on {self.day}"
+
+
+class CacheVersion(models.Model):
+    """A named version token shared by every process through the database.
+    
+    In-process caches and indexes (catalogue reads, search and facet indexes)
+    remember the token they were built under and rebuild once it changes,
+    whichever process bumped it.
+    """
+    key = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField()
+    
+    def __str__(self):
+        return f"{self.key} @ {self.value}"
+    
+    @classmethod
+    def get(cls, key):
+        """Current token for ``key``, creating it on first use."""
+        value = cls.objects.filter(key=key).values_list('value', flat=True).first()
+        if value is None:
+            # Start from the clock, never a fixed value: entries cached under a
+            # deleted row's tokens must not become live again
+            # Use the created token rather than re-reading it, which a lagging
+            # replica may not have yet; if another process created the row
+            # first, entries cached under this token are rebuilt once
+            value = time_ns()
+            cls.objects.bulk_create([cls(key=key, value=value)], ignore_conflicts=True)
+        return value
+    
+    @classmethod
+    async def aget(cls, key):
+        """Async variant of ``get``."""
+        value = await cls.objects.filter(key=key).values_list('value', flat=True).afirst()
+        if value is None:
+            value = time_ns()
+            await cls.objects.abulk_create([cls(key=key, value=value)], ignore_conflicts=True)
+        return value
+    
+    @classmethod
+    def incr(cls, *keys):
+        """Add one to the counters ``keys``, starting missing ones from zero."""
+        cls.objects.bulk_create([cls(key=key, value=0) for key in keys], ignore_conflicts=True)
+        cls.objects.filter(key__in=keys).update(value=models.F('value') + 1)
+    
+    @classmethod
+    def bump(cls, *keys):
+        """Give ``keys`` new tokens in a single upsert."""
+        value = time_ns()
+        cls.objects.bulk_create(
+            [cls(key=key, value=value) for key in keys],
+            update_conflicts=True, unique_fields=['key'], update_fields=['value'],
+        )
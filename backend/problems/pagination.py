@@ -0,0 +1,127 @@
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+
+
+class ProblemCursorPagination(CursorPagination):
+    """Keyset pagination over the catalogue by problem id."""
+    ordering = 'id'
+
+
+class CompositeCursorPagination(CursorPagination):
+    """Keyset pagination over a multi-column ordering whose last column is unique.
+    
+    DRF's ``CursorPagination`` only keys on the first ordering column and
+    steps over ties with an offset, which degrades into an ``OFFSET`` scan
+    when many rows share a value. Here the cursor holds every ordering
+    column, so each page is a pure keyset seek:
+    ``a >= x AND (a > x OR (a = x AND b > y))``.
+    """
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+    
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            _, reverse, current_position = self.cursor
+    
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self._seek(self._decode_position(current_position), after=not reverse))
+    
+        # One extra row tells whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = current_position is not None, has_following
+        else:
+            self.has_next, self.has_previous = has_following, current_position is not None
+        # Where an empty page's links continue from
+        self.next_position = self.previous_position = current_position
+    
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+    
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # Positions are unique, so links never need an offset
+        position = self._get_position_from_instance(self.page[-1], self.ordering) if self.page else self.next_position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+    
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering) if self.page else self.previous_position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+    
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(str(value))
+        return json.dumps(values)
+    
+    def _decode_position(self, position):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+    
+    def _seek(self, values, after):
+        """Rows strictly after (or before) ``values`` in the ordering."""
+        condition, equal = Q(), Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'gt' if after != field.startswith('-') else 'lt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        # Redundant bound on the leading column, so the database can range-scan its index
+        first = self.ordering[0]
+        lookup = 'gte' if after != first.startswith('-') else 'lte'
+        return Q(**{f'{first.lstrip("-")}__{lookup}': values[0]}) & condition
+
+
+class UserProblemCursorPagination(CompositeCursorPagination):
+    """Keyset pagination over a user's queue by (next_due, id)."""
+    ordering = ('next_due', 'id')
+
+
+class OptInCursorPaginationMixin:
+    """Let list views switch to keyset pagination with ``?pagination=cursor``.
+    
+    Cursor pages skip the ``COUNT(*)`` and the growing ``OFFSET`` scan of page
+    number pagination; responses carry ``next``/``previous`` cursor links and
+    no ``count``.
+    """
+    cursor_pagination_class = None
+    
+    def use_cursor_pagination(self):
+        return (
+            self.cursor_pagination_class is not None
+            and self.request.query_params.get('pagination') == 'cursor'
+        )
+    
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and self.use_cursor_pagination():
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
@@ -0,0 +1,136 @@
+"""Serialization fast path for the hot list endpoints.
+
+Model serializers build field objects and walk every attribute per row, and
+``is_due_today`` calls ``timezone.now()`` for each one. ``ValuesSerializer``
+instead reads plain ``.values()`` rows and shapes them into exactly the
+output of the wrapped serializer's ``.data``, resolving "today" and the time
+zone once per response. ``FastJSONRenderer`` then encodes the response in a
+single pass with orjson when it is installed.
+"""
+from functools import cached_property
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from .serializers import DashboardSerializer, ProblemSerializer, UserProblemSerializer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def datetime_formatter():
+    """Return a function equivalent to ``serializers.DateTimeField().to_representation``."""
+    if not settings.USE_TZ or (api_settings.DATETIME_FORMAT or '').lower() != ISO_8601:
+        return serializers.DateTimeField().to_representation
+
+    current_timezone = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        if not value:
+            return None
+        value = value.astimezone(current_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+    return format_datetime
+
+
+class ValuesSerializer:
+    """Serialize ``.values()`` rows with the output shape of ``serializer_class``.
+
+    Supports the flat model fields of the user problem serializers plus the
+    nested ``problem`` and the computed ``is_due_today``.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def fields(self):
+        return [
+            (name, field) for name, field in self.serializer_class().fields.items()
+            if not field.write_only
+        ]
+
+    @cached_property
+    def values(self):
+        """Column names to pass to ``QuerySet.values()``."""
+        columns = []
+        for name, _ in self.fields:
+            if name == 'problem':
+                columns.extend(f'problem__{field}' for field in ProblemSerializer.Meta.fields)
+            elif name == 'is_due_today':
+                columns.append('next_due')
+            else:
+                columns.append(name)
+        return list(dict.fromkeys(columns))
+
+    def rows(self, queryset):
+        return queryset.values(*self.values)
+
+    def serialize(self, rows, today=None):
+        """Shape ``rows`` into the list the model serializer would return."""
+        today = today or timezone.now().date()
+        format_datetime = datetime_formatter()
+        problem_columns = [(field, f'problem__{field}') for field in ProblemSerializer.Meta.fields]
+
+        getters = []
+        for name, field in self.fields:
+            if name == 'problem':
+                getters.append((name, lambda row: {key: row[column] for key, column in problem_columns}))
+            elif name == 'is_due_today':
+                getters.append((name, lambda row: row['next_due'].date() <= today))
+            elif isinstance(field, serializers.DateTimeField):
+                getters.append((name, lambda row, name=name: format_datetime(row[name])))
+            else:
+                getters.append((name, None))
+
+        if all(get is None for _, get in getters):
+            return [dict(row) for row in rows]
+        return [
+            {name: row[name] if get is None else get(row) for name, get in getters}
+            for row in rows
+        ]
+
+
+problem_rows = ValuesSerializer(ProblemSerializer)
+user_problem_rows = ValuesSerializer(UserProblemSerializer)
+dashboard_rows = ValuesSerializer(DashboardSerializer)
+
+
+class ValuesListMixin:
+    """Serve ``list()`` through ``values_serializer`` instead of ``serializer_class``."""
+    values_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.values_serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.values_serializer.serialize(page))
+        return Response(self.values_serializer.serialize(queryset))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` that encodes with orjson when installed, with identical output."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or not self.compact or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping of the JavaScript line terminators as JSONRenderer
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
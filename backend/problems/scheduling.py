@@ -0,0 +1,228 @@
+"""Pluggable spaced-repetition schedulers.
+
+Each scheduler writes its interval formula once against a tiny array
+namespace (``xp``), so the same code runs per review on plain floats or
+vectorized over NumPy arrays for a whole review history. NumPy is optional;
+without it the batch methods fall back to a per-row loop.
+"""
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class _ScalarMath:
+    """The subset of the NumPy API used by schedulers, for plain floats."""
+
+    @staticmethod
+    def minimum(a, b):
+        return min(a, b)
+
+    @staticmethod
+    def maximum(a, b):
+        return max(a, b)
+
+    @staticmethod
+    def where(condition, a, b):
+        return a if condition else b
+
+    @staticmethod
+    def exp(x):
+        return math.exp(x)
+
+    @staticmethod
+    def power(x, y):
+        return x ** y
+
+
+class Scheduler:
+    """Base class for spaced-repetition schedulers.
+
+    Subclasses implement ``next_interval`` using only ``xp.minimum``,
+    ``xp.maximum``, ``xp.where``, ``xp.exp``, ``xp.power`` and arithmetic.
+    """
+    name = None
+    max_interval = 30
+    # Upper bound on replayed reviews per outcome when re-planning history;
+    # intervals saturate at max_interval well before this.
+    max_replay = 50
+
+    def next_interval(self, xp, confidence, frequency_days, success):
+        """Return the next review interval in days after a review."""
+        raise NotImplementedError
+
+    def _clamp(self, xp, interval):
+        return xp.minimum(self.max_interval, xp.maximum(1, interval))
+
+    def review(self, confidence, frequency_days, confidence_change):
+        """Return ``(confidence, frequency_days)`` after a single review."""
+        confidence = max(0, min(100, confidence + confidence_change))
+        interval = self.next_interval(_ScalarMath, confidence, frequency_days, confidence_change > 0)
+        return confidence, interval
+
+    def review_many(self, confidence, frequency_days, confidence_change):
+        """Vectorized ``review`` over equally sized sequences."""
+        if np is None:
+            results = [
+                self.review(*row) for row in zip(confidence, frequency_days, confidence_change)
+            ]
+            return [row[0] for row in results], [row[1] for row in results]
+        change = np.asarray(confidence_change, dtype=float)
+        confidence = np.clip(np.asarray(confidence, dtype=float) + change, 0, 100)
+        frequency_days = np.asarray(frequency_days, dtype=float)
+        return confidence, self.next_interval(np, confidence, frequency_days, change > 0)
+
+    def plan(self, confidence, attempts_count, solved_count):
+        """Interval for a problem re-planned from its review counters.
+
+        The history is replayed from a fresh 1-day interval: failed attempts
+        first, then successful ones, as the order isn't recorded.
+        """
+        interval = 1
+        failures = attempts_count - solved_count
+        for step in range(min(max(failures, 0), self.max_replay)):
+            interval = self.next_interval(_ScalarMath, confidence, interval, False)
+        for step in range(min(solved_count, self.max_replay)):
+            interval = self.next_interval(_ScalarMath, confidence, interval, True)
+        return interval
+
+    def plan_many(self, confidence, attempts_count, solved_count):
+        """Vectorized ``plan`` over equally sized sequences."""
+        if np is None:
+            return [self.plan(*row) for row in zip(confidence, attempts_count, solved_count)]
+        confidence = np.asarray(confidence, dtype=float)
+        solved = np.asarray(solved_count)
+        failures = np.maximum(np.asarray(attempts_count) - solved, 0)
+        interval = np.ones(len(confidence))
+        for outcome, counts in ((False, failures), (True, solved)):
+            if not len(counts):
+                continue
+            for step in range(min(int(counts.max()), self.max_replay)):
+                stepped = self.next_interval(np, confidence, interval, outcome)
+                interval = np.where(step < counts, stepped, interval)
+        return interval
+
+
+class HeuristicScheduler(Scheduler):
+    """The original multiplier heuristic: x1.5 on success, x0.7 on failure."""
+    name = 'heuristic'
+    max_interval = 30
+
+    def next_interval(self, xp, confidence, frequency_days, success):
+        # Increase frequency for successful attempts, decrease it for failed ones
+        return xp.where(
+            success,
+            xp.minimum(self.max_interval, frequency_days * 1.5),
+            xp.maximum(1, frequency_days * 0.7),
+        )
+
+
+class SM2Scheduler(Scheduler):
+    """SuperMemo-2 style intervals with the ease factor derived from confidence.
+
+    Confidence 0-100 maps linearly onto SM-2's ease range of 1.3-2.5.
+    """
+    name = 'sm2'
+    max_interval = 180
+
+    def next_interval(self, xp, confidence, frequency_days, success):
+        ease = 1.3 + 1.2 * confidence / 100
+        grown = xp.where(frequency_days < 6, 6, frequency_days * ease)
+        return xp.where(success, self._clamp(xp, grown), 1)
+
+
+class FSRSScheduler(Scheduler):
+    """Simplified FSRS: the interval is the memory stability at 90% retention.
+
+    Uses the FSRS v4 default weights for the stability updates and derives
+    difficulty (1-10) from confidence. Reviews are assumed to happen on time,
+    so retrievability at review is the 0.9 retention target.
+    """
+    name = 'fsrs'
+    max_interval = 180
+    retention = 0.9
+    weights = {
+        'success_scale': 1.49, 'success_decay': 0.14, 'success_retrievability': 0.94,
+        'lapse_scale': 2.18, 'lapse_difficulty': 0.05, 'lapse_stability': 0.34,
+        'lapse_retrievability': 1.26,
+    }
+
+    def next_interval(self, xp, confidence, frequency_days, success):
+        w = self.weights
+        stability = frequency_days
+        difficulty = 10 - 9 * confidence / 100
+        forgotten = 1 - self.retention
+        recalled = stability * (
+            1 + math.exp(w['success_scale']) * (11 - difficulty)
+            * xp.power(stability, -w['success_decay'])
+            * (math.exp(w['success_retrievability'] * forgotten) - 1)
+        )
+        lapsed = (
+            w['lapse_scale'] * xp.power(difficulty, -w['lapse_difficulty'])
+            * (xp.power(stability + 1, w['lapse_stability']) - 1)
+            * math.exp(w['lapse_retrievability'] * forgotten)
+        )
+        return self._clamp(xp, xp.where(success, recalled, lapsed))
+
+
+SCHEDULERS = {
+    scheduler.name: scheduler
+    for scheduler in [HeuristicScheduler, SM2Scheduler, FSRSScheduler]
+}
+
+
+def get_scheduler(name=None):
+    """Return a scheduler by registry name or dotted path.
+
+    Defaults to the ``SPACED_REPETITION_SCHEDULER`` setting.
+    """
+    name = name or getattr(settings, 'SPACED_REPETITION_SCHEDULER', 'heuristic')
+    if name in SCHEDULERS:
+        return SCHEDULERS[name]()
+    if '.' in name:
+        return import_string(name)()
+    raise ValueError(f"Unknown scheduler '{name}'. Choose from: {', '.join(SCHEDULERS)}")
+
+
+def replan(queryset, scheduler=None, batch_size=1000, postpone=True):
+    """Recompute ``frequency_days`` and ``next_due`` for the reviewed rows in ``queryset``.
+
+    Reads only the counters, plans all rows in one vectorized pass and writes
+    the two scheduling columns back with ``bulk_update`` for the rows whose
+    plan changed. Never reviewed rows have nothing to plan from and stay due
+    as they are. Returns the number of rows updated.
+
+    The plan replays the counters rather than the actual review order, so it
+    can differ from the interval the reviews produced even with the same
+    scheduler. With ``postpone=False`` rows are only ever moved earlier,
+    never out of a queue they are already due in.
+    """
+    from .events import announce
+    from .models import UserProblem
+
+    scheduler = scheduler or get_scheduler()
+    rows = list(queryset.exclude(last_attempted=None).order_by().values_list(
+        'id', 'user_id', 'confidence', 'attempts_count', 'solved_count', 'last_attempted', 'next_due'
+    ))
+    if not rows:
+        return 0
+
+    ids, user_ids, confidence, attempts, solved, last_attempted, next_dues = zip(*rows)
+    intervals = scheduler.plan_many(confidence, attempts, solved)
+    updates, users = [], set()
+    for pk, user_id, interval, reviewed_at, next_due in zip(ids, user_ids, intervals, last_attempted, next_dues):
+        planned = reviewed_at + timedelta(days=float(interval))
+        if planned == next_due or (not postpone and planned > next_due):
+            continue
+        updates.append(UserProblem(id=pk, frequency_days=float(interval), next_due=planned))
+        users.add(user_id)
+    UserProblem.objects.bulk_update(updates, ['frequency_days', 'next_due'], batch_size=batch_size)
+    # Open event streams can't be sent diffs from here; tell them to resync
+    announce(*users)
+    return len(updates)
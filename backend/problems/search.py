@@ -0,0 +1,124 @@
+"""In-process search index over problem titles and tags.
+
+Titles and tags are split into tokens and indexed by trigram (padded like
+PostgreSQL's pg_trgm) and by sorted token for prefix lookups. Trigram
+overlap tolerates typos, while prefix and exact matches rank first. The
+index is built once per catalogue version and shared by every request in the
+process. The version lives in the database (see ``catalogue.py``), so a
+problem written by any process, an import or another worker, makes every
+process rebuild its index on the next search.
+"""
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from . import catalogue
+from .serializers import ProblemSerializer
+
+PROBLEM_FIELDS = ProblemSerializer.Meta.fields
+
+# Minimum share of the query's trigrams a problem must contain to match
+MIN_SIMILARITY = 0.3
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def trigrams(token):
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Trigram and prefix index over a snapshot of the catalogue."""
+
+    def __init__(self, problems):
+        self.problems = {}
+        self.postings = defaultdict(set)
+        self.tokens = {}
+        self.tag_names = {}
+        prefix_entries = set()
+
+        for problem in problems:
+            pk = problem['id']
+            self.problems[pk] = problem
+            tokens = set(tokenize(problem['title']))
+            for tag in problem['tags'] or []:
+                tokens.update(tokenize(tag))
+            self.tokens[pk] = tokens
+            self.tag_names[pk] = {tag.lower() for tag in problem['tags'] or []}
+            for token in tokens:
+                prefix_entries.add((token, pk))
+                for gram in trigrams(token):
+                    self.postings[gram].add(pk)
+
+        self.prefixes = sorted(prefix_entries)
+
+    def _prefix_matches(self, prefix):
+        """Ids of problems with a token starting with ``prefix``."""
+        matches = set()
+        position = bisect_left(self.prefixes, (prefix,))
+        while position < len(self.prefixes) and self.prefixes[position][0].startswith(prefix):
+            matches.add(self.prefixes[position][1])
+            position += 1
+        return matches
+
+    def search(self, query, limit=20):
+        """Return ``(problem, score)`` pairs ranked by relevance."""
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        query_grams = set().union(*(trigrams(token) for token in query_tokens))
+        shared = Counter()
+        for gram in query_grams:
+            for pk in self.postings.get(gram, ()):
+                shared[pk] += 1
+
+        scores = {}
+        for pk, count in shared.items():
+            similarity = count / len(query_grams)
+            if similarity >= MIN_SIMILARITY:
+                scores[pk] = similarity
+
+        # Boost prefix hits per query token (covers partially typed words)
+        for token in query_tokens:
+            for pk in self._prefix_matches(token):
+                scores[pk] = scores.get(pk, 0) + 0.5 / len(query_tokens)
+
+        phrase = ' '.join(query_tokens)
+        for pk in scores:
+            problem = self.problems[pk]
+            if ' '.join(tokenize(problem['title'])).startswith(phrase):
+                scores[pk] += 1
+            if phrase in self.tag_names[pk]:
+                scores[pk] += 0.5
+
+        # Searching by problem number
+        if query.strip().isdigit() and int(query) in self.problems:
+            scores[int(query)] = scores.get(int(query), 0) + 2
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(self.problems[pk], round(score, 4)) for pk, score in ranked]
+
+
+_index_lock = threading.Lock()
+_index = (None, None)
+
+
+def get_index():
+    """Return the search index for the current catalogue version, rebuilding if stale."""
+    global _index
+    from .models import Problem
+
+    # Read before the snapshot: a write in between only causes one extra rebuild
+    version = catalogue.get_version()
+    if _index[0] != version:
+        with _index_lock:
+            if _index[0] != version:
+                _index = (version, SearchIndex(Problem.objects.values(*PROBLEM_FIELDS)))
+    return _index[1]
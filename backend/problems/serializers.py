@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Problem, UserProblem
+from .models import Problem, ProblemList, UserList, UserProblem
 
 
 class ProblemSerializer(serializers.ModelSerializer):
@@ -29,22 +29,44 @@ class UserProblemSerializer(serializers.ModelSerializer):
         ]
     
     def create(self, validated_data):
-        """Create or get existing UserProblem."""
+        """Start tracking the problem, or return the existing UserProblem."""
+        from .tracking import track_problems
         problem_id = validated_data.pop('problem_id')
-        user = validated_data.get('user')
+        user = validated_data.pop('user')
         
-        # Check if UserProblem already exists
-        user_problem, created = UserProblem.objects.get_or_create(
-            user=user,
-            problem_id=problem_id,
-            defaults=validated_data
-        )
-        
-        if not created:
-            # If it already exists, return the existing one
-            return user_problem
-        
-        return user_problem
+        user_problems, _ = track_problems(user, [problem_id], defaults=validated_data)
+        if not user_problems:
+            raise serializers.ValidationError({'problem_id': ['Problem not found.']})
+        return user_problems[0]
+
+
+class BulkTrackSerializer(serializers.Serializer):
+    """Problems to start tracking: explicit ids, a curated list, or one of the user's lists."""
+    problem_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=1000
+    )
+    list_id = serializers.IntegerField(required=False, help_text="ProblemList id")
+    user_list_id = serializers.IntegerField(required=False, help_text="UserList id")
+    
+    def validate(self, attrs):
+        if len(attrs) != 1:
+            raise serializers.ValidationError('Provide exactly one of problem_ids, list_id or user_list_id.')
+        return attrs
+    
+    def validate_problem_ids(self, value):
+        missing = sorted(set(value) - set(Problem.objects.filter(pk__in=value).values_list('pk', flat=True)))
+        if missing:
+            raise serializers.ValidationError(f'Unknown problems: {missing}')
+        return value
+
+
+def review_confidence_change(confidence_change, solved):
+    """Adjust a requested confidence change to agree with the solved flag."""
+    if solved and confidence_change <= 0:
+        return 20  # Positive change for solving
+    if not solved and confidence_change >= 0:
+        return -10  # Negative change for not solving
+    return confidence_change
 
 
 class UserProblemUpdateSerializer(serializers.Serializer):
@@ -60,19 +82,24 @@ class UserProblemUpdateSerializer(serializers.Serializer):
     )
     
     def update(self, instance, validated_data):
-        confidence_change = validated_data.get('confidence_change', 0)
-        solved = validated_data.get('solved', False)
-        
-        # Adjust confidence change based on solved status
-        if solved and confidence_change <= 0:
-            confidence_change = 20  # Positive change for solving
-        elif not solved and confidence_change >= 0:
-            confidence_change = -10  # Negative change for not solving
-        
+        confidence_change = review_confidence_change(
+            validated_data.get('confidence_change', 0),
+            validated_data.get('solved', False),
+        )
         instance.update_confidence(confidence_change)
         return instance
 
 
+class ReviewEntrySerializer(UserProblemUpdateSerializer):
+    """A single review inside a bulk submission."""
+    id = serializers.IntegerField(help_text="UserProblem id")
+
+
+class BulkReviewSerializer(serializers.Serializer):
+    """Serializer for submitting many reviews at once."""
+    reviews = ReviewEntrySerializer(many=True, allow_empty=False, max_length=500)
+
+
 class DashboardSerializer(serializers.ModelSerializer):
     """Serializer for dashboard problems due today."""
     problem = ProblemSerializer(read_only=True)
@@ -87,3 +114,74 @@ class DashboardSerializer(serializers.ModelSerializer):
         ]
 
 
+class ProblemProgressSerializer(serializers.ModelSerializer):
+    """The requesting user's progress on a problem inside a list."""
+    is_due_today = serializers.BooleanField(read_only=True)
+    
+    class Meta:
+        model = UserProblem
+        fields = [
+            'id', 'confidence', 'next_due', 'attempts_count', 'solved_count',
+            'is_due_today'
+        ]
+
+
+class ListProblemSerializer(ProblemSerializer):
+    """Problem within a list, overlaid with the user's progress (or null)."""
+    progress = serializers.SerializerMethodField()
+    
+    class Meta(ProblemSerializer.Meta):
+        fields = ProblemSerializer.Meta.fields + ['progress']
+    
+    def get_progress(self, problem):
+        user_problem = self.context.get('progress', {}).get(problem.id)
+        if user_problem is None:
+            return None
+        return ProblemProgressSerializer(user_problem).data
+
+
+class ProblemListSerializer(serializers.ModelSerializer):
+    """Serializer for curated problem lists."""
+    problem_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = ProblemList
+        fields = ['id', 'name', 'description', 'list_type', 'problem_count', 'created_at', 'updated_at']
+
+
+class ListItemsField(serializers.Field):
+    """Serializes a list's prefetched items as problems with progress."""
+    
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, instance):
+        problems = [item.problem for item in instance.items.all()]
+        return ListProblemSerializer(problems, many=True, context=self.context).data
+
+
+class ProblemListDetailSerializer(ProblemListSerializer):
+    """Curated list with its problems."""
+    problems = ListItemsField()
+    
+    class Meta(ProblemListSerializer.Meta):
+        fields = ProblemListSerializer.Meta.fields + ['problems']
+
+
+class UserListSerializer(serializers.ModelSerializer):
+    """Serializer for user-created lists."""
+    problem_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = UserList
+        fields = ['id', 'name', 'description', 'problem_count', 'created_at', 'updated_at']
+
+
+class UserListDetailSerializer(UserListSerializer):
+    """User-created list with its problems."""
+    problems = ListItemsField()
+    
+    class Meta(UserListSerializer.Meta):
+        fields = UserListSerializer.Meta.fields + ['problems']
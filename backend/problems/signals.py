@@ -0,0 +1,93 @@
+import threading
+from collections import defaultdict
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import catalogue
+from .due_counts import forget_due_counts
+from .events import publish_tracking
+from .facets import forget_tracked
+from .models import Problem, UserProblem, UserProblemSummary
+from .tags import sync_problem_tags, sync_tracked_problems, tracked_fields
+
+
+@receiver(post_save, sender=Problem)
+def sync_tags_on_problem_save(sender, instance, raw=False, **kwargs):
+    """Keep the tag index and tracked copies in step with the problem."""
+    if not raw:
+        sync_problem_tags([instance])
+        sync_tracked_problems([instance])
+
+
+@receiver(post_save, sender=Problem)
+def bump_catalogue_version(sender, **kwargs):
+    catalogue.bump_version()
+
+
+@receiver(pre_save, sender=UserProblem)
+def copy_problem_fields_on_track(sender, instance, raw=False, **kwargs):
+    """Fill the denormalized difficulty and tag mask of newly tracked problems."""
+    if not raw and instance._state.adding and not instance.difficulty:
+        for field, value in tracked_fields(instance.problem).items():
+            setattr(instance, field, value)
+
+
+@receiver(post_save, sender=UserProblem)
+def invalidate_summary_on_track(sender, instance, created, **kwargs):
+    """Newly tracked problems change totals the summary can't derive cheaply."""
+    if created:
+        UserProblemSummary.invalidate(instance.user_id)
+        forget_due_counts(instance.user_id)
+        forget_tracked(instance.user_id)
+        publish_tracking(instance.user_id, [instance], tracked=True)
+
+
+class _Deletion:
+    """What one ``delete()`` call invalidates, gathered before its rows go."""
+    
+    def __init__(self):
+        self.catalogue = False
+        self.untracked = defaultdict(list)
+    
+    def apply(self):
+        if self.catalogue:
+            catalogue.bump_version()
+        user_ids = list(self.untracked)
+        if user_ids:
+            UserProblemSummary.invalidate(*user_ids)
+            forget_due_counts(*user_ids)
+            forget_tracked(*user_ids)
+        for user_id, user_problems in self.untracked.items():
+            publish_tracking(user_id, user_problems, tracked=False)
+
+
+# Deletions in progress on this thread, by the id of their ``origin``
+_deletions = threading.local()
+
+
+def _pending():
+    if not hasattr(_deletions, 'by_origin'):
+        _deletions.by_origin = {}
+    return _deletions.by_origin
+
+
+# Django sends pre_delete for every collected row before deleting any of them,
+# so a delete() of a user or of many problems invalidates once, not per row
+@receiver(pre_delete, sender=Problem)
+def collect_problem_delete(sender, instance, origin=None, **kwargs):
+    _pending().setdefault(id(origin), _Deletion()).catalogue = True
+
+
+@receiver(pre_delete, sender=UserProblem)
+def collect_untrack(sender, instance, origin=None, **kwargs):
+    _pending().setdefault(id(origin), _Deletion()).untracked[instance.user_id].append(instance)
+
+
+@receiver(post_delete, sender=Problem)
+@receiver(post_delete, sender=UserProblem)
+def invalidate_on_delete(sender, origin=None, **kwargs):
+    """Apply the deletion's invalidations on the first row it deleted."""
+    deletion = _pending().pop(id(origin), None)
+    if deletion is not None:
+        deletion.apply()
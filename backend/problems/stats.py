@@ -0,0 +1,128 @@
+"""Aggregated per-user problem statistics."""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Q, Sum
+
+from .due_counts import adue_count, due_count
+from .models import Problem, UserProblem, UserProblemSummary, end_of_today
+
+DIFFICULTIES = [value for value, _ in Problem.DIFFICULTY_CHOICES]
+
+
+def _difficulty_key(difficulty):
+    return f'{difficulty.lower()}_count'
+
+
+def stats_aggregates(until=None):
+    """Conditional aggregates computing every stats counter in one query."""
+    aggregates = {
+        'total_problems': Count('id'),
+        'solved_problems': Count('id', filter=Q(solved_count__gt=0)),
+        'due_today': Count('id', filter=Q(next_due__lt=until or end_of_today())),
+        'confidence_sum': Sum('confidence'),
+    }
+    for difficulty in DIFFICULTIES:
+        aggregates[_difficulty_key(difficulty)] = Count(
+            'id', filter=Q(problem__difficulty=difficulty)
+        )
+    return aggregates
+
+
+def format_stats(counters):
+    """Shape raw counters into the ``problem_stats`` response payload."""
+    total = counters['total_problems']
+    return {
+        'total_problems': total,
+        'solved_problems': counters['solved_problems'],
+        'due_today': counters['due_today'],
+        'average_confidence': (counters['confidence_sum'] or 0) / total if total else 0,
+        'difficulty_breakdown': {
+            difficulty: counters[_difficulty_key(difficulty)]
+            for difficulty in DIFFICULTIES
+        },
+    }
+
+
+SUMMARY_FIELDS = ['total_problems', 'solved_problems', 'confidence_sum'] + [
+    _difficulty_key(difficulty) for difficulty in DIFFICULTIES
+]
+
+
+def summary_fields(counters):
+    """``UserProblemSummary`` field values from aggregated counters."""
+    return {field: counters.get(field) or 0 for field in SUMMARY_FIELDS}
+
+
+def refresh_summary(user):
+    """Rebuild the user's materialized summary; returns the counters it was built from.
+    
+    Runs under ``UserProblemSummary.lock``, so a review committing meanwhile
+    either shows in the aggregate or applies its delta to the new row.
+    """
+    with transaction.atomic():
+        UserProblemSummary.lock(user.pk)
+        # Only from the primary: a lagging replica's counters would be stored
+        # until the next invalidation
+        counters = UserProblem.objects.using(DEFAULT_DB_ALIAS).filter(user=user).aggregate(**stats_aggregates())
+        UserProblemSummary.objects.update_or_create(user=user, defaults=summary_fields(counters))
+    return counters
+
+
+def refresh_summaries(user_ids):
+    """Rebuild the existing summaries of ``user_ids`` with one grouped aggregate."""
+    with transaction.atomic():
+        UserProblemSummary.lock(*user_ids)
+        counters = {
+            row.pop('user_id'): row
+            for row in UserProblem.objects.using(DEFAULT_DB_ALIAS).filter(user_id__in=user_ids).order_by()
+            .values('user_id').annotate(**stats_aggregates())
+        }
+        summaries = list(UserProblemSummary.objects.filter(user_id__in=user_ids))
+        for summary in summaries:
+            for field, value in summary_fields(counters.get(summary.user_id, {})).items():
+                setattr(summary, field, value)
+        UserProblemSummary.objects.bulk_update(summaries, SUMMARY_FIELDS)
+    return len(summaries)
+
+
+def compute_stats(user):
+    """Return the stats payload for ``user``.
+    
+    With ``PROBLEM_STATS_USE_SUMMARY`` enabled the counters come from the
+    user's summary row and the time-dependent due count from ``due_counts``;
+    otherwise everything is one conditional-aggregation query.
+    """
+    user_problems = UserProblem.objects.filter(user=user)
+    if not getattr(settings, 'PROBLEM_STATS_USE_SUMMARY', False):
+        return format_stats(user_problems.aggregate(**stats_aggregates()))
+    
+    summary = UserProblemSummary.objects.filter(user=user).first()
+    if summary is None:
+        return format_stats(refresh_summary(user))
+    return format_stats(_summary_counters(summary, due_count(user)))
+
+
+async def acompute_stats(user):
+    """Async variant of ``compute_stats`` for ASGI views."""
+    user_problems = UserProblem.objects.filter(user=user)
+    if not getattr(settings, 'PROBLEM_STATS_USE_SUMMARY', False):
+        return format_stats(await user_problems.aaggregate(**stats_aggregates()))
+    
+    summary = await UserProblemSummary.objects.filter(user=user).afirst()
+    if summary is None:
+        return format_stats(await sync_to_async(refresh_summary)(user))
+    return format_stats(_summary_counters(summary, await adue_count(user)))
+
+
+def _summary_counters(summary, due_today):
+    counters = {
+        'total_problems': summary.total_problems,
+        'solved_problems': summary.solved_problems,
+        'due_today': due_today,
+        'confidence_sum': summary.confidence_sum,
+    }
+    for difficulty in DIFFICULTIES:
+        key = _difficulty_key(difficulty)
+        counters[key] = getattr(summary, key)
+    return counters
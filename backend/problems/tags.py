@@ -0,0 +1,143 @@
+"""Normalized tag index over ``Problem.tags``.
+
+``Problem.tags`` stays the JSON source of truth for API responses; the
+``Tag``/``ProblemTag`` tables mirror it so tag filters use an index on
+(tag, problem) instead of scanning JSON.
+
+Tracked problems also carry a copy of the problem's difficulty and a bitmask
+of its tags (``UserProblem.difficulty``/``tag_mask``). Each tag gets a fixed
+``Tag.bit`` when created, while bits remain, so user problem listings can
+filter on one table; tags without a bit fall back to the tag index.
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F
+
+from .models import ProblemTag, Tag, UserProblem, UserProblemSummary
+
+MATCH_ANY = 'any'
+MATCH_ALL = 'all'
+
+# Bits 0-62 keep masks positive in a signed 64-bit column
+MAX_TAG_BITS = 63
+
+
+def assign_tag_bits():
+    """Give tags without a bit the lowest free ones, oldest tags first."""
+    used = set(Tag.objects.exclude(bit=None).values_list('bit', flat=True))
+    free = [bit for bit in range(MAX_TAG_BITS) if bit not in used]
+    if not free:
+        return
+    pending = list(Tag.objects.filter(bit=None).order_by('id')[:len(free)])
+    for tag, bit in zip(pending, free):
+        tag.bit = bit
+    Tag.objects.bulk_update(pending, ['bit'])
+
+
+def tag_bits():
+    """Map of tag name to its ``Tag.bit``."""
+    return dict(Tag.objects.exclude(bit=None).values_list('name', 'bit'))
+
+
+def tag_mask(tags, bits):
+    mask = 0
+    for name in tags or []:
+        bit = bits.get(name)
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+def tracked_fields(problem, bits=None):
+    """Denormalized ``UserProblem`` fields for a tracked ``problem``."""
+    bits = tag_bits() if bits is None else bits
+    return {'difficulty': problem.difficulty, 'tag_mask': tag_mask(problem.tags, bits)}
+
+
+def sync_problem_tags(problems):
+    """Mirror the JSON ``tags`` of ``problems`` into the tag index."""
+    problems = [problem for problem in problems if problem.pk is not None]
+    if not problems:
+        return
+    names = {name for problem in problems for name in problem.tags or []}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    tags = list(Tag.objects.filter(name__in=names).values_list('name', 'id', 'bit'))
+    if any(bit is None for _, _, bit in tags):
+        assign_tag_bits()
+    tag_ids = {name: tag_id for name, tag_id, _ in tags}
+    
+    ProblemTag.objects.filter(problem_id__in=[problem.pk for problem in problems]).delete()
+    ProblemTag.objects.bulk_create([
+        ProblemTag(problem_id=problem.pk, tag_id=tag_ids[name])
+        for problem in problems
+        for name in set(problem.tags or [])
+    ], ignore_conflicts=True)
+
+
+def tagged_problem_ids(tags, match=MATCH_ANY):
+    """Subquery of problem ids carrying any (or all) of ``tags``."""
+    tags = set(tags)
+    memberships = ProblemTag.objects.filter(tag__name__in=tags)
+    if match == MATCH_ALL:
+        memberships = (
+            memberships.values('problem_id')
+            .annotate(matched=Count('tag_id', distinct=True))
+            .filter(matched=len(tags))
+        )
+    return memberships.values('problem_id')
+
+
+def filter_by_tags(queryset, tags, match=MATCH_ANY, problem_field='id'):
+    """Restrict ``queryset`` to problems matching ``tags`` via the tag index.
+    
+    ``problem_field`` names the problem id column on the queryset's model,
+    e.g. ``problem_id`` for ``UserProblem``.
+    """
+    tags = [tag for tag in tags if tag]
+    if not tags:
+        return queryset
+    return queryset.filter(**{f'{problem_field}__in': tagged_problem_ids(tags, match)})
+
+
+def sync_tracked_problems(problems):
+    """Copy difficulty and tag mask of ``problems`` onto the user problems tracking them.
+    
+    Summaries count problems per difficulty, so those of users tracking a
+    problem whose difficulty changed are invalidated.
+    """
+    bits = tag_bits()
+    groups = defaultdict(list)
+    for problem in problems:
+        groups[(problem.difficulty, tag_mask(problem.tags, bits))].append(problem.pk)
+    stale_users = set()
+    for (difficulty, mask), problem_ids in groups.items():
+        tracked = UserProblem.objects.filter(problem_id__in=problem_ids)
+        stale_users.update(
+            tracked.exclude(difficulty=difficulty).order_by().values_list('user_id', flat=True).distinct()
+        )
+        tracked.exclude(difficulty=difficulty, tag_mask=mask).update(difficulty=difficulty, tag_mask=mask)
+    if stale_users:
+        UserProblemSummary.invalidate(*stale_users)
+
+
+def filter_tracked_by_tags(queryset, tags, match=MATCH_ANY):
+    """``filter_by_tags`` for ``UserProblem`` querysets using ``tag_mask``.
+    
+    Falls back to the tag index when a requested tag has no bit.
+    """
+    tags = {tag for tag in tags if tag}
+    if not tags:
+        return queryset
+    known = dict(Tag.objects.filter(name__in=tags).values_list('name', 'bit'))
+    if any(bit is None for bit in known.values()):
+        return filter_by_tags(queryset, tags, match, problem_field='problem_id')
+    if match == MATCH_ALL and len(known) < len(tags):
+        return queryset.none()
+    if not known:
+        return queryset.none()
+    
+    mask = tag_mask(known, known)
+    queryset = queryset.alias(matched_tags=F('tag_mask').bitand(mask))
+    if match == MATCH_ALL:
+        return queryset.filter(matched_tags=mask)
+    return queryset.filter(matched_tags__gt=0)
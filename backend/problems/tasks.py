@@ -0,0 +1,61 @@
+"""Background jobs run by ``manage.py run_jobs`` (see ``jobs.py``)."""
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+from .analytics import rollup_day
+from .due_counts import prepare_due_counts
+from .jobs import register
+from .models import Job, UserProblem, UserProblemSummary
+from .scheduling import replan
+from .stats import refresh_summaries
+
+
+@register('replan_overdue')
+def replan_overdue(batch_size=1000):
+    """Re-plan overdue problems with the configured scheduler.
+
+    Problems are only brought forward (e.g. after switching to a scheduler
+    with shorter intervals), never pushed out of the queue they are due in;
+    never reviewed ones stay due.
+    """
+    replanned = replan(UserProblem.objects.due(until=timezone.now()), batch_size=batch_size, postpone=False)
+    prepare_due_counts(timezone.localdate())
+    return {'replanned': replanned}
+
+
+@register('refresh_summaries')
+def refresh_all_summaries(batch_size=500):
+    """Rebuild existing stats summaries to correct any drift from incremental updates."""
+    user_ids = list(UserProblemSummary.objects.values_list('user_id', flat=True))
+    refreshed = 0
+    for start in range(0, len(user_ids), batch_size):
+        refreshed += refresh_summaries(user_ids[start:start + batch_size])
+    return {'refreshed': refreshed}
+
+
+@register('prepare_review_queues')
+def prepare_review_queues(days_ahead=1):
+    """Cache every user's due count for an upcoming day ahead of midnight."""
+    day = timezone.localdate() + timedelta(days=days_ahead)
+    return {'day': day.isoformat(), 'users': prepare_due_counts(day)}
+
+
+@register('rollup_reviews')
+def rollup_reviews(day=None, days=1):
+    """Roll up review events of ``day`` (ISO date) or of the ``days`` days before today."""
+    if day:
+        days_to_roll = [date.fromisoformat(day)]
+    else:
+        today = timezone.localdate()
+        days_to_roll = [today - timedelta(days=offset) for offset in range(days, 0, -1)]
+    return {current.isoformat(): rollup_day(current) for current in days_to_roll}
+
+
+@register('prune_jobs')
+def prune_jobs(days=7):
+    """Delete jobs that finished successfully more than ``days`` ago."""
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE, finished_at__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return {'deleted': deleted}
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from problems import tasks
+from problems.analytics import FIRST_REVIEW, retention_bucket, rollup_day
+from problems.models import ProblemDailyStats, ReviewEvent, UserDailyStats
+
+from .utils import APITestCase, make_problem, make_user, track
+
+
+class AnalyticsTestCase(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.yesterday = timezone.localdate() - timedelta(days=1)
+        self.problems = [make_problem(1), make_problem(2)]
+
+    def review(self, problem, solved=True, elapsed_days=None, day=None, user=None):
+        day = day or self.yesterday
+        return ReviewEvent.objects.create(
+            user=user or self.user, problem=problem, day=day,
+            reviewed_at=timezone.now() - (timezone.localdate() - day),
+            confidence_change=20 if solved else -10, confidence=50, solved=solved, elapsed_days=elapsed_days,
+        )
+
+
+class RollupTests(AnalyticsTestCase):
+
+    def test_retention_bucket(self):
+        self.assertEqual(retention_bucket(None), FIRST_REVIEW)
+        self.assertEqual(
+            [retention_bucket(days) for days in (0, 1, 2, 7, 8, 30, 31)],
+            ['0', '1', '2-3', '4-7', '8-14', '15-30', '31+'],
+        )
+
+    def test_rollup_day(self):
+        bob = make_user('bob')
+        self.review(self.problems[0])
+        self.review(self.problems[0], solved=False, elapsed_days=2)
+        self.review(self.problems[1], elapsed_days=2)
+        self.review(self.problems[0], user=bob)
+        self.review(self.problems[0], day=self.yesterday - timedelta(days=1))
+        self.assertEqual(rollup_day(self.yesterday), {'users': 2, 'problems': 2})
+
+        stats = UserDailyStats.objects.get(user=self.user, day=self.yesterday)
+        self.assertEqual((stats.reviews, stats.solved, stats.problems, stats.confidence_change), (3, 2, 2, 30))
+        self.assertEqual(stats.retention, {FIRST_REVIEW: [1, 1], '2-3': [2, 1]})
+        problem_stats = ProblemDailyStats.objects.get(problem=self.problems[0], day=self.yesterday)
+        self.assertEqual((problem_stats.reviews, problem_stats.users), (3, 2))
+
+    def test_rollup_is_idempotent(self):
+        self.review(self.problems[0])
+        rollup_day(self.yesterday)
+        self.review(self.problems[0])
+        rollup_day(self.yesterday)
+        self.assertEqual(UserDailyStats.objects.get(user=self.user).reviews, 2)
+
+    def test_review_appends_event(self):
+        user_problem = track(self.user, self.problems[0])
+        self.client.put(
+            f'/api/user/problems/{user_problem.pk}/update/',
+            {'confidence_change': 15, 'solved': True},
+            content_type='application/json',
+        )
+        event = ReviewEvent.objects.get()
+        self.assertEqual((event.day, event.solved, event.elapsed_days), (timezone.localdate(), True, None))
+
+    def test_rollup_reviews_job(self):
+        self.review(self.problems[0])
+        self.review(self.problems[0], day=self.yesterday - timedelta(days=1))
+        result = tasks.rollup_reviews(days=2)
+        self.assertEqual(list(result), [(self.yesterday - timedelta(days=1)).isoformat(), self.yesterday.isoformat()])
+        self.assertEqual(UserDailyStats.objects.count(), 2)
+        self.assertEqual(
+            tasks.rollup_reviews(day=self.yesterday.isoformat()),
+            {self.yesterday.isoformat(): {'users': 1, 'problems': 1}},
+        )
+
+
+class AnalyticsViewTests(AnalyticsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for day in (self.yesterday, self.yesterday - timedelta(days=10)):
+            self.review(self.problems[0], day=day)
+            self.review(self.problems[1], solved=False, elapsed_days=40, day=day)
+            rollup_day(day)
+
+    def test_user_analytics(self):
+        data = self.client.get('/api/analytics/?days=5').json()
+        self.assertEqual([day['day'] for day in data['series']], [self.yesterday.isoformat()])
+        self.assertEqual(data['totals']['solve_rate'], 0.5)
+        self.assertEqual([row['elapsed_days'] for row in data['retention']], [FIRST_REVIEW, '31+'])
+        self.assertEqual(len(self.client.get('/api/analytics/').json()['series']), 2)
+
+    def test_problem_analytics(self):
+        data = self.client.get(f'/api/analytics/problems/{self.problems[1].pk}/?days=30').json()
+        self.assertEqual(data['totals'], {'reviews': 2, 'solved': 0, 'solve_rate': 0.0})
+        self.assertEqual(self.client.get('/api/analytics/problems/999/').status_code, 404)
+
+    def test_reads_only_rollups(self):
+        ReviewEvent.objects.all().delete()
+        self.assertEqual(self.client.get('/api/analytics/').json()['totals']['reviews'], 4)
+
+    def test_invalid_days(self):
+        for days in ('0', '366', 'x'):
+            self.assertEqual(self.client.get(f'/api/analytics/?days={days}').status_code, 400, days)
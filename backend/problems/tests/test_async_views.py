@@ -0,0 +1,67 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+
+from .utils import APITestCase, make_problem, track
+
+
+def same_links(response):
+    """The body with links pointed at the sync endpoints."""
+    return json.loads(response.content.decode().replace('/api/async/', '/api/'))
+
+
+class AsyncViewTests(APITestCase):
+    """The async endpoints answer like their DRF counterparts."""
+
+    def setUp(self):
+        super().setUp()
+        for pk in range(1, 26):
+            problem = make_problem(pk, difficulty='Hard' if pk % 5 == 0 else 'Easy')
+            if pk <= 3:
+                track(self.user, problem)
+        self.async_client = AsyncClient()
+        self.async_client.force_login(self.user)
+
+    async def get_both(self, path, query=''):
+        sync_response = await sync_to_async(self.client.get)(f'/api/{path}{query}')
+        async_response = await self.async_client.get(f'/api/async/{path}{query}')
+        return sync_response, async_response
+
+    async def test_problem_list_matches(self):
+        for query in ('', '?page=2', '?difficulty=Hard', '?pagination=cursor'):
+            sync_response, async_response = await self.get_both('problems/', query)
+            self.assertEqual(async_response.status_code, 200, query)
+            self.assertEqual(same_links(async_response), sync_response.json(), query)
+
+    async def test_cursor_links_interchange(self):
+        _, async_response = await self.get_both('problems/', '?pagination=cursor')
+        next_link = same_links(async_response)['next']
+        response = await sync_to_async(self.client.get)(next_link)
+        self.assertEqual(response.json()['results'][0]['id'], 21)
+
+    async def test_invalid_pages(self):
+        for query in ('?page=9', '?page=x', '?pagination=cursor&cursor=bz14'):
+            response = await self.async_client.get(f'/api/async/problems/{query}')
+            self.assertEqual(response.status_code, 404, query)
+
+    async def test_not_modified(self):
+        response = await self.async_client.get('/api/async/problems/')
+        response = await self.async_client.get('/api/async/problems/', headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_dashboard_and_stats_match(self):
+        for path in ('dashboard/', 'stats/'):
+            sync_response, async_response = await self.get_both(path)
+            self.assertEqual(async_response.json(), sync_response.json(), path)
+
+    async def test_requires_login(self):
+        await sync_to_async(self.async_client.logout)()
+        for path in ('problems/', 'dashboard/', 'stats/'):
+            response = await self.async_client.get(f'/api/async/{path}')
+            self.assertEqual(response.status_code, 403, path)
+            self.assertIn('detail', response.json())
+
+    async def test_rejects_other_methods(self):
+        response = await self.async_client.post('/api/async/problems/')
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,117 @@
+import json
+import random
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+
+from problems import benchmarking
+from problems.catalogue import get_version
+from problems.models import Problem, Tag, UserProblem
+
+from .utils import APITestCase, count_queries, make_problem
+
+
+class SummaryTests(SimpleTestCase):
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmarking.percentile(values, 0.5), 50)
+        self.assertEqual(benchmarking.percentile(values, 0.99), 99)
+        self.assertEqual(benchmarking.percentile([7], 0.9), 7)
+        self.assertIsNone(benchmarking.percentile([], 0.5))
+
+    def test_summarize(self):
+        summary = benchmarking.summarize([0.002, 0.001, 0.003], errors=1, wall_seconds=0.5)
+        self.assertEqual(summary['requests'], 4)
+        self.assertEqual(summary['throughput_rps'], 6.0)
+        self.assertEqual((summary['p50_ms'], summary['max_ms']), (2.0, 3.0))
+        self.assertIsNone(benchmarking.summarize([], 0, 0)['mean_ms'])
+
+    def test_presets(self):
+        tracked = {
+            name: preset['users'] * preset['problems_per_user']
+            for name, preset in benchmarking.PRESETS.items()
+        }
+        self.assertEqual(tracked, {'small': 10_000, 'medium': 300_000, 'large': 3_000_000})
+
+
+class SyntheticDataTests(APITestCase):
+
+    def test_generate_and_cleanup(self):
+        rng = random.Random(1)
+        first, last = benchmarking.generate_catalogue(20, rng)
+        users = benchmarking.generate_users(3, 5, 20, rng)
+        self.assertEqual(benchmarking.benchmark_problems().count(), 20)
+        self.assertEqual(first, benchmarking.PROBLEM_ID_OFFSET)
+        self.assertEqual(UserProblem.objects.filter(user__in=users).count(), 15)
+        # Tracked rows carry the denormalized problem fields
+        user_problem = UserProblem.objects.filter(user=users[0]).select_related('problem').first()
+        self.assertEqual(user_problem.difficulty, user_problem.problem.difficulty)
+
+        benchmarking.cleanup()
+        self.assertFalse(benchmarking.benchmark_problems().exists())
+        self.assertFalse(benchmarking.benchmark_users().exists())
+        self.assertTrue(type(self.user).objects.filter(pk=self.user.pk).exists())
+
+    def test_cleanup_keeps_real_problems(self):
+        make_problem(1)
+        benchmarking.generate_catalogue(5, random.Random(1))
+        # Created while benchmark data exists, so it may get an id past the offset
+        real = Problem.objects.create(title='Real', url='https://leetcode.com/problems/real/', difficulty='Easy')
+        benchmarking.cleanup()
+        self.assertEqual(sorted(Problem.objects.values_list('id', flat=True)), sorted([1, real.pk]))
+        next_problem = Problem.objects.create(title='Next', url='https://leetcode.com/problems/next/', difficulty='Easy')
+        self.assertEqual(next_problem.pk, real.pk + 1)
+
+
+    def test_cleanup_queries_do_not_grow(self):
+        def generate_and_clean(users, problems):
+            rng = random.Random(1)
+            benchmarking.generate_catalogue(problems, rng)
+            benchmarking.generate_users(users, problems, problems, rng)
+            return count_queries(benchmarking.cleanup)
+
+        self.assertEqual(generate_and_clean(1, 5), generate_and_clean(5, 40))
+
+    def test_cleanup_restores_bookkeeping(self):
+        benchmarking.generate_catalogue(5, random.Random(1))
+        version = get_version()
+        benchmarking.cleanup()
+        self.assertNotEqual(get_version(), version)
+        # Deleting a real problem still invalidates on its own
+        version = get_version()
+        make_problem(1).delete()
+        self.assertNotEqual(get_version(), version)
+
+    def test_cleanup_frees_benchmark_tags(self):
+        make_problem(1, tags=['Array'])
+        benchmarking.generate_catalogue(50, random.Random(1))
+        self.assertGreater(Tag.objects.count(), 1)
+        benchmarking.cleanup()
+        self.assertEqual(list(Tag.objects.values_list('name', flat=True)), ['Array'])
+
+
+class RunBenchmarksCommandTests(TransactionTestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_writes_report_and_cleans_up(self):
+        output = self.directory / 'report.json'
+        call_command(
+            'run_benchmarks', users=2, problems=10, problems_per_user=4, requests=3, warmup=0,
+            scenario=['dashboard', 'review_update'], output=str(output), stdout=StringIO(),
+        )
+        report = json.loads(output.read_text())
+        self.assertEqual(report['dataset']['preset'], 'small')
+        self.assertEqual(report['dataset']['user_problems'], 8)
+        self.assertEqual(set(report['results']), {'dashboard', 'review_update'})
+        self.assertEqual(report['results']['dashboard']['errors'], 0)
+        self.assertEqual(report['results']['review_update']['requests'], 3)
+        self.assertFalse(benchmarking.benchmark_problems().exists())
+        self.assertFalse(benchmarking.benchmark_users().exists())
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from problems.models import ReviewEvent, UserProblem
+
+from .utils import APITestCase, make_problem, make_user, track
+
+URL = '/api/user/problems/bulk-update/'
+
+
+class BulkReviewTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.first = track(self.user, make_problem(1), due_in=timedelta(days=-1))
+        self.second = track(self.user, make_problem(2), due_in=timedelta(days=-1), confidence=50)
+
+    def post(self, reviews):
+        return self.client.post(URL, {'reviews': reviews}, content_type='application/json')
+
+    def test_applies_every_review(self):
+        response = self.post([
+            {'id': self.first.pk, 'confidence_change': 20, 'solved': True},
+            {'id': self.second.pk, 'confidence_change': -10, 'solved': False},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()], [self.first.pk, self.second.pk])
+        first, second = UserProblem.objects.get(pk=self.first.pk), UserProblem.objects.get(pk=self.second.pk)
+        self.assertEqual((first.attempts_count, first.solved_count), (1, 1))
+        self.assertGreater(first.confidence, 0)
+        self.assertEqual((second.attempts_count, second.solved_count), (1, 0))
+        self.assertLess(second.confidence, 50)
+        self.assertEqual(ReviewEvent.objects.filter(user=self.user).count(), 2)
+
+    def test_repeated_ids_stack_up(self):
+        response = self.post([
+            {'id': self.first.pk, 'confidence_change': 20, 'solved': True},
+            {'id': self.first.pk, 'confidence_change': 20, 'solved': True},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(UserProblem.objects.get(pk=self.first.pk).attempts_count, 2)
+
+    def test_matches_single_reviews(self):
+        self.post([{'id': self.first.pk, 'confidence_change': 20, 'solved': True}])
+        self.client.put(
+            f'/api/user/problems/{self.second.pk}/update/',
+            {'confidence_change': 20, 'solved': True}, content_type='application/json',
+        )
+        first, second = UserProblem.objects.get(pk=self.first.pk), UserProblem.objects.get(pk=self.second.pk)
+        self.assertEqual(first.frequency_days, second.frequency_days)
+
+    def test_unknown_ids_reject_the_whole_batch(self):
+        other = track(make_user('bob'), make_problem(3))
+        response = self.post([
+            {'id': self.first.pk, 'confidence_change': 20, 'solved': True},
+            {'id': other.pk, 'confidence_change': 20, 'solved': True},
+        ])
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['ids'], [other.pk])
+        self.assertEqual(UserProblem.objects.get(pk=self.first.pk).attempts_count, 0)
+        self.assertFalse(ReviewEvent.objects.exists())
+
+    def test_validates_entries(self):
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertEqual(self.post([{'id': self.first.pk, 'confidence_change': 500}]).status_code, 400)
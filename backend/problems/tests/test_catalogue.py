@@ -0,0 +1,115 @@
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, override_settings
+
+from problems import catalogue
+from problems.catalogue import CatalogueEntry, aget_version, get_version
+from problems.models import CacheVersion
+
+from .utils import APITestCase, count_queries, make_problem
+
+
+class CatalogueEntryTests(APITestCase):
+
+    def test_problem_write_bumps_version(self):
+        version = get_version()
+        problem = make_problem(1)
+        self.assertNotEqual(get_version(), version)
+        version = get_version()
+        problem.delete()
+        self.assertNotEqual(get_version(), version)
+
+    def test_params_change_key(self):
+        self.assertNotEqual(CatalogueEntry('x', [1]).key, CatalogueEntry('x', [2]).key)
+        self.assertEqual(CatalogueEntry('x', [1]).etag, CatalogueEntry('x', [1]).etag)
+
+    def test_matches_weak_and_listed_etags(self):
+        entry = CatalogueEntry('x')
+        factory = RequestFactory()
+        for header in (entry.etag, f'W/{entry.etag}', f'"other", {entry.etag}', '*'):
+            self.assertTrue(entry.matches(factory.get('/', HTTP_IF_NONE_MATCH=header)), header)
+        self.assertFalse(entry.matches(factory.get('/', HTTP_IF_NONE_MATCH='"other"')))
+        self.assertFalse(entry.matches(factory.get('/')))
+
+    def test_get_or_build_caches_until_bump(self):
+        calls = []
+        build = lambda: calls.append(1) or len(calls)
+        self.assertEqual(CatalogueEntry('x').get_or_build(build), 1)
+        self.assertEqual(CatalogueEntry('x').get_or_build(build), 1)
+        catalogue.bump_version()
+        self.assertEqual(CatalogueEntry('x').get_or_build(build), 2)
+
+    def test_hits_need_no_queries(self):
+        build = lambda: 'built'
+        CatalogueEntry('x').get_or_build(build)
+        with self.assertNumQueries(0):
+            self.assertEqual(CatalogueEntry('x').get_or_build(build), 'built')
+            self.assertEqual(async_to_sync(aget_version)(), get_version())
+
+    @override_settings(CATALOGUE_VERSION_TTL=60)
+    def test_other_processes_bumps_seen_after_ttl(self):
+        version = get_version()
+        # A bump by another process only changes the row
+        CacheVersion.bump(catalogue.VERSION_KEY)
+        self.assertEqual(get_version(), version)
+        with override_settings(CATALOGUE_VERSION_TTL=0):
+            self.assertNotEqual(get_version(), version)
+
+    @override_settings(CATALOGUE_VERSION_TTL=60)
+    def test_own_bumps_seen_at_once(self):
+        version = get_version()
+        catalogue.bump_version()
+        self.assertNotEqual(get_version(), version)
+
+
+class ProblemListETagTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        make_problem(1)
+        make_problem(2)
+
+    def test_not_modified(self):
+        response = self.client.get('/api/problems/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get('/api/problems/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    # Buckets in memory, as with a Redis shared cache; this counts catalogue queries
+    @override_settings(THROTTLE_CACHE_ALIAS='default')
+    def test_not_modified_only_loads_the_user(self):
+        etag = self.client.get('/api/problems/')['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/problems/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_etag_depends_on_query(self):
+        etag = self.client.get('/api/problems/')['ETag']
+        self.assertNotEqual(self.client.get('/api/problems/?difficulty=Easy')['ETag'], etag)
+
+    def test_problem_save_changes_etag(self):
+        etag = self.client.get('/api/problems/')['ETag']
+        make_problem(3)
+        response = self.client.get('/api/problems/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['count'], 3)
+
+    def test_cached_page_skips_problem_queries(self):
+        self.client.get('/api/problems/')
+        cached = count_queries(lambda: self.client.get('/api/problems/'))
+        uncached = count_queries(lambda: self.client.get('/api/problems/?page=1'))
+        self.assertLess(cached, uncached)
+
+
+class PublicProblemsTests(APITestCase):
+
+    def test_public_problems_etag(self):
+        self.client.logout()
+        make_problem(1)
+        response = self.client.get('/api/public/problems/')
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/public/problems/').status_code, 200)
+            response = self.client.get('/api/public/problems/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from problems.models import UserProblem, end_of_today
+
+from .utils import APITestCase, count_queries, make_problem, make_user, track
+
+
+class DueQueryTests(APITestCase):
+
+    def test_due_includes_overdue_and_today_only(self):
+        overdue = track(self.user, make_problem(1), due_in=timedelta(days=-3))
+        today = track(self.user, make_problem(2), due_in=end_of_today() - timezone.now() - timedelta(minutes=1))
+        track(self.user, make_problem(3), due_in=timedelta(days=2))
+
+        due = UserProblem.objects.filter(user=self.user).due()
+        self.assertEqual(set(due), {overdue, today})
+
+    def test_due_until(self):
+        track(self.user, make_problem(1), due_in=timedelta(days=2))
+        until = timezone.now() + timedelta(days=3)
+        self.assertEqual(UserProblem.objects.filter(user=self.user).due(until).count(), 1)
+
+
+class DashboardTests(APITestCase):
+
+    def test_lists_due_problems_oldest_first(self):
+        later = track(self.user, make_problem(1), due_in=timedelta(hours=-1))
+        earlier = track(self.user, make_problem(2, 'Hard'), due_in=timedelta(days=-2))
+        track(self.user, make_problem(3), due_in=timedelta(days=5))
+        track(make_user('bob'), make_problem(4), due_in=timedelta(days=-1))
+
+        response = self.client.get('/api/dashboard/')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total_due'], 2)
+        self.assertEqual([row['id'] for row in data['due_today']], [earlier.pk, later.pk])
+        self.assertEqual(data['due_today'][0]['problem']['difficulty'], 'Hard')
+
+    def test_query_count_does_not_grow_with_queue(self):
+        track(self.user, make_problem(1), due_in=timedelta(days=-1))
+        self.client.get('/api/dashboard/')  # session and user lookups get cached
+        single = count_queries(lambda: self.client.get('/api/dashboard/'))
+        for pk in range(2, 12):
+            track(self.user, make_problem(pk), due_in=timedelta(days=-1))
+        self.assertEqual(count_queries(lambda: self.client.get('/api/dashboard/')), single)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/dashboard/').status_code, 403)
@@ -0,0 +1,78 @@
+from django.test import override_settings
+
+from problems.models import Tag, UserProblem, UserProblemSummary
+from problems.stats import refresh_summary
+from problems.tags import MATCH_ALL, filter_tracked_by_tags, tag_bits, tag_mask
+
+from .utils import APITestCase, make_problem, track
+
+URL = '/api/user/problems/'
+
+
+class DenormalizedFieldTests(APITestCase):
+
+    def test_copied_when_tracking(self):
+        user_problem = track(self.user, make_problem(1, difficulty='Medium', tags=['Array', 'Graph']))
+        self.assertEqual(user_problem.difficulty, 'Medium')
+        self.assertEqual(user_problem.tag_mask, tag_mask(['Array', 'Graph'], tag_bits()))
+
+    def test_follow_problem_edits(self):
+        problem = make_problem(1, difficulty='Easy', tags=['Array'])
+        track(self.user, problem)
+        problem.difficulty = 'Hard'
+        problem.tags = ['Graph']
+        problem.save()
+        user_problem = UserProblem.objects.get(problem=problem)
+        self.assertEqual(user_problem.difficulty, 'Hard')
+        self.assertEqual(user_problem.tag_mask, tag_mask(['Graph'], tag_bits()))
+
+    def test_difficulty_change_invalidates_summary(self):
+        problem = make_problem(1, difficulty='Easy')
+        track(self.user, problem)
+        refresh_summary(self.user)
+        problem.difficulty = 'Hard'
+        problem.save()
+        self.assertFalse(UserProblemSummary.objects.filter(user=self.user).exists())
+
+
+class DenormalizedFilterTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        for pk, difficulty, tags in (
+            (1, 'Easy', ['Array', 'Hash Table']),
+            (2, 'Medium', ['Array', 'Two Pointers']),
+            (3, 'Hard', ['Graph']),
+            (4, 'Easy', []),
+        ):
+            track(self.user, make_problem(pk, difficulty=difficulty, tags=tags))
+
+    def ids(self, query):
+        response = self.client.get(f'{URL}?{query}')
+        self.assertEqual(response.status_code, 200)
+        return sorted(row['problem']['id'] for row in response.json()['results'])
+
+    def test_same_results_as_joined_filters(self):
+        queries = [
+            'difficulty=Easy',
+            'tags=Array',
+            'tags=Array&tags=Graph',
+            'tags=Array&tags=Two Pointers&tag_match=all',
+            'tags=Array&difficulty=Medium',
+            'tags=Unknown',
+            'tags=Array&tags=Unknown&tag_match=all',
+        ]
+        for query in queries:
+            joined = self.ids(query)
+            with override_settings(PROBLEM_FILTERS_USE_DENORMALIZED=True):
+                self.assertEqual(self.ids(query), joined, query)
+
+    def test_mask_filter_skips_tag_index(self):
+        queryset = filter_tracked_by_tags(UserProblem.objects.all(), ['Array', 'Graph'], match=MATCH_ALL)
+        self.assertNotIn('problems_problemtag', str(queryset.query))
+
+    def test_falls_back_for_tags_without_bits(self):
+        Tag.objects.filter(name='Graph').update(bit=None)
+        queryset = filter_tracked_by_tags(UserProblem.objects.all(), ['Graph'])
+        self.assertIn('problems_problemtag', str(queryset.query))
+        self.assertEqual(list(queryset.values_list('problem_id', flat=True)), [3])
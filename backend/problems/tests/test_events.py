@@ -0,0 +1,180 @@
+import asyncio
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient, SimpleTestCase, override_settings
+from django.utils import timezone
+
+from problems import events
+from problems.events import RESYNC, Broker
+from problems.models import CacheVersion, UserProblem
+from problems.scheduling import replan
+
+from .utils import APITestCase, make_problem, track
+
+
+class BrokerTests(SimpleTestCase):
+
+    def test_delivers_to_the_users_streams(self):
+        async def scenario():
+            broker = Broker()
+            mine, other = broker.subscribe(1), broker.subscribe(2)
+            broker.publish(1, 'due_removed', {'ids': [5]})
+            _, name, data = await mine.get(timeout=1)
+            self.assertEqual((name, data), ('due_removed', {'ids': [5]}))
+            self.assertIsNone(await other.get(timeout=0.01))
+            broker.unsubscribe(mine)
+            broker.unsubscribe(other)
+            self.assertFalse(broker.has_subscribers(1))
+            self.assertEqual(broker.subscriber_count(), 0)
+
+        asyncio.run(scenario())
+
+    def test_overflow_asks_for_resync(self):
+        async def scenario():
+            broker = Broker()
+            subscription = broker.subscribe(1, maxsize=2)
+            for index in range(3):
+                broker.publish(1, 'stats_delta', {'index': index})
+            await asyncio.sleep(0)
+            _, name, _ = await subscription.get(timeout=1)
+            self.assertEqual(name, RESYNC)
+            self.assertTrue(subscription.queue.empty())
+            broker.publish(1, 'stats_delta', {'index': 3})
+            self.assertEqual((await subscription.get(timeout=1))[2], {'index': 3})
+
+        asyncio.run(scenario())
+
+    def test_drops_streams_of_closed_loops(self):
+        broker = Broker()
+
+        async def subscribe():
+            return broker.subscribe(1)
+
+        asyncio.run(subscribe())
+        broker.publish(1, 'stats_delta', {})
+        self.assertFalse(broker.has_subscribers(1))
+
+
+class PublishTests(APITestCase):
+    """Changes are published as diffs for the user's open streams."""
+
+    def setUp(self):
+        super().setUp()
+        self.published = []
+        for patcher in (
+            mock.patch.object(events, 'publish', lambda user_id, name, data: self.published.append((user_id, name, data))),
+            mock.patch.object(events.broker, 'has_subscribers', return_value=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def names(self):
+        return [name for _, name, _ in self.published]
+
+    def test_tracking_due_problem(self):
+        track(self.user, make_problem(1, difficulty='Hard'))
+        self.assertEqual(self.names(), ['due_upserted', 'stats_delta'])
+        delta = self.published[-1][2]
+        self.assertEqual((delta['total_problems'], delta['due_today']), (1, 1))
+        self.assertEqual(delta['difficulty_breakdown']['Hard'], 1)
+
+    def test_untracking(self):
+        user_problem = track(self.user, make_problem(1))
+        self.published.clear()
+        user_problem.delete()
+        self.assertEqual(self.names(), ['due_removed', 'stats_delta'])
+        self.assertEqual(self.published[-1][2]['total_problems'], -1)
+
+    def test_review_moves_problem_out_of_today(self):
+        user_problem = track(self.user, make_problem(1))
+        self.published.clear()
+        response = self.client.put(
+            f'/api/user/problems/{user_problem.pk}/update/',
+            {'confidence_change': 20, 'solved': True},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.names(), ['due_removed', 'stats_delta'])
+        self.assertEqual(self.published[0][2], {'ids': [user_problem.pk]})
+        delta = self.published[1][2]
+        self.assertEqual((delta['solved_problems'], delta['due_today'], delta['confidence_sum']), (1, -1, 20))
+
+    def test_not_due_tracking_skips_queue_events(self):
+        track(self.user, make_problem(1), due_in=timedelta(days=3))
+        self.assertEqual(self.names(), ['stats_delta'])
+
+
+class CrossProcessTests(APITestCase):
+    """Changes this process never delivered are noticed through the shared count."""
+
+    def setUp(self):
+        super().setUp()
+        self.broker = Broker()
+        patcher = mock.patch.object(events, 'broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.subscription = async_to_sync(self.subscribe)()
+        self.assertFalse(self.changed_elsewhere())
+
+    async def subscribe(self):
+        return self.broker.subscribe(self.user.pk)
+
+    def changed_elsewhere(self):
+        return async_to_sync(self.broker.changed_elsewhere)(self.subscription)
+
+    def test_own_changes_are_not_counted_twice(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            events.announce(self.user.pk, self.user.pk)
+        self.assertFalse(self.changed_elsewhere())
+
+    def test_other_process_change(self):
+        # Another worker's announce: the shared count moves, ours doesn't
+        CacheVersion.incr(f'events:{self.user.pk}')
+        self.assertTrue(self.changed_elsewhere())
+        self.assertFalse(self.changed_elsewhere())
+
+    def test_other_users_changes(self):
+        CacheVersion.incr('events:0')
+        self.assertFalse(self.changed_elsewhere())
+
+    def test_review_is_announced(self):
+        user_problem = track(self.user, make_problem(1))
+        self.assertTrue(self.changed_elsewhere())
+        self.client.put(
+            f'/api/user/problems/{user_problem.pk}/update/',
+            {'confidence_change': 20, 'solved': True},
+            content_type='application/json',
+        )
+        self.assertTrue(self.changed_elsewhere())
+
+    def test_replan_is_announced(self):
+        now = timezone.now()
+        track(self.user, make_problem(1), last_attempted=now, attempts_count=1)
+        self.changed_elsewhere()
+        self.assertEqual(replan(UserProblem.objects.all()), 1)
+        self.assertTrue(self.changed_elsewhere())
+
+
+class EventStreamTests(APITestCase):
+
+    def test_requires_asgi(self):
+        self.assertEqual(self.client.get('/api/events/').status_code, 501)
+
+    @override_settings(EVENTS_STREAM_MAX_AGE=0)
+    async def test_stream(self):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.user)
+
+        async def read(**headers):
+            response = await client.get('/api/events/', headers=headers)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            return ''.join([chunk.decode() async for chunk in response.streaming_content])
+
+        self.assertEqual(await read(), 'retry: 3000\n\n')
+        self.assertIn('event: resync', await read(**{'last-event-id': '7'}))
+
+    async def test_stream_requires_login(self):
+        response = await AsyncClient().get('/api/events/')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,97 @@
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+
+from problems import facets
+from problems.facets import FacetIndex, get_facet_index, tracked_mask
+from problems.models import UserProblem
+from problems.tags import MATCH_ALL
+
+from .utils import APITestCase, count_queries, make_problem, track
+
+CATALOGUE = [
+    (1, 'Easy', ['Array', 'Hash Table']),
+    (2, 'Medium', ['Array', 'Two Pointers']),
+    (3, 'Hard', ['Graph']),
+    (4, 'Easy', ['Array']),
+    (5, 'Medium', []),
+]
+
+
+class FacetTestCase(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Versions restart with each test's rolled back database
+        facets._index = (None, None)
+        facets._tracked.clear()
+        self.problems = [make_problem(pk, difficulty=difficulty, tags=tags) for pk, difficulty, tags in CATALOGUE]
+
+
+class FacetIndexTests(FacetTestCase):
+
+    def test_counts(self):
+        counts = get_facet_index().counts()
+        self.assertEqual(counts['difficulty'], {'Easy': 2, 'Medium': 2, 'Hard': 1})
+        self.assertEqual(list(counts['tags'].items())[0], ('Array', 3))
+        self.assertEqual(counts['tags']['Graph'], 1)
+
+    def test_each_facet_applies_the_other_filter(self):
+        counts = get_facet_index().counts(difficulty='Easy', tags=['Array'])
+        # Difficulty counts within Array, tag counts within Easy
+        self.assertEqual(counts['difficulty'], {'Easy': 2, 'Medium': 1, 'Hard': 0})
+        self.assertEqual(counts['tags'], {'Array': 2, 'Hash Table': 1})
+
+    def test_match_all_narrows_tags(self):
+        counts = get_facet_index().counts(tags=['Array', 'Hash Table'], match=MATCH_ALL)
+        self.assertEqual(counts['difficulty'], {'Easy': 1, 'Medium': 0, 'Hard': 0})
+        self.assertEqual(counts['tags'], {'Array': 1, 'Hash Table': 1})
+
+    def test_base_and_unknown_ids(self):
+        index = FacetIndex([{'id': 7, 'difficulty': 'Hard', 'tags': ['Graph']}])
+        self.assertEqual(index.mask_for_ids([7, 8]), 1)
+        self.assertEqual(index.counts(base=0)['difficulty']['Hard'], 0)
+
+    def test_rebuilt_after_problem_write(self):
+        index = get_facet_index()
+        self.assertIs(get_facet_index(), index)
+        make_problem(6, difficulty='Hard')
+        self.assertEqual(get_facet_index().counts()['difficulty']['Hard'], 2)
+
+
+class TrackedMaskTests(FacetTestCase):
+
+    def test_cached_until_tracking_changes(self):
+        index = get_facet_index()
+        track(self.user, self.problems[0])
+        first = tracked_mask(index, self.user)
+        self.assertEqual(first, index.mask_for_ids([1]))
+        self.assertEqual(count_queries(lambda: tracked_mask(index, self.user)), 1)
+
+        track(self.user, self.problems[2])
+        self.assertEqual(tracked_mask(index, self.user), index.mask_for_ids([1, 3]))
+        UserProblem.objects.get(problem_id=1).delete()
+        self.assertEqual(tracked_mask(index, self.user), index.mask_for_ids([3]))
+
+
+class FacetEndpointTests(FacetTestCase):
+
+    def test_problem_list(self):
+        data = self.client.get('/api/problems/?facets=true&difficulty=Medium').json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['facets']['difficulty'], {'Easy': 2, 'Medium': 2, 'Hard': 1})
+        self.assertEqual(data['facets']['tags'], {'Array': 1, 'Two Pointers': 1})
+        self.assertNotIn('facets', self.client.get('/api/problems/').json())
+
+    def test_user_problems_count_tracked_only(self):
+        track(self.user, self.problems[0], confidence=80)
+        track(self.user, self.problems[2], confidence=10)
+        data = self.client.get('/api/user/problems/?facets=true').json()
+        self.assertEqual(data['facets']['difficulty'], {'Easy': 1, 'Medium': 0, 'Hard': 1})
+        data = self.client.get('/api/user/problems/?facets=true&confidence=50').json()
+        self.assertEqual(data['facets']['difficulty'], {'Easy': 1, 'Medium': 0, 'Hard': 0})
+
+    async def test_async_problem_list(self):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.user)
+        data = (await client.get('/api/async/problems/?facets=true&tags=Array')).json()
+        self.assertEqual(data['facets']['difficulty'], {'Easy': 2, 'Medium': 1, 'Hard': 0})
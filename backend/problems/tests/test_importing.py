@@ -0,0 +1,149 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+
+from problems.importing import CatalogueImporter, clean_row, read_rows
+from problems.models import Problem, ProblemList, ProblemListItem, UserProblem
+
+from .utils import APITestCase, make_problem, track
+
+
+def row(pk, **fields):
+    return dict({
+        'id': pk,
+        'title': f'Problem {pk}',
+        'url': f'https://leetcode.com/problems/problem-{pk}/',
+        'difficulty': 'Easy',
+        'tags': [],
+    }, **fields)
+
+
+class ImportTestCase(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, text):
+        path = self.directory / name
+        path.write_text(text, encoding='utf-8')
+        return path
+
+    def write_jsonl(self, name, rows):
+        return self.write(name, ''.join(json.dumps(r) + '\n' for r in rows))
+
+
+class ReadRowsTests(ImportTestCase):
+
+    def test_jsonl(self):
+        path = self.write('problems.jsonl', json.dumps(row(1)) + '\n\n{bad\n')
+        rows = list(read_rows(path))
+        self.assertEqual(rows[0], (1, row(1)))
+        self.assertEqual(rows[1][0], 3)
+        self.assertIsInstance(rows[1][1], json.JSONDecodeError)
+
+    def test_csv_splits_names(self):
+        path = self.write(
+            'problems.csv',
+            'id,title,url,difficulty,tags,lists\n'
+            '1,Two Sum,https://leetcode.com/problems/two-sum/,Easy,Array| Hash Table,Top 100\n',
+        )
+        [(line_number, parsed)] = read_rows(path)
+        self.assertEqual(line_number, 2)
+        self.assertEqual(parsed['tags'], ['Array', 'Hash Table'])
+        self.assertEqual(parsed['lists'], ['Top 100'])
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            list(read_rows(self.write('problems.txt', '')))
+
+
+class CleanRowTests(ImportTestCase):
+
+    def test_normalises(self):
+        cleaned = clean_row(row('7', title=' Seven ', tags=['A', 'A', 'B']))
+        self.assertEqual(cleaned['id'], 7)
+        self.assertEqual(cleaned['title'], 'Seven')
+        self.assertEqual(cleaned['tags'], ['A', 'B'])
+        self.assertEqual(cleaned['lists'], [])
+
+    def test_rejects_bad_rows(self):
+        for bad in (
+            ['not', 'an', 'object'],
+            row('x'),
+            row(0),
+            row(1, title=''),
+            row(1, url='not a url'),
+            row(1, difficulty='Trivial'),
+            row(1, tags='Array'),
+            row(1, lists=['']),
+        ):
+            with self.assertRaises(ValueError, msg=bad):
+                clean_row(bad)
+
+
+class CatalogueImporterTests(ImportTestCase):
+
+    def import_rows(self, rows, **kwargs):
+        importer = CatalogueImporter(**kwargs)
+        importer.import_rows(enumerate(rows, 1))
+        importer.finish()
+        return importer
+
+    def test_upserts_and_counts(self):
+        make_problem(1, title='Old title')
+        importer = self.import_rows([row(1, title='New title'), row(2), row(3)], batch_size=2)
+        self.assertEqual((importer.created, importer.updated, importer.errors), (2, 1, []))
+        self.assertEqual(Problem.objects.get(pk=1).title, 'New title')
+        self.assertEqual(Problem.objects.count(), 3)
+
+    def test_collects_errors_and_keeps_going(self):
+        importer = self.import_rows([row(1), row(2, difficulty='Trivial'), row(3)])
+        self.assertEqual(importer.created, 2)
+        self.assertEqual(len(importer.errors), 1)
+        self.assertTrue(importer.errors[0].startswith('<rows>:2:'))
+
+    def test_last_duplicate_wins(self):
+        self.import_rows([row(1, title='First'), row(1, title='Second')])
+        self.assertEqual(Problem.objects.get(pk=1).title, 'Second')
+
+    def test_adds_list_memberships(self):
+        ProblemList.objects.create(name='Top 100', list_type='curated')
+        self.import_rows([row(1, lists=['Top 100', 'New list']), row(2, lists=['Top 100'])], list_type='curated')
+        top = ProblemList.objects.get(name='Top 100')
+        self.assertEqual(sorted(top.items.values_list('problem_id', flat=True)), [1, 2])
+        self.assertEqual(ProblemList.objects.get(name='New list').list_type, 'curated')
+        self.import_rows([row(1, lists=['Top 100'])])
+        self.assertEqual(ProblemListItem.objects.count(), 3)
+
+    def test_syncs_tracked_rows(self):
+        track(self.user, make_problem(1, difficulty='Easy'))
+        self.import_rows([row(1, difficulty='Hard', tags=['Graph'])])
+        self.assertEqual(UserProblem.objects.get(problem_id=1).difficulty, 'Hard')
+
+    def test_finish_resets_sequence(self):
+        self.import_rows([row(50)])
+        problem = Problem.objects.create(title='Next', url='https://leetcode.com/problems/next/', difficulty='Easy')
+        self.assertGreater(problem.pk, 50)
+
+
+class ImportCommandTests(ImportTestCase):
+
+    def test_imports_files(self):
+        jsonl = self.write_jsonl('a.jsonl', [row(1), row(2, difficulty='Trivial')])
+        csv_path = self.write('b.csv', 'id,title,url,difficulty,tags\n3,Three,https://leetcode.com/problems/three/,Hard,\n')
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_problems', str(jsonl), str(csv_path), stdout=stdout, stderr=stderr)
+        self.assertIn('Imported 2 new and 0 updated problems', stdout.getvalue())
+        self.assertIn('1 rows rejected', stdout.getvalue())
+        self.assertIn('a.jsonl:2', stderr.getvalue())
+        self.assertEqual(sorted(Problem.objects.values_list('id', flat=True)), [1, 3])
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            call_command('import_problems', str(self.directory / 'missing.jsonl'), stdout=StringIO())
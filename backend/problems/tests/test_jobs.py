@@ -0,0 +1,202 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from problems import jobs, tasks
+from problems.checks import check_shared_cache
+from problems.due_counts import _cache, _key, due_count, forget_due_counts, prepare_due_counts
+from problems.jobs import Worker, enqueue, run_job, scheduled_slot
+from problems.models import Job, UserProblem
+
+from .utils import APITestCase, make_problem, make_user, track
+
+
+def succeed(value=1):
+    return {'value': value}
+
+
+def fail():
+    raise RuntimeError('boom')
+
+
+class JobTestMixin:
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(jobs.registry, {'succeed': succeed, 'fail': fail})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def claim_one(self, worker=None):
+        [job] = (worker or Worker(schedule={})).claim(1)
+        return job
+
+
+class EnqueueTests(JobTestMixin, TestCase):
+
+    def test_unknown_job(self):
+        with self.assertRaises(ValueError):
+            enqueue('missing')
+
+    def test_dedupe_key(self):
+        self.assertIsNotNone(enqueue('succeed', dedupe_key='once'))
+        self.assertIsNone(enqueue('succeed', dedupe_key='once'))
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_queue_stats(self):
+        enqueue('succeed', run_after=timezone.now() - timedelta(seconds=30))
+        enqueue('succeed', run_after=timezone.now() + timedelta(hours=1))
+        stats = jobs.queue_stats()
+        self.assertEqual((stats['queued'], stats['running'], stats['failed']), (2, 0, 0))
+        self.assertGreaterEqual(stats['oldest_due_seconds'], 30)
+
+
+class RunJobTests(JobTestMixin, TestCase):
+
+    def test_success(self):
+        enqueue('succeed', {'value': 5})
+        job = run_job(self.claim_one())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.attempts, job.locked_by), (Job.DONE, {'value': 5}, 1, ''))
+
+    def test_failure_is_retried_with_backoff(self):
+        enqueue('fail', max_attempts=2)
+        with self.assertLogs('problems.jobs', 'ERROR'):
+            job = run_job(self.claim_one())
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('boom', job.last_error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=20))
+
+        Job.objects.update(run_after=timezone.now())
+        with self.assertLogs('problems.jobs', 'ERROR'):
+            job = run_job(self.claim_one())
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_unregistered_job_fails_without_retry(self):
+        job = enqueue('succeed')
+        Job.objects.filter(pk=job.pk).update(name='removed')
+        with self.assertLogs('problems.jobs', 'ERROR'):
+            job = run_job(self.claim_one())
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn('Unknown job: removed', job.last_error)
+
+
+class WorkerTests(JobTestMixin, TestCase):
+
+    def test_claims_only_due_jobs_once(self):
+        enqueue('succeed')
+        enqueue('succeed', run_after=timezone.now() + timedelta(hours=1))
+        first, second = Worker(schedule={}), Worker(schedule={})
+        self.assertEqual(len(first.claim(5)), 1)
+        self.assertEqual(second.claim(5), [])
+
+    def test_scheduled_slot(self):
+        now = timezone.make_aware(timezone.datetime(2024, 5, 2, 3, 0))
+        self.assertEqual(scheduled_slot('02:30', now).isoformat(), '2024-05-02T02:30:00+00:00')
+        self.assertEqual(scheduled_slot('04:00', now).isoformat(), '2024-05-01T04:00:00+00:00')
+
+    def test_enqueue_scheduled_once_across_workers(self):
+        now = timezone.now()
+        for worker in (Worker(schedule={'succeed': '00:00'}), Worker(schedule={'succeed': '00:00'})):
+            worker.enqueue_scheduled(now)
+            worker.enqueue_scheduled(now)
+        self.assertEqual(Job.objects.filter(name='succeed').count(), 1)
+
+    def test_requeue_stale(self):
+        enqueue('succeed')
+        worker = Worker(schedule={})
+        job = self.claim_one(worker)
+        self.assertEqual(worker.requeue_stale(), 0)
+        self.assertEqual(worker.requeue_stale(now=timezone.now() + worker.lock_timeout * 2), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (Job.QUEUED, ''))
+
+
+class RunJobsCommandTests(JobTestMixin, TransactionTestCase):
+
+    def test_runs_queue_until_empty(self):
+        enqueue('succeed')
+        stdout = StringIO()
+        call_command('run_jobs', once=True, no_schedule=True, enqueue=['succeed'], stdout=stdout)
+        self.assertEqual(list(Job.objects.values_list('status', flat=True)), [Job.DONE, Job.DONE])
+        self.assertIn('Worker stopped', stdout.getvalue())
+
+
+class DueCountTests(APITestCase):
+
+    def test_cached_until_forgotten(self):
+        track(self.user, make_problem(1))
+        track(self.user, make_problem(2), due_in=timedelta(days=3))
+        self.assertEqual(due_count(self.user), 1)
+        # A bulk update skips the signals that drop cached counts
+        UserProblem.objects.filter(problem_id=2).update(next_due=timezone.now())
+        self.assertEqual(due_count(self.user), 1)
+        forget_due_counts(self.user.pk)
+        self.assertEqual(due_count(self.user), 2)
+
+    def test_prepare_due_counts(self):
+        other = make_user('bob')
+        track(self.user, make_problem(1), due_in=timedelta(hours=30))
+        track(other, make_problem(2), due_in=timedelta(days=5))
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        self.assertEqual(prepare_due_counts(tomorrow), 2)
+        self.assertEqual(_cache().get(_key(self.user.pk, tomorrow)), 1)
+        self.assertEqual(_cache().get(_key(other.pk, tomorrow)), 0)
+
+    def test_shared_cache_check(self):
+        self.assertEqual(check_shared_cache(None), [])
+        with override_settings(SHARED_CACHE_ALIAS='default'):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['problems.E001'])
+        with override_settings(SHARED_CACHE_ALIAS='missing'):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['problems.E001'])
+
+
+class TaskTests(APITestCase):
+
+    def review(self, problem, changes, days_ago):
+        """Review ``problem`` like the API does, each time on a freshly loaded row."""
+        user_problem = track(self.user, problem)
+        for change in changes:
+            UserProblem.objects.get(pk=user_problem.pk).update_confidence(change)
+        shift = timedelta(days=days_ago)
+        UserProblem.objects.filter(pk=user_problem.pk).update(
+            last_attempted=F('last_attempted') - shift, next_due=F('next_due') - shift
+        )
+        return UserProblem.objects.get(pk=user_problem.pk)
+
+    def test_replan_overdue_never_postpones_due_problems(self):
+        histories = ([15] * 5, [15, -10, 15])
+        overdue = [self.review(make_problem(pk), changes, days_ago=2.5) for pk, changes in enumerate(histories, 1)]
+        self.assertTrue(all(user_problem.next_due < timezone.now() for user_problem in overdue))
+
+        self.assertEqual(tasks.replan_overdue(), {'replanned': 0})
+        for user_problem in overdue:
+            replanned = UserProblem.objects.get(pk=user_problem.pk)
+            self.assertEqual(
+                (replanned.next_due, replanned.frequency_days), (user_problem.next_due, user_problem.frequency_days)
+            )
+        self.assertEqual(due_count(self.user), 2)
+
+    def test_replan_overdue_brings_problems_forward(self):
+        user_problem = self.review(make_problem(1), [15], days_ago=40)
+        UserProblem.objects.filter(pk=user_problem.pk).update(
+            frequency_days=30, next_due=user_problem.last_attempted + timedelta(days=30)
+        )
+        track(self.user, make_problem(2), due_in=-timedelta(days=3))
+        with override_settings(SPACED_REPETITION_SCHEDULER='sm2'):
+            self.assertEqual(tasks.replan_overdue(), {'replanned': 1})
+        replanned = UserProblem.objects.get(pk=user_problem.pk)
+        self.assertEqual(replanned.frequency_days, 6)
+        self.assertEqual(replanned.next_due, user_problem.last_attempted + timedelta(days=6))
+
+    def test_prune_jobs(self):
+        with mock.patch.dict(jobs.registry, {'succeed': succeed}):
+            old, recent = enqueue('succeed'), enqueue('succeed')
+        Job.objects.filter(pk=old.pk).update(status=Job.DONE, finished_at=timezone.now() - timedelta(days=8))
+        Job.objects.filter(pk=recent.pk).update(status=Job.DONE, finished_at=timezone.now())
+        self.assertEqual(tasks.prune_jobs(), {'deleted': 1})
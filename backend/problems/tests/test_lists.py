@@ -0,0 +1,61 @@
+from problems.models import ProblemList, ProblemListItem, UserList, UserListItem
+
+from .utils import APITestCase, count_queries, make_problem, make_user, track
+
+
+class ProblemListViewTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.top = ProblemList.objects.create(name='Top', list_type='curated')
+        self.problems = [make_problem(pk) for pk in range(1, 4)]
+        for problem in self.problems:
+            ProblemListItem.objects.create(list=self.top, problem=problem)
+
+    def test_list_counts(self):
+        ProblemList.objects.create(name='Other', list_type='company')
+        response = self.client.get('/api/lists/?list_type=curated')
+        self.assertEqual(response.status_code, 200)
+        [row] = response.json()['results']
+        self.assertEqual((row['name'], row['problem_count']), ('Top', 3))
+
+    def test_detail_overlays_progress(self):
+        track(self.user, self.problems[1], confidence=3)
+        track(make_user('bob'), self.problems[2])
+        data = self.client.get(f'/api/lists/{self.top.pk}/').json()
+        progress = {problem['id']: problem['progress'] for problem in data['problems']}
+        self.assertEqual(progress[1], None)
+        self.assertEqual(progress[2]['confidence'], 3)
+        self.assertEqual(progress[3], None)
+
+    def test_detail_queries_do_not_grow(self):
+        url = f'/api/lists/{self.top.pk}/'
+        self.client.get(url)
+        before = count_queries(lambda: self.client.get(url))
+        for pk in range(4, 14):
+            problem = make_problem(pk)
+            ProblemListItem.objects.create(list=self.top, problem=problem)
+            track(self.user, problem)
+        self.assertEqual(count_queries(lambda: self.client.get(url)), before)
+
+
+class UserListViewTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user_list = UserList.objects.create(user=self.user, name='Mine')
+        for pk in (1, 2):
+            UserListItem.objects.create(user_list=self.user_list, problem=make_problem(pk))
+
+    def test_only_own_lists(self):
+        other = UserList.objects.create(user=make_user('bob'), name='Theirs')
+        rows = self.client.get('/api/user/lists/').json()['results']
+        self.assertEqual([(row['name'], row['problem_count']) for row in rows], [('Mine', 2)])
+        self.assertEqual(self.client.get(f'/api/user/lists/{other.pk}/').status_code, 404)
+
+    def test_detail_overlays_progress(self):
+        track(self.user, self.user_list.items.get(problem_id=2).problem, solved_count=1)
+        data = self.client.get(f'/api/user/lists/{self.user_list.pk}/').json()
+        self.assertEqual([problem['id'] for problem in data['problems']], [1, 2])
+        self.assertIsNone(data['problems'][0]['progress'])
+        self.assertEqual(data['problems'][1]['progress']['solved_count'], 1)
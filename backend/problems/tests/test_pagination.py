@@ -0,0 +1,81 @@
+from base64 import b64decode
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.conf import settings
+from django.utils import timezone
+
+from problems.models import UserProblem
+
+from .utils import APITestCase, make_problem
+
+
+def _path(url):
+    return url.replace('http://testserver', '') if url else None
+
+
+def walk(client, url):
+    """Follow ``next`` links from ``url``; returns the pages."""
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, response.content
+        pages.append(response.json())
+        url = _path(pages[-1]['next'])
+    return pages
+
+
+PAGE_SIZE = settings.REST_FRAMEWORK['PAGE_SIZE']
+TOTAL = PAGE_SIZE * 2 + 5
+
+
+class CursorPaginationTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        due = timezone.now().replace(microsecond=0) - timedelta(hours=1)
+        for pk in range(1, TOTAL + 1):
+            # Most of the queue shares one due date, the case offsets handle badly
+            UserProblem.objects.create(
+                user=self.user, problem=make_problem(pk),
+                next_due=due - timedelta(days=1) if pk % 5 == 0 else due,
+            )
+
+    def test_problems_by_id(self):
+        pages = walk(self.client, '/api/problems/?pagination=cursor')
+        self.assertEqual([len(page['results']) for page in pages], [PAGE_SIZE, PAGE_SIZE, 5])
+        self.assertEqual([row['id'] for page in pages for row in page['results']], list(range(1, TOTAL + 1)))
+        self.assertNotIn('count', pages[0])
+
+    def test_user_problems_walk_the_queue_in_order(self):
+        pages = walk(self.client, '/api/user/problems/?pagination=cursor')
+        expected = list(UserProblem.objects.filter(user=self.user).order_by('next_due', 'id').values_list('id', flat=True))
+        self.assertEqual([row['id'] for page in pages for row in page['results']], expected)
+
+    def test_user_problem_cursors_carry_no_offset(self):
+        first = self.client.get('/api/user/problems/?pagination=cursor').json()
+        response = self.client.get(_path(first['next']))
+        cursor = parse_qs(urlparse(first['next']).query)['cursor'][0]
+        self.assertNotIn('o=', b64decode(cursor).decode())
+        self.assertEqual(response.status_code, 200)
+
+    def test_previous_links_return_the_same_pages(self):
+        pages = walk(self.client, '/api/user/problems/?pagination=cursor')
+        back = self.client.get(_path(pages[-1]['previous'])).json()
+        self.assertEqual(back['results'], pages[-2]['results'])
+        first = self.client.get(_path(back['previous'])).json()
+        self.assertEqual(first['results'], pages[0]['results'])
+        self.assertIsNone(first['previous'])
+
+    def test_filters_apply(self):
+        pages = walk(self.client, '/api/user/problems/?pagination=cursor&due_today=true')
+        self.assertEqual(sum(len(page['results']) for page in pages), TOTAL)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/user/problems/?pagination=cursor&cursor=bm9wZQ').status_code, 404)
+        self.assertEqual(self.client.get('/api/problems/?pagination=cursor&cursor=bz14').status_code, 404)
+
+    def test_page_numbers_by_default(self):
+        data = self.client.get('/api/user/problems/?page=2').json()
+        self.assertEqual(data['count'], TOTAL)
+        self.assertEqual(len(data['results']), PAGE_SIZE)
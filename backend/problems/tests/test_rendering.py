@@ -0,0 +1,84 @@
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from problems import rendering
+from problems.models import Problem, UserProblem
+from problems.rendering import FastJSONRenderer, dashboard_rows, problem_rows, user_problem_rows
+from problems.serializers import DashboardSerializer, ProblemSerializer, UserProblemSerializer
+
+from .utils import APITestCase, make_problem, track
+
+
+class ValuesSerializerTests(APITestCase):
+    """The values fast path returns exactly what the model serializers would."""
+
+    def setUp(self):
+        super().setUp()
+        problems = [make_problem(pk, tags=['Array'] if pk % 2 else []) for pk in range(1, 5)]
+        track(self.user, problems[0], due_in=timedelta(days=-2))
+        track(self.user, problems[1], due_in=timedelta(hours=3), attempts_count=2, solved_count=1)
+        track(self.user, problems[2], due_in=timedelta(days=4), last_attempted=timezone.now())
+
+    def assertMatches(self, values_serializer, serializer_class, queryset):
+        self.assertEqual(
+            values_serializer.serialize(values_serializer.rows(queryset)),
+            serializer_class(queryset, many=True).data,
+        )
+
+    def test_problems(self):
+        self.assertMatches(problem_rows, ProblemSerializer, Problem.objects.order_by('id'))
+
+    def test_user_problems(self):
+        queryset = UserProblem.objects.select_related('problem').order_by('id')
+        self.assertMatches(user_problem_rows, UserProblemSerializer, queryset)
+
+    def test_dashboard(self):
+        queryset = UserProblem.objects.select_related('problem').order_by('next_due')
+        self.assertMatches(dashboard_rows, DashboardSerializer, queryset)
+
+    def test_other_time_zone(self):
+        queryset = UserProblem.objects.select_related('problem').order_by('id')
+        with timezone.override('America/New_York'):
+            self.assertMatches(user_problem_rows, UserProblemSerializer, queryset)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    data = {
+        'results': [{'id': 1, 'title': 'Line\u2028break', 'tags': ['Array'], 'score': 0.5, 'next': None}],
+        'when': timezone.now(),
+        'delta': timedelta(seconds=3),
+    }
+
+    def test_matches_json_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch.object(rendering, 'orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_indent_uses_json_renderer(self):
+        context = {'indent': 2}
+        self.assertEqual(
+            FastJSONRenderer().render(self.data, renderer_context=context),
+            JSONRenderer().render(self.data, renderer_context=context),
+        )
+
+    @unittest.skipIf(rendering.orjson is None, 'orjson is not installed')
+    def test_encodes_with_orjson(self):
+        with mock.patch.object(JSONRenderer, 'render') as render:
+            FastJSONRenderer().render({'id': 1})
+        render.assert_not_called()
+
+
+class FastEndpointTests(APITestCase):
+
+    def test_problem_list_renders_json(self):
+        make_problem(1, tags=['Array'])
+        response = self.client.get('/api/problems/')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['results'][0]['tags'], ['Array'])
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipIf
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from problems import scheduling
+from problems.models import UserProblem
+from problems.scheduling import SCHEDULERS, HeuristicScheduler, get_scheduler, replan
+
+from .utils import APITestCase, make_problem, track
+
+CONFIDENCE = [0, 20, 55, 90, 100, 100]
+FREQUENCY = [1, 3, 10, 25, 30, 1]
+CHANGE = [20, -10, 15, -40, 20, 5]
+
+
+class SchedulerTests(SimpleTestCase):
+
+    def test_heuristic_matches_original_rules(self):
+        scheduler = HeuristicScheduler()
+        self.assertEqual(scheduler.review(50, 4, 20), (70, 6))
+        self.assertEqual(scheduler.review(50, 4, -10), (40, 4 * 0.7))
+        self.assertEqual(scheduler.review(95, 25, 20), (100, 30))
+        self.assertEqual(scheduler.review(5, 1, -10), (0, 1))
+
+    def test_intervals_stay_in_bounds(self):
+        for scheduler in (cls() for cls in SCHEDULERS.values()):
+            for row in zip(CONFIDENCE, FREQUENCY, CHANGE):
+                _, interval = scheduler.review(*row)
+                self.assertGreaterEqual(interval, 1, scheduler.name)
+                self.assertLessEqual(interval, scheduler.max_interval, scheduler.name)
+
+    def assertBatchMatchesScalar(self):
+        for scheduler in (cls() for cls in SCHEDULERS.values()):
+            confidence, intervals = scheduler.review_many(CONFIDENCE, FREQUENCY, CHANGE)
+            expected = [scheduler.review(*row) for row in zip(CONFIDENCE, FREQUENCY, CHANGE)]
+            for got, want in zip(zip(confidence, intervals), expected):
+                self.assertAlmostEqual(float(got[0]), want[0], msg=scheduler.name)
+                self.assertAlmostEqual(float(got[1]), want[1], msg=scheduler.name)
+            plans = scheduler.plan_many(CONFIDENCE, [3, 0, 7, 2, 60, 1], [2, 0, 7, 0, 55, 1])
+            for got, row in zip(plans, zip(CONFIDENCE, [3, 0, 7, 2, 60, 1], [2, 0, 7, 0, 55, 1])):
+                self.assertAlmostEqual(float(got), scheduler.plan(*row), msg=scheduler.name)
+
+    @skipIf(scheduling.np is None, 'NumPy is not installed')
+    def test_vectorized_matches_scalar(self):
+        self.assertBatchMatchesScalar()
+
+    def test_fallback_without_numpy_matches_scalar(self):
+        with mock.patch.object(scheduling, 'np', None):
+            self.assertBatchMatchesScalar()
+
+    def test_get_scheduler(self):
+        self.assertIsInstance(get_scheduler('sm2'), SCHEDULERS['sm2'])
+        self.assertIsInstance(get_scheduler('problems.scheduling.FSRSScheduler'), SCHEDULERS['fsrs'])
+        with override_settings(SPACED_REPETITION_SCHEDULER='fsrs'):
+            self.assertIsInstance(get_scheduler(), SCHEDULERS['fsrs'])
+        with self.assertRaises(ValueError):
+            get_scheduler('nope')
+
+
+class ReviewSchedulingTests(APITestCase):
+
+    @override_settings(SPACED_REPETITION_SCHEDULER='sm2')
+    def test_reviews_use_the_configured_scheduler(self):
+        user_problem = track(self.user, make_problem(1), confidence=50)
+        user_problem.update_confidence(20)
+        user_problem.refresh_from_db()
+        self.assertEqual(user_problem.frequency_days, 6)
+        self.assertAlmostEqual(
+            (user_problem.next_due - user_problem.last_attempted).total_seconds(), 6 * 86400, delta=1
+        )
+
+
+class ReplanTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.reviewed_at = timezone.now() - timedelta(days=2)
+        self.reviewed = track(
+            self.user, make_problem(1), due_in=timedelta(days=-1), confidence=70,
+            attempts_count=3, solved_count=3, last_attempted=self.reviewed_at,
+        )
+        self.new = track(self.user, make_problem(2), due_in=timedelta(days=-1))
+
+    def test_replans_reviewed_rows_from_their_last_review(self):
+        scheduler = get_scheduler('sm2')
+        self.assertEqual(replan(UserProblem.objects.all(), scheduler), 1)
+        self.reviewed.refresh_from_db()
+        interval = scheduler.plan(70, 3, 3)
+        self.assertEqual(self.reviewed.next_due, self.reviewed_at + timedelta(days=interval))
+        self.assertEqual(replan(UserProblem.objects.all(), scheduler), 0)
+
+    def test_never_reviewed_rows_stay_due(self):
+        due = self.new.next_due
+        replan(UserProblem.objects.all(), get_scheduler('sm2'))
+        self.new.refresh_from_db()
+        self.assertEqual(self.new.next_due, due)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('replan_queue', '--scheduler', 'sm2', '--user', self.user.email, stdout=out)
+        self.assertIn('Re-planned 1 problems with the sm2 scheduler', out.getvalue())
@@ -0,0 +1,86 @@
+from problems import search
+from problems.search import SearchIndex, get_index, tokenize, trigrams
+
+from .utils import APITestCase, make_problem
+
+URL = '/api/problems/search/'
+
+
+def problem(pk, title, tags=()):
+    return {'id': pk, 'title': title, 'tags': list(tags)}
+
+
+class SearchIndexTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.index = SearchIndex([
+            problem(1, 'Two Sum', ['Array', 'Hash Table']),
+            problem(2, 'Add Two Numbers', ['Linked List']),
+            problem(15, '3Sum', ['Array', 'Two Pointers']),
+            problem(200, 'Number of Islands', ['Graph']),
+        ])
+
+    def ids(self, query, limit=20):
+        return [result['id'] for result, score in self.index.search(query, limit)]
+
+    def test_tokenize_and_trigrams(self):
+        self.assertEqual(tokenize('Two-Sum II'), ['two', 'sum', 'ii'])
+        self.assertEqual(trigrams('ab'), {'  a', ' ab', 'ab '})
+
+    def test_title_prefix_ranks_first(self):
+        self.assertEqual(self.ids('two')[0], 1)
+
+    def test_tolerates_typos(self):
+        self.assertEqual(self.ids('islnds')[0], 200)
+
+    def test_partial_word(self):
+        self.assertIn(200, self.ids('isl'))
+
+    def test_tag_match(self):
+        self.assertEqual(self.ids('graph'), [200])
+
+    def test_problem_number(self):
+        self.assertEqual(self.ids('15')[0], 15)
+
+    def test_limit_and_empty_query(self):
+        self.assertEqual(len(self.ids('two', limit=1)), 1)
+        self.assertEqual(self.ids('  '), [])
+
+    def test_no_match(self):
+        self.assertEqual(self.ids('zzzz'), [])
+
+
+class SearchViewTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Versions restart with each test's rolled back database
+        search._index = (None, None)
+        make_problem(1, title='Two Sum', tags=['Array'])
+        make_problem(2, title='Valid Parentheses', tags=['Stack'])
+
+    def test_search(self):
+        response = self.client.get(URL, {'q': 'two sum'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['query'], 'two sum')
+        self.assertEqual(data['results'][0]['id'], 1)
+        self.assertIn('score', data['results'][0])
+
+    def test_empty_query(self):
+        self.assertEqual(self.client.get(URL).json()['results'], [])
+
+    def test_invalid_limit(self):
+        self.assertEqual(self.client.get(URL, {'q': 'two', 'limit': 'x'}).status_code, 400)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertIn(self.client.get(URL, {'q': 'two'}).status_code, (401, 403))
+
+    def test_new_problem_rebuilds_index(self):
+        index = get_index()
+        self.assertIs(get_index(), index)
+        make_problem(3, title='Merge Intervals')
+        self.assertIsNot(get_index(), index)
+        self.assertEqual(self.client.get(URL, {'q': 'merge'}).json()['results'][0]['id'], 3)
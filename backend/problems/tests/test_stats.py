@@ -0,0 +1,150 @@
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import DEFAULT_DB_ALIAS, connection, router
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from problems.models import CacheVersion, UserProblem, UserProblemSummary
+from problems.stats import acompute_stats, compute_stats, refresh_summaries
+
+from .utils import APITestCase, make_problem, make_user, track
+
+
+class StatsTestMixin:
+    """Stats payload checks shared by the aggregate and summary paths."""
+
+    def setUp(self):
+        super().setUp()
+        self.easy = track(self.user, make_problem(1, 'Easy'), due_in=timedelta(days=-1), confidence=40, solved_count=1)
+        self.medium = track(self.user, make_problem(2, 'Medium'), due_in=timedelta(days=3), confidence=80)
+        self.hard = track(self.user, make_problem(3, 'Hard'), due_in=timedelta(days=-2))
+        track(make_user('bob'), make_problem(4, 'Hard'), confidence=100, solved_count=3)
+
+    def stats(self):
+        response = self.client.get('/api/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts(self):
+        self.assertEqual(self.stats(), {
+            'total_problems': 3,
+            'solved_problems': 1,
+            'due_today': 2,
+            'average_confidence': 40.0,
+            'difficulty_breakdown': {'Easy': 1, 'Medium': 1, 'Hard': 1},
+        })
+
+    def test_reviews_are_reflected(self):
+        self.stats()
+        response = self.client.put(
+            f'/api/user/problems/{self.hard.pk}/update/', {'confidence_change': 20, 'solved': True},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        stats = self.stats()
+        self.assertEqual(stats['solved_problems'], 2)
+        self.assertEqual(stats['due_today'], 1)
+        self.assertEqual(stats['average_confidence'], (40 + 80 + UserProblem.objects.get(pk=self.hard.pk).confidence) / 3)
+
+    def test_difficulty_change_is_reflected(self):
+        self.stats()
+        problem = self.hard.problem
+        problem.difficulty = 'Easy'
+        problem.save()
+        self.assertEqual(self.stats()['difficulty_breakdown'], {'Easy': 2, 'Medium': 1, 'Hard': 0})
+
+
+class AggregateStatsTests(StatsTestMixin, APITestCase):
+
+    def test_one_query(self):
+        with self.assertNumQueries(1):
+            compute_stats(self.user)
+
+    def test_reviews_leave_summaries_alone(self):
+        UserProblemSummary.objects.create(user=self.user, confidence_sum=7)
+        with CaptureQueriesContext(connection) as context:
+            self.easy.update_confidence(20)
+        table = f'"{UserProblemSummary._meta.db_table}"'
+        self.assertFalse([query for query in context.captured_queries if table in query['sql']])
+        self.assertEqual(UserProblemSummary.objects.get(user=self.user).confidence_sum, 7)
+        with self.assertNumQueries(0):
+            UserProblemSummary.lock(self.user.pk)
+
+
+@override_settings(PROBLEM_STATS_USE_SUMMARY=True)
+class SummaryStatsTests(StatsTestMixin, APITestCase):
+
+    def test_summary_built_on_first_read(self):
+        self.assertFalse(UserProblemSummary.objects.filter(user=self.user).exists())
+        self.stats()
+        summary = UserProblemSummary.objects.get(user=self.user)
+        self.assertEqual((summary.total_problems, summary.easy_count, summary.confidence_sum), (3, 1, 120))
+
+    def test_tracking_invalidates_summary(self):
+        self.stats()
+        track(self.user, make_problem(5, 'Medium'))
+        self.assertFalse(UserProblemSummary.objects.filter(user=self.user).exists())
+        self.assertEqual(self.stats()['total_problems'], 4)
+
+    def test_warm_reads_skip_user_problems(self):
+        self.stats()  # builds the summary
+        self.stats()  # caches the due count
+        with CaptureQueriesContext(connection) as context:
+            self.stats()
+        table = f'FROM "{UserProblem._meta.db_table}"'
+        self.assertFalse([query for query in context.captured_queries if table in query['sql']])
+
+    def test_refresh_summaries_repairs_drift(self):
+        self.stats()
+        UserProblemSummary.objects.filter(user=self.user).update(total_problems=99, hard_count=0)
+        self.assertEqual(refresh_summaries([self.user.pk]), 1)
+        self.assertEqual(self.stats()['total_problems'], 3)
+        self.assertEqual(self.stats()['difficulty_breakdown']['Hard'], 1)
+
+    def test_rebuilds_and_writers_take_the_user_lock(self):
+        calls = []
+        lock = UserProblemSummary.lock.__func__
+
+        def record(cls, *user_ids):
+            calls.append(user_ids)
+            lock(cls, *user_ids)
+
+        with mock.patch.object(UserProblemSummary, 'lock', classmethod(record)):
+            compute_stats(self.user)
+            self.assertEqual(calls, [(self.user.pk,)])
+            self.easy.update_confidence(20)
+            track(self.user, make_problem(5))
+            refresh_summaries([self.user.pk])
+        # Rebuild, review (before the row changes and with the delta), tracking, refresh
+        self.assertEqual(len(calls), 5)
+        self.assertTrue(all(user_ids == (self.user.pk,) for user_ids in calls))
+
+    def test_lock_selects_the_user_rows(self):
+        with CaptureQueriesContext(connection) as context:
+            UserProblemSummary.lock(self.user.pk)
+        [query] = context.captured_queries
+        self.assertIn('"accounts_user"', query['sql'])
+
+    def test_rebuilds_read_the_primary(self):
+        # Opted-in reads of tracked problems would go to a (missing) replica
+        def db_for_read(model, **hints):
+            return 'replica1' if model is UserProblem else DEFAULT_DB_ALIAS
+
+        with mock.patch.object(router, 'db_for_read', db_for_read):
+            self.assertEqual(compute_stats(self.user)['total_problems'], 3)
+            self.assertEqual(compute_stats(self.user)['due_today'], 2)
+            UserProblemSummary.objects.all().delete()
+            self.assertEqual(async_to_sync(acompute_stats)(self.user)['total_problems'], 3)
+        self.assertEqual(UserProblemSummary.objects.get(user=self.user).total_problems, 3)
+
+
+class CacheVersionTests(APITestCase):
+
+    def test_get_returns_the_created_token(self):
+        with self.assertNumQueries(2):
+            value = CacheVersion.get('new')
+        self.assertIsNotNone(value)
+        self.assertEqual(CacheVersion.get('new'), value)
+        self.assertIsNotNone(async_to_sync(CacheVersion.aget)('other'))
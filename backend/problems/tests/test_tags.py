@@ -0,0 +1,49 @@
+from problems.models import Problem, ProblemTag, Tag
+from problems.tags import MATCH_ALL, filter_by_tags
+
+from .utils import APITestCase, make_problem
+
+
+class TagIndexTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        make_problem(1, tags=['Array', 'Hash Table'])
+        make_problem(2, tags=['Array', 'Two Pointers'])
+        make_problem(3, tags=['Graph'])
+
+    def ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return sorted(row['id'] for row in response.json()['results'])
+
+    def test_index_mirrors_problem_tags(self):
+        self.assertEqual(
+            sorted(ProblemTag.objects.filter(problem_id=1).values_list('tag__name', flat=True)),
+            ['Array', 'Hash Table'],
+        )
+        problem = Problem.objects.get(pk=1)
+        problem.tags = ['Graph']
+        problem.save()
+        self.assertEqual(list(ProblemTag.objects.filter(problem_id=1).values_list('tag__name', flat=True)), ['Graph'])
+
+    def test_tags_get_distinct_bits(self):
+        bits = list(Tag.objects.values_list('bit', flat=True))
+        self.assertNotIn(None, bits)
+        self.assertEqual(len(set(bits)), len(bits))
+
+    def test_any_of(self):
+        self.assertEqual(self.ids('/api/problems/?tags=Hash Table&tags=Graph'), [1, 3])
+
+    def test_all_of(self):
+        self.assertEqual(self.ids('/api/problems/?tags=Array&tags=Two Pointers&tag_match=all'), [2])
+        self.assertEqual(self.ids('/api/problems/?tags=Array&tags=Unknown&tag_match=all'), [])
+
+    def test_combines_with_difficulty(self):
+        make_problem(4, 'Hard', tags=['Array'])
+        self.assertEqual(self.ids('/api/problems/?tags=Array&difficulty=Hard'), [4])
+
+    def test_no_tags_leaves_queryset_alone(self):
+        queryset = Problem.objects.all()
+        self.assertIs(filter_by_tags(queryset, ['']), queryset)
+        self.assertEqual(filter_by_tags(queryset, ['Array', 'Hash Table'], MATCH_ALL).get().pk, 1)
@@ -0,0 +1,132 @@
+from problems.catalogue import get_version
+from problems.due_counts import due_count
+from problems.models import Problem, ProblemList, ProblemListItem, UserList, UserListItem, UserProblem, UserProblemSummary
+from problems.stats import refresh_summary
+from problems.tags import tag_bits, tag_mask
+from problems.tracking import track_problems
+
+from .utils import APITestCase, count_queries, make_problem, make_user, track
+
+URL = '/api/user/problems/bulk-track/'
+
+
+class TrackProblemsTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.problems = [make_problem(pk, difficulty='Medium', tags=['Array']) for pk in range(1, 6)]
+
+    def test_creates_missing_rows_only(self):
+        existing = track(self.user, self.problems[0], confidence=40)
+        user_problems, created = track_problems(self.user, [1, 2, 3, 2])
+        self.assertEqual([user_problem.problem_id for user_problem in user_problems], [1, 2, 3])
+        self.assertEqual([user_problem.problem_id for user_problem in created], [2, 3])
+        self.assertEqual(UserProblem.objects.get(pk=existing.pk).confidence, 40)
+
+    def test_repeat_creates_nothing(self):
+        track_problems(self.user, [1, 2])
+        _, created = track_problems(self.user, [1, 2])
+        self.assertEqual(created, [])
+        self.assertEqual(UserProblem.objects.filter(user=self.user).count(), 2)
+
+    def test_skips_unknown_ids(self):
+        user_problems, created = track_problems(self.user, [1, 999])
+        self.assertEqual([user_problem.problem_id for user_problem in created], [1])
+
+    def test_fills_denormalized_fields(self):
+        _, [user_problem] = track_problems(self.user, [1])
+        self.assertEqual(user_problem.difficulty, 'Medium')
+        self.assertEqual(user_problem.tag_mask, tag_mask(['Array'], tag_bits()))
+
+    def test_invalidates_summary(self):
+        refresh_summary(self.user)
+        track_problems(self.user, [1])
+        self.assertFalse(UserProblemSummary.objects.filter(user=self.user).exists())
+
+    def test_queries_do_not_grow_with_batch(self):
+        bob, carol = make_user('bob'), make_user('carol')
+        track_problems(self.user, [1])
+        few = count_queries(lambda: track_problems(bob, [1]))
+        many = count_queries(lambda: track_problems(carol, [1, 2, 3, 4, 5]))
+        self.assertEqual(few, many)
+
+
+class DeleteInvalidationTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.problems = [make_problem(pk) for pk in range(1, 101)]
+
+    def delete_user_queries(self, name, tracked):
+        user = make_user(name)
+        for problem in self.problems[:tracked]:
+            track(user, problem)
+        return count_queries(user.delete)
+
+    def test_untrack_invalidates_once(self):
+        for problem in self.problems[:3]:
+            track(self.user, problem)
+        refresh_summary(self.user)
+        self.assertEqual(due_count(self.user), 3)
+        UserProblem.objects.filter(problem_id__lte=2).delete()
+        self.assertFalse(UserProblemSummary.objects.filter(user=self.user).exists())
+        self.assertEqual(due_count(self.user), 1)
+
+    def test_user_delete_queries_do_not_grow(self):
+        self.assertEqual(self.delete_user_queries('bob', 10), self.delete_user_queries('carol', 100))
+
+    def test_problem_delete_queries_do_not_grow(self):
+        few = count_queries(lambda: Problem.objects.filter(pk__lte=2).delete())
+        many = count_queries(lambda: Problem.objects.filter(pk__gt=50).delete())
+        self.assertEqual(few, many)
+
+    def test_problem_delete_bumps_catalogue_and_tracking(self):
+        track(self.user, self.problems[0])
+        refresh_summary(self.user)
+        version = get_version()
+        Problem.objects.filter(pk__lte=10).delete()
+        self.assertNotEqual(get_version(), version)
+        self.assertFalse(UserProblemSummary.objects.filter(user=self.user).exists())
+        self.assertEqual(due_count(self.user), 0)
+
+
+class BulkTrackViewTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        for pk in range(1, 4):
+            make_problem(pk)
+
+    def post(self, data):
+        return self.client.post(URL, data, content_type='application/json')
+
+    def test_problem_ids(self):
+        response = self.post({'problem_ids': [1, 2]})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['created'], response.json()['already_tracked']), (2, 0))
+        response = self.post({'problem_ids': [2, 3]})
+        self.assertEqual((response.json()['created'], response.json()['already_tracked']), (1, 1))
+        response = self.post({'problem_ids': [3]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['user_problems']), 1)
+
+    def test_problem_list(self):
+        problem_list = ProblemList.objects.create(name='Top', list_type='curated')
+        for pk in (1, 3):
+            ProblemListItem.objects.create(list=problem_list, problem_id=pk)
+        response = self.post({'list_id': problem_list.pk})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(UserProblem.objects.values_list('problem_id', flat=True)), [1, 3])
+        self.assertEqual(self.post({'list_id': 999}).status_code, 404)
+
+    def test_user_list(self):
+        mine = UserList.objects.create(user=self.user, name='Mine')
+        UserListItem.objects.create(user_list=mine, problem_id=2)
+        theirs = UserList.objects.create(user=make_user('bob'), name='Theirs')
+        self.assertEqual(self.post({'user_list_id': mine.pk}).json()['created'], 1)
+        self.assertEqual(self.post({'user_list_id': theirs.pk}).status_code, 404)
+
+    def test_validation(self):
+        for data in ({}, {'problem_ids': []}, {'problem_ids': [1], 'list_id': 1}, {'problem_ids': [1, 999]}):
+            self.assertEqual(self.post(data).status_code, 400, data)
+        self.assertFalse(UserProblem.objects.exists())
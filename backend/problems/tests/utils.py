@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from problems import catalogue
+from problems.models import Problem, UserProblem
+
+User = get_user_model()
+
+
+def make_user(name='alice'):
+    return User.objects.create_user(username=name, email=f'{name}@example.com', password='secret')
+
+
+def make_problem(pk, difficulty='Easy', tags=(), title=None):
+    return Problem.objects.create(
+        id=pk,
+        title=title or f'Problem {pk}',
+        url=f'https://leetcode.com/problems/problem-{pk}/',
+        difficulty=difficulty,
+        tags=list(tags),
+    )
+
+
+def track(user, problem, due_in=timedelta(0), **fields):
+    """Track ``problem`` for ``user``, due ``due_in`` from now."""
+    return UserProblem.objects.create(user=user, problem=problem, next_due=timezone.now() + due_in, **fields)
+
+
+def count_queries(func):
+    with CaptureQueriesContext(connection) as context:
+        func()
+    return len(context.captured_queries)
+
+
+class APITestCase(TestCase):
+    """Logged-in client and empty caches for every test."""
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        # Versions restart with each test's rolled back database
+        catalogue.forget_version()
+        self.user = make_user()
+        self.client.force_login(self.user)
@@ -0,0 +1,58 @@
+"""Start tracking problems with one conflict-ignoring INSERT.
+
+``bulk_create`` skips the ``UserProblem`` signals, so ``track_problems`` does
+their bookkeeping (denormalized fields, summary, due counts, facets, live events)
+itself, once per batch.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .due_counts import forget_due_counts
+from .events import publish_tracking
+from .facets import forget_tracked
+from .models import Problem, UserProblem, UserProblemSummary
+from .tags import tag_bits, tracked_fields
+
+
+def track_problems(user, problem_ids, defaults=None):
+    """Start tracking ``problem_ids`` for ``user``; already tracked ones are left as they are.
+
+    Returns ``(user_problems, created)``: the user's rows for every existing
+    problem in ``problem_ids`` and the subset this call inserted. Unknown
+    problem ids are skipped.
+    """
+    problem_ids = list(dict.fromkeys(problem_ids))
+    problems = Problem.objects.filter(pk__in=problem_ids).only('id', 'difficulty', 'tags')
+    bits = tag_bits()
+
+    with transaction.atomic():
+        # Serialize tracking per user, so the rows seen here are exactly the
+        # ones this call's insert conflicts with
+        get_user_model().objects.select_for_update().filter(pk=user.pk).exists()
+        existing = set(
+            UserProblem.objects.filter(user=user, problem_id__in=problem_ids).values_list('problem_id', flat=True)
+        )
+        # INSERT ... ON CONFLICT DO NOTHING: callers that don't lock can't collide either
+        UserProblem.objects.bulk_create(
+            [
+                UserProblem(user=user, problem=problem, **tracked_fields(problem, bits), **(defaults or {}))
+                for problem in problems if problem.pk not in existing
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+        user_problems = list(
+            UserProblem.objects
+            .filter(user=user, problem_id__in=problem_ids)
+            .select_related('problem')
+            .order_by('problem_id')
+        )
+        created = [user_problem for user_problem in user_problems if user_problem.problem_id not in existing]
+        if created:
+            UserProblemSummary.invalidate(user.pk)
+            forget_tracked(user.pk)
+            publish_tracking(user.pk, created, tracked=True)
+
+    if created:
+        forget_due_counts(user.pk)
+    return user_problems, created
@@ -1,11 +1,26 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     # Core endpoints
     path('problems/', views.ProblemListAPIView.as_view(), name='problem_list'),
+    path('problems/search/', views.search_problems, name='problem_search'),
     path('user/problems/', views.UserProblemListView.as_view(), name='user_problem_list'),
     path('user/problems/<int:pk>/update/', views.UserProblemUpdateView.as_view(), name='user_problem_update'),
+    path('user/problems/bulk-update/', views.UserProblemBulkUpdateView.as_view(), name='user_problem_bulk_update'),
+    path('user/problems/bulk-track/', views.UserProblemBulkTrackView.as_view(), name='user_problem_bulk_track'),
+    path('lists/', views.ProblemListListView.as_view(), name='problem_list_list'),
+    path('lists/<int:pk>/', views.ProblemListDetailView.as_view(), name='problem_list_detail'),
+    path('user/lists/', views.UserListListView.as_view(), name='user_list_list'),
+    path('user/lists/<int:pk>/', views.UserListDetailView.as_view(), name='user_list_detail'),
     path('dashboard/', views.dashboard, name='dashboard'),
     path('stats/', views.problem_stats, name='problem_stats'),
+    path('analytics/', views.review_analytics, name='review_analytics'),
+    path('analytics/problems/<int:pk>/', views.problem_review_analytics, name='problem_review_analytics'),
+    
+    # ASGI-native variants of the hot read endpoints
+    path('async/problems/', async_views.problem_list, name='async_problem_list'),
+    path('async/dashboard/', async_views.dashboard, name='async_dashboard'),
+    path('async/stats/', async_views.problem_stats, name='async_problem_stats'),
+    path('events/', async_views.events, name='events'),
 ]
@@ -1,17 +1,42 @@
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.authentication import SessionAuthentication
-from django.db.models import Q, Avg
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from .models import Problem, UserProblem
+from leetqode.routers import use_replicas
+from leetqode.throttling import TokenBucketThrottle
+from .analytics import problem_analytics, user_analytics
+from .catalogue import CatalogueEntry
+from .due_counts import forget_due_counts
+from .events import publish_reviews
+from .facets import get_facet_index, tracked_mask
+from .models import (
+    Problem, ProblemList, ProblemListItem, ReviewEvent, UserList, UserListItem, UserProblem,
+    UserProblemSummary, end_of_today
+)
 from .serializers import (
     ProblemSerializer, UserProblemSerializer, UserProblemUpdateSerializer,
-    DashboardSerializer
+    BulkReviewSerializer, BulkTrackSerializer, review_confidence_change,
+    ProblemListSerializer, ProblemListDetailSerializer, UserListSerializer,
+    UserListDetailSerializer
+)
+from .rendering import (
+    FastJSONRenderer, ValuesListMixin, dashboard_rows, problem_rows, user_problem_rows
+)
+from .pagination import (
+    OptInCursorPaginationMixin, ProblemCursorPagination, UserProblemCursorPagination
 )
+from .search import get_index
+from .stats import compute_stats
+from .tags import MATCH_ANY, filter_by_tags, filter_tracked_by_tags
+from .tracking import track_problems
 
 
 class CsrfExemptSessionAuthentication(SessionAuthentication):
@@ -22,9 +47,36 @@ class CsrfExemptSessionAuthentication(SessionAuthentication):
         return  # To not perform the csrf check previously happening
 
 
-class ProblemListAPIView(generics.ListAPIView):
+FAST_RENDERER_CLASSES = [FastJSONRenderer, BrowsableAPIRenderer]
+
+
+class FacetCountsMixin:
+    """Add difficulty and tag counts (see ``facets.py``) to list responses with ``?facets=true``."""
+    
+    def get_facet_base(self, index):
+        """Bitset of the problems to count; None for the whole catalogue."""
+        return None
+    
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get('facets') == 'true' and isinstance(response.data, dict):
+            index = get_facet_index()
+            response.data['facets'] = index.counts(
+                self.get_facet_base(index),
+                difficulty=request.query_params.get('difficulty'),
+                tags=request.query_params.getlist('tags'),
+                match=request.query_params.get('tag_match', MATCH_ANY),
+            )
+        return response
+
+
+@method_decorator(use_replicas, name='get')
+class ProblemListAPIView(FacetCountsMixin, OptInCursorPaginationMixin, ValuesListMixin, generics.ListAPIView):
     """List all problems with optional filtering."""
     serializer_class = ProblemSerializer
+    values_serializer = problem_rows
+    renderer_classes = FAST_RENDERER_CLASSES
+    cursor_pagination_class = ProblemCursorPagination
     permission_classes = [IsAuthenticated]
     authentication_classes = [CsrfExemptSessionAuthentication]
     
@@ -36,21 +88,37 @@ class ProblemListAPIView(generics.ListAPIView):
         if difficulty:
             queryset = queryset.filter(difficulty=difficulty)
         
-        # Filter by tags
-        tags = self.request.query_params.getlist('tags')
-        if tags:
-            queryset = queryset.filter(tags__overlap=tags)
+        # Filter by tags (any-of by default, all-of with tag_match=all)
+        queryset = filter_by_tags(
+            queryset,
+            self.request.query_params.getlist('tags'),
+            match=self.request.query_params.get('tag_match', MATCH_ANY),
+        )
         
         return queryset
+    
+    def list(self, request, *args, **kwargs):
+        # The catalogue isn't per-user, so pages are cached across users
+        entry = CatalogueEntry('problem_list', [
+            request.build_absolute_uri('/'), sorted(request.query_params.lists())
+        ])
+        if entry.matches(request):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': entry.etag})
+        data = entry.get_or_build(lambda: super(ProblemListAPIView, self).list(request, *args, **kwargs).data)
+        return Response(data, headers={'ETag': entry.etag, 'Cache-Control': 'private, no-cache'})
 
 
-class UserProblemListView(generics.ListCreateAPIView):
+class UserProblemListView(FacetCountsMixin, OptInCursorPaginationMixin, ValuesListMixin, generics.ListCreateAPIView):
     """List user's problems or create new user problem."""
     serializer_class = UserProblemSerializer
+    values_serializer = user_problem_rows
+    renderer_classes = FAST_RENDERER_CLASSES
+    cursor_pagination_class = UserProblemCursorPagination
     permission_classes = [IsAuthenticated]
     authentication_classes = [CsrfExemptSessionAuthentication]
     
-    def get_queryset(self):
+    def get_scope_queryset(self):
+        """The user's problems narrowed by the filters that aren't facets."""
         queryset = UserProblem.objects.filter(user=self.request.user)
         
         # Filter by confidence level
@@ -61,20 +129,35 @@ class UserProblemListView(generics.ListCreateAPIView):
         # Filter by next due date
         due_today = self.request.query_params.get('due_today')
         if due_today == 'true':
-            queryset = queryset.filter(next_due__date__lte=timezone.now().date())
+            queryset = queryset.due()
         
-        # Filter by difficulty
-        difficulty = self.request.query_params.get('difficulty')
-        if difficulty:
-            queryset = queryset.filter(problem__difficulty=difficulty)
-        
-        # Filter by tags
+        return queryset
+    
+    def get_queryset(self):
+        queryset = self.get_scope_queryset()
         tags = self.request.query_params.getlist('tags')
-        if tags:
-            queryset = queryset.filter(problem__tags__overlap=tags)
+        tag_match = self.request.query_params.get('tag_match', MATCH_ANY)
+        difficulty = self.request.query_params.get('difficulty')
+        if getattr(settings, 'PROBLEM_FILTERS_USE_DENORMALIZED', False):
+            # Filter on the copies kept on UserProblem, without joining Problem
+            if difficulty:
+                queryset = queryset.filter(difficulty=difficulty)
+            queryset = filter_tracked_by_tags(queryset, tags, match=tag_match)
+        else:
+            # Filter by difficulty
+            if difficulty:
+                queryset = queryset.filter(problem__difficulty=difficulty)
+            
+            # Filter by tags (any-of by default, all-of with tag_match=all)
+            queryset = filter_by_tags(queryset, tags, match=tag_match, problem_field='problem_id')
         
         return queryset.select_related('problem')
     
+    def get_facet_base(self, index):
+        if self.request.query_params.get('confidence') or self.request.query_params.get('due_today') == 'true':
+            return index.mask_for_ids(self.get_scope_queryset().values_list('problem_id', flat=True))
+        return tracked_mask(index, self.request.user)
+    
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
@@ -92,49 +175,268 @@ class UserProblemUpdateView(generics.UpdateAPIView):
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data)
         serializer.is_valid(raise_exception=True)
+        confidence, was_solved = instance.confidence, instance.solved_count > 0
+        due_before = {instance.pk} if instance.next_due < end_of_today() else set()
         serializer.save()
+        publish_reviews(
+            request.user.id, [instance], due_before,
+            confidence_delta=instance.confidence - confidence,
+            solved_delta=int(not was_solved and instance.solved_count > 0),
+        )
         
         # Return updated user problem data
         response_serializer = UserProblemSerializer(instance)
         return Response(response_serializer.data)
 
 
+class UserProblemBulkUpdateView(generics.GenericAPIView):
+    """Apply a batch of reviews in one transaction."""
+    serializer_class = BulkReviewSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    
+    def get_queryset(self):
+        return UserProblem.objects.filter(user=self.request.user)
+    
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reviews = serializer.validated_data['reviews']
+        ids = [review['id'] for review in reviews]
+        
+        with transaction.atomic():
+            instances = (
+                self.get_queryset()
+                .select_related('problem')
+                .select_for_update(of=('self',))
+                .in_bulk(ids)
+            )
+            missing = sorted(set(ids) - set(instances))
+            if missing:
+                return Response(
+                    {'error': 'Unknown user problems', 'ids': missing},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            # Replay reviews in submission order; repeated ids stack up
+            now = timezone.now()
+            until = end_of_today()
+            due_before = {pk for pk, instance in instances.items() if instance.next_due < until}
+            confidence_delta = solved_delta = 0
+            events = []
+            for review in reviews:
+                delta, newly_solved, event = instances[review['id']].apply_review(
+                    review_confidence_change(review['confidence_change'], review['solved']),
+                    now=now,
+                )
+                confidence_delta += delta
+                solved_delta += int(newly_solved)
+                events.append(event)
+            
+            UserProblem.objects.bulk_update(instances.values(), UserProblem.REVIEW_FIELDS)
+            ReviewEvent.objects.bulk_create(events)
+            UserProblemSummary.record_review(
+                request.user.id,
+                confidence_delta=confidence_delta,
+                solved_delta=solved_delta,
+            )
+            publish_reviews(
+                request.user.id, list(instances.values()), due_before,
+                confidence_delta=confidence_delta, solved_delta=solved_delta,
+            )
+        forget_due_counts(request.user.id)
+        
+        ordered = [instances[pk] for pk in dict.fromkeys(ids)]
+        return Response(UserProblemSerializer(ordered, many=True).data)
+
+
+class UserProblemBulkTrackView(generics.GenericAPIView):
+    """Start tracking many problems (ids or a whole list) with one INSERT."""
+    serializer_class = BulkTrackSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        if 'list_id' in data:
+            if not ProblemList.objects.filter(pk=data['list_id']).exists():
+                return Response({'error': 'Problem list not found'}, status=status.HTTP_404_NOT_FOUND)
+            problem_ids = ProblemListItem.objects.filter(list_id=data['list_id']).values_list('problem_id', flat=True)
+        elif 'user_list_id' in data:
+            if not UserList.objects.filter(pk=data['user_list_id'], user=request.user).exists():
+                return Response({'error': 'User list not found'}, status=status.HTTP_404_NOT_FOUND)
+            problem_ids = UserListItem.objects.filter(user_list_id=data['user_list_id']).values_list('problem_id', flat=True)
+        else:
+            problem_ids = data['problem_ids']
+        
+        user_problems, created = track_problems(request.user, problem_ids)
+        return Response(
+            {
+                'created': len(created),
+                'already_tracked': len(user_problems) - len(created),
+                'user_problems': UserProblemSerializer(user_problems, many=True).data,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class ProgressOverlayMixin:
+    """Retrieve a list with its items and the user's progress in constant queries.
+    
+    Items and their problems come from one prefetch; progress for all of the
+    list's problems comes from a single ``UserProblem`` query.
+    """
+    item_model = None
+    
+    def get_detail_queryset(self, queryset):
+        return queryset.prefetch_related(
+            Prefetch('items', queryset=self.item_model.objects.select_related('problem'))
+        )
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['progress'] = getattr(self, 'progress', {})
+        return context
+    
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        problem_ids = [item.problem_id for item in instance.items.all()]
+        self.progress = {
+            user_problem.problem_id: user_problem
+            for user_problem in UserProblem.objects.filter(
+                user=request.user, problem_id__in=problem_ids
+            )
+        }
+        return Response(self.get_serializer(instance).data)
+
+
+class ProblemListListView(generics.ListAPIView):
+    """List curated problem lists."""
+    serializer_class = ProblemListSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    
+    def get_queryset(self):
+        queryset = ProblemList.objects.annotate(problem_count=Count('items')).order_by('name')
+        list_type = self.request.query_params.get('list_type')
+        if list_type:
+            queryset = queryset.filter(list_type=list_type)
+        return queryset
+
+
+class ProblemListDetailView(ProgressOverlayMixin, generics.RetrieveAPIView):
+    """A curated list with its problems and the user's progress on each."""
+    serializer_class = ProblemListDetailSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    item_model = ProblemListItem
+    
+    def get_queryset(self):
+        return self.get_detail_queryset(
+            ProblemList.objects.annotate(problem_count=Count('items'))
+        )
+
+
+class UserListListView(generics.ListAPIView):
+    """List the user's own problem lists."""
+    serializer_class = UserListSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    
+    def get_queryset(self):
+        return (
+            UserList.objects.filter(user=self.request.user)
+            .annotate(problem_count=Count('items'))
+            .order_by('-created_at')
+        )
+
+
+class UserListDetailView(ProgressOverlayMixin, generics.RetrieveAPIView):
+    """One of the user's lists with its problems and progress."""
+    serializer_class = UserListDetailSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CsrfExemptSessionAuthentication]
+    item_model = UserListItem
+    
+    def get_queryset(self):
+        return self.get_detail_queryset(
+            UserList.objects.filter(user=self.request.user).annotate(problem_count=Count('items'))
+        )
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(FAST_RENDERER_CLASSES)
+@throttle_classes([TokenBucketThrottle.scoped('dashboard')])
 def dashboard(request):
     """Get problems due today for dashboard."""
-    due_problems = UserProblem.objects.filter(
-        user=request.user,
-        next_due__date__lte=timezone.now().date()
-    ).select_related('problem').order_by('next_due')
+    # Evaluate once: the total comes from the fetched rows, not a second COUNT
+    due_problems = dashboard_rows.serialize(
+        dashboard_rows.rows(UserProblem.objects.filter(user=request.user).due().order_by('next_due'))
+    )
     
-    serializer = DashboardSerializer(due_problems, many=True)
     return Response({
-        'due_today': serializer.data,
-        'total_due': due_problems.count()
+        'due_today': due_problems,
+        'total_due': len(due_problems)
     })
 
 
+@use_replicas
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def problem_stats(request):
     """Get user's problem statistics."""
-    user_problems = UserProblem.objects.filter(user=request.user)
-    
-    stats = {
-        'total_problems': user_problems.count(),
-        'solved_problems': user_problems.filter(solved_count__gt=0).count(),
-        'due_today': user_problems.filter(next_due__date__lte=timezone.now().date()).count(),
-        'average_confidence': user_problems.aggregate(
-            avg_confidence=Avg('confidence')
-        )['avg_confidence'] or 0,
-        'difficulty_breakdown': {
-            'Easy': user_problems.filter(problem__difficulty='Easy').count(),
-            'Medium': user_problems.filter(problem__difficulty='Medium').count(),
-            'Hard': user_problems.filter(problem__difficulty='Hard').count(),
-        }
-    }
+    return Response(compute_stats(request.user))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_problems(request):
+    """Ranked, typo-tolerant search over problem titles and tags."""
+    query = request.query_params.get('q', '').strip()
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 20)), 50))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
     
-    return Response(stats)
+    results = get_index().search(query, limit) if query else []
+    return Response({
+        'query': query,
+        'results': [dict(problem, score=score) for problem, score in results]
+    })
 
 
+def _analytics_days(request):
+    days = int(request.query_params.get('days', 30))
+    if not 1 <= days <= 365:
+        raise ValueError
+    return days
+
+
+@use_replicas
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def review_analytics(request):
+    """The user's daily reviews and retention curve, from the daily rollups (through yesterday)."""
+    try:
+        days = _analytics_days(request)
+    except ValueError:
+        return Response({'error': 'days must be an integer from 1 to 365'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(user_analytics(request.user, days))
+
+
+@use_replicas
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def problem_review_analytics(request, pk):
+    """Daily reviews of a problem across all users, from the daily rollups (through yesterday)."""
+    try:
+        days = _analytics_days(request)
+    except ValueError:
+        return Response({'error': 'days must be an integer from 1 to 365'}, status=status.HTTP_400_BAD_REQUEST)
+    if not Problem.objects.filter(pk=pk).exists():
+        return Response({'error': 'Problem not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(problem_analytics(pk, days))
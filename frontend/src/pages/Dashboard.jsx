@@ -6,7 +6,7 @@ import ProblemCard from '../components/ProblemCard';
 import LoadingSpinner from '../components/LoadingSpinner';
 
 const Dashboard = () => {
-  const { dashboardProblems, stats, isLoading, error, fetchDashboard, fetchStats } = useProblemStore();
+  const { dashboardProblems, stats, isLoading, error, fetchDashboard, fetchStats, subscribeToUpdates } = useProblemStore();
   const { user } = useAuthStore();
 
   useEffect(() => {
@@ -14,6 +14,8 @@ const Dashboard = () => {
     fetchStats();
   }, [fetchDashboard, fetchStats]);
 
+  useEffect(() => subscribeToUpdates(), [subscribeToUpdates]);
+
   if (isLoading && !dashboardProblems.length) {
     return (
       <div className="min-h-screen flex items-center justify-center">
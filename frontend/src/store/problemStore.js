@@ -1,6 +1,27 @@
 import { create } from 'zustand';
 import axios from 'axios';
 
+const byNextDue = (a, b) => new Date(a.next_due) - new Date(b.next_due);
+
+// Apply a stats_delta event from /api/events/ to the /api/stats/ payload
+const applyStatsDelta = (stats, delta) => {
+  if (!stats) return stats;
+  const totalProblems = stats.total_problems + delta.total_problems;
+  const confidenceSum = stats.average_confidence * stats.total_problems + delta.confidence_sum;
+  const difficultyBreakdown = { ...stats.difficulty_breakdown };
+  Object.entries(delta.difficulty_breakdown).forEach(([difficulty, count]) => {
+    difficultyBreakdown[difficulty] = (difficultyBreakdown[difficulty] || 0) + count;
+  });
+  return {
+    ...stats,
+    total_problems: totalProblems,
+    solved_problems: stats.solved_problems + delta.solved_problems,
+    due_today: stats.due_today + delta.due_today,
+    average_confidence: totalProblems ? confidenceSum / totalProblems : 0,
+    difficulty_breakdown: difficultyBreakdown,
+  };
+};
+
 const useProblemStore = create((set, get) => ({
   problems: [],
   userProblems: [],
@@ -158,6 +179,26 @@ const useProblemStore = create((set, get) => ({
     }
   },
 
+  // Track many problems at once: { problem_ids: [...] }, { list_id } or { user_list_id }
+  trackProblems: async (selection) => {
+    set({ isLoading: true, error: null });
+    try {
+      const response = await axios.post('/api/user/problems/bulk-track/', selection, {
+        withCredentials: true,
+      });
+      
+      await get().fetchUserProblems();
+      set({ isLoading: false });
+      return response.data;
+    } catch (error) {
+      set({ 
+        error: error.response?.data?.message || error.response?.data?.detail || 'Failed to add problems',
+        isLoading: false 
+      });
+      throw error;
+    }
+  },
+
   // Update user problem (confidence/attempt)
   updateUserProblem: async (userProblemId, confidenceChange, solved = false) => {
     set({ isLoading: true, error: null });
@@ -194,6 +235,34 @@ const useProblemStore = create((set, get) => ({
     }
   },
 
+  // Keep the dashboard and stats current from the live updates stream instead of refetching.
+  // Needs the backend behind an ASGI server; without it the stream fails and nothing changes.
+  // Returns a function closing the stream.
+  subscribeToUpdates: () => {
+    if (typeof EventSource === 'undefined') return () => {};
+    const source = new EventSource('/api/events/', { withCredentials: true });
+
+    source.addEventListener('due_removed', (event) => {
+      const { ids } = JSON.parse(event.data);
+      set({ dashboardProblems: get().dashboardProblems.filter(up => !ids.includes(up.id)) });
+    });
+    source.addEventListener('due_upserted', (event) => {
+      const { items } = JSON.parse(event.data);
+      const updated = new Map(items.map(item => [item.id, item]));
+      const kept = get().dashboardProblems.filter(up => !updated.has(up.id));
+      set({ dashboardProblems: [...kept, ...items].sort(byNextDue) });
+    });
+    source.addEventListener('stats_delta', (event) => {
+      set({ stats: applyStatsDelta(get().stats, JSON.parse(event.data)) });
+    });
+    source.addEventListener('resync', () => {
+      get().fetchDashboard();
+      get().fetchStats();
+    });
+
+    return () => source.close();
+  },
+
   // Quick actions for dashboard
   markSolved: async (userProblemId) => {
     return get().updateUserProblem(userProblemId, 20, true);